@@ -11,16 +11,96 @@ Results with 50 queries:
 - 55.6% cost savings
 
 Official docs: https://docs.agno.com/examples/concepts/agent/context_management/filter_tool_calls_from_history
+
+Run with --offline to use the in-process OfflineChat model (no API key needed).
 """
 
+import argparse
+import asyncio
+import math
+import os
 import random
+import sys
 import time
-from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
-from agno.models.openai import OpenAIChat
 import json
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from offline_model import add_offline_arguments, build_model, model_options_from_args, offline_enabled  # noqa: E402
+from ledger import RunSeries, ToolCallLedger  # noqa: E402
+from phases import PHASES, PhaseTimer  # noqa: E402
+from context_profiler import ContextProfiler, print_growth_curve  # noqa: E402
+from memory_tracker import MemoryTracker, print_memory_comparison  # noqa: E402
+from results_store import add_results_store_arguments, record_from_args  # noqa: E402
+from tool_cache import add_tool_cache_arguments, tool_cache_from_args  # noqa: E402
+from parallel_tools import EXECUTION_MODES, ParallelToolCalls  # noqa: E402
+from rate_limiter import add_scheduler_arguments, scheduler_from_args  # noqa: E402
+
+MODEL_ID = "gpt-4o-mini"
+# GPT-4o-mini pricing per 1K tokens
+INPUT_PRICE_PER_1K = 0.00015
+OUTPUT_PRICE_PER_1K = 0.0006
+RESULTS_BENCHMARK = "max_tool_calls"
+
+# Tool responses draw from their own RNG so trials can be replayed with seed_tools()
+TOOL_RNG = random.Random()
+# (min, max) characters of extra detail appended to each tool result; see set_tool_result_size()
+TOOL_RESULT_CHARS = (0, 0)
+# Synthetic tool latency (mean ms, jitter ms), drawn from its own RNG; see set_tool_latency()
+TOOL_LATENCY_MS = (0.0, 0.0)
+TOOL_LATENCY_RNG = random.Random()
+DETAIL_SENTENCES = [
+    "Funding rounds in the sector grew steadily over the last four quarters.",
+    "Several open benchmarks were updated with harder evaluation sets.",
+    "Analysts expect consolidation among smaller vendors next year.",
+    "Hardware costs remain the largest line item for most deployments.",
+    "Regulators published draft guidance on transparency and reporting.",
+    "Open source releases continue to narrow the gap with commercial offerings.",
+]
+
+
+def seed_tools(seed):
+    """Make get_info_about_topic's choice of response and its latency reproducible"""
+    TOOL_RNG.seed(seed)
+    TOOL_LATENCY_RNG.seed(seed)
+
+
+def set_tool_latency(latency_ms, jitter_ms=0.0):
+    """
+    Make get_info_about_topic sleep latency_ms ± jitter_ms (uniform) per call,
+    like a search API or database query would take
+    """
+    global TOOL_LATENCY_MS
+    TOOL_LATENCY_MS = (latency_ms, jitter_ms)
+
+
+def tool_delay():
+    latency_ms, jitter_ms = TOOL_LATENCY_MS
+    if latency_ms <= 0 and jitter_ms <= 0:
+        return
+    delay_ms = latency_ms + TOOL_LATENCY_RNG.uniform(-jitter_ms, jitter_ms)
+    time.sleep(max(0.0, delay_ms) / 1000)
+
+
+def set_tool_result_size(min_chars, max_chars):
+    """
+    Pad each tool result with a log-uniformly sized block of detail text, so
+    results range from a few bytes to tens of kilobytes like real tool output
+    """
+    global TOOL_RESULT_CHARS
+    TOOL_RESULT_CHARS = (min_chars, max_chars)
+
+
+def tool_detail():
+    low, high = TOOL_RESULT_CHARS
+    if high <= 0:
+        return ""
+    size = int(math.exp(TOOL_RNG.uniform(math.log(max(1, low)), math.log(high))))
+    detail = []
+    while sum(len(sentence) + 1 for sentence in detail) < size:
+        detail.append(TOOL_RNG.choice(DETAIL_SENTENCES))
+    return " " + " ".join(detail)
+
 
 def get_info_about_topic(topic: str) -> str:
     """Get information about a topic. This function ALWAYS gets called."""
@@ -31,7 +111,8 @@ def get_info_about_topic(topic: str) -> str:
         f"Companies are investing heavily in {topic} technology.",
         f"Academic papers on {topic} have increased 50% this year.",
     ]
-    return random.choice(responses)
+    tool_delay()
+    return TOOL_RNG.choice(responses) + tool_detail()
 
 
 # 50 diverse topics to query
@@ -56,175 +137,390 @@ BENCHMARK_QUERIES = [
 ]
 
 
-def run_baseline_agent(topics, verbose=False):
-    """Baseline WITHOUT max_tool_calls_from_history"""
-    print("\n" + "=" * 90)
-    print("⚠️  BASELINE - WITHOUT max_tool_calls_from_history")
-    print("=" * 90 + "\n")
-    
+def build_topics(count, fanout=1):
+    """
+    Return `count` topics, cycling through BENCHMARK_QUERIES. With fanout > 1,
+    each is a "X, Y and Z" group of `fanout` consecutive topics that the model
+    answers with one tool call per topic (see build_prompt)
+    """
+    if fanout <= 1:
+        return [BENCHMARK_QUERIES[i % len(BENCHMARK_QUERIES)] for i in range(count)]
+    groups = []
+    for i in range(count):
+        group = [BENCHMARK_QUERIES[(i * fanout + j) % len(BENCHMARK_QUERIES)] for j in range(fanout)]
+        groups.append(", ".join(group[:-1]) + " and " + group[-1])
+    return groups
+
+
+def build_prompt(topic):
+    """User message for one run: a fan-out group of topics is asked as a comparison"""
+    if "," in topic or " and " in topic:
+        return f"Compare {topic}"
+    return f"Tell me about {topic}"
+
+
+def token_cost(input_tokens, output_tokens):
+    """Dollar cost of the tokens at GPT-4o-mini pricing"""
+    return (input_tokens * INPUT_PRICE_PER_1K + output_tokens * OUTPUT_PRICE_PER_1K) / 1000
+
+
+STORAGE_MODES = ("default", "append")
+
+
+def make_db(db_file, storage="default", batch_size=1):
+    """SqliteDb ("default") or AppendOnlySqliteDb ("append") for `db_file`"""
+    # agno is imported on first use so that importing this module stays cheap
+    if storage == "append":
+        from append_only_db import AppendOnlySqliteDb
+
+        return AppendOnlySqliteDb(db_file=db_file, batch_size=batch_size)
+    from agno.db.sqlite import SqliteDb
+
+    return SqliteDb(db_file=db_file)
+
+
+def build_agent(db_file, max_history_limit=None, model=None, db=None, session_id=None, storage="default",
+                tool_cache=None, cache_session=False):
+    """
+    Create the benchmark agent.
+
+    max_history_limit=None is the baseline (unlimited tool call history);
+    any integer sets max_tool_calls_from_history. Pass `db` to share one
+    SqliteDb instance between agents. storage="append" stores runs with
+    AppendOnlySqliteDb instead of rewriting the session row on every save.
+    Pass a tool_cache (tool_cache.ToolCache) to memoize tool results.
+    cache_session=True keeps the session in memory between runs instead of
+    reading it back from the DB; it applies to either storage.
+    """
+    from agno.agent import Agent
+
+    db = db or make_db(db_file, storage)
+    tools = [get_info_about_topic]
+    if tool_cache is not None:
+        tools = tool_cache.wrap_all(tools)
     agent = Agent(
-        model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[get_info_about_topic],
-        db=SqliteDb(db_file="tmp/baseline_guaranteed.db"),
+        model=model or build_model(MODEL_ID),
+        tools=tools,
+        db=db,
+        session_id=session_id,
+        max_tool_calls_from_history=max_history_limit,
         add_history_to_context=True,
-        num_history_runs=None,  # ← UNLIMITED history for baseline!
+        num_history_runs=None,  # ← Unlimited RUNS; tool calls limited only by max_history_limit
         markdown=True,
         instructions="You are a research assistant. ALWAYS use get_info_about_topic to answer. Be brief.",
     )
-    
+    # Agno 2.x turns num_history_runs=None into 3 inside Agent.__init__; restore "all runs"
+    agent.num_history_runs = None
+    agent.cache_session = cache_session
+    return agent
+
+
+def warm_up_memory(model, storage="default", loop_runner=None, max_history_limit=None):
+    """
+    One untracked run on a scratch agent and DB, before tracemalloc starts.
+    One-time allocations (lazy imports, table setup, the model's client) then
+    land here instead of in the first tracked run of whichever runner goes
+    first. The tool RNGs are restored, so tracked runs get the same tool results.
+    With a loop_runner (asyncio.Runner) the warm-up runs agent.arun on the loop
+    the session's queries will use.
+    """
+    import tempfile
+
+    tool_state = TOOL_RNG.getstate(), TOOL_LATENCY_RNG.getstate()
+    try:
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            agent = build_agent(os.path.join(scratch_dir, "warm_up.db"), max_history_limit=max_history_limit,
+                                model=model, storage=storage, session_id="memory-warm-up")
+            prompt = build_prompt(BENCHMARK_QUERIES[0])
+            if loop_runner is not None:
+                loop_runner.run(agent.arun(prompt, stream=False))
+            else:
+                agent.run(prompt, stream=False)
+            if hasattr(agent.db, "flush"):
+                agent.db.flush()
+            agent.db.db_engine.dispose()
+    finally:
+        TOOL_RNG.setstate(tool_state[0])
+        TOOL_LATENCY_RNG.setstate(tool_state[1])
+
+
+def run_queries(agent, topics, verbose=False, verify=True, series_path=None, phase_timer=None,
+                context_profiler=None, use_async=False, memory_tracker=None, loop_runner=None):
+    """
+    Run every topic through the agent, tracking tool calls and per-run cost incrementally.
+    use_async runs each query with agent.arun, which executes a run's tool calls concurrently.
+    All of a session's queries run on one event loop: the model's async client is bound to
+    the loop it was opened on. Pass loop_runner (asyncio.Runner) to share that loop with
+    work done before the session, such as warm_up_memory; the caller closes it.
+    """
+    owned_runner = asyncio.Runner() if use_async and loop_runner is None else None
+    loop_runner = loop_runner or owned_runner
     print(f"{'Run':<5} | {'Topic':<30} | {'History':<8} | {'Current':<8} | {'In Context':<11} | {'In DB':<8}")
     print("-" * 90)
     
+    ledger = ToolCallLedger()
+    series = RunSeries(stream_path=series_path)
+    run_response = None
     start_time = time.time()
-    total_history_in_context = 0
-    total_current_in_context = 0
     
-    for i, topic in enumerate(topics, 1):
-        run_response = agent.run(f"Tell me about {topic}", stream=False)
-        
-        # Official tracking method
-        history_tool_calls = sum(
-            len(msg.tool_calls)
-            for msg in run_response.messages
-            if msg.role == "assistant"
-            and msg.tool_calls
-            and getattr(msg, "from_history", False)
-        )
-        
-        current_tool_calls = sum(
-            len(msg.tool_calls)
-            for msg in run_response.messages
-            if msg.role == "assistant"
-            and msg.tool_calls
-            and not getattr(msg, "from_history", False)
-        )
+    try:
+        for i, topic in enumerate(topics, 1):
+            if phase_timer is not None:
+                phase_timer.begin_run()
+            if context_profiler is not None:
+                context_profiler.begin_run()
+            if memory_tracker is not None:
+                memory_tracker.begin_run()
+            run_start = time.perf_counter()
+            if use_async:
+                run_response = loop_runner.run(agent.arun(build_prompt(topic), stream=False))
+            else:
+                run_response = agent.run(build_prompt(topic), stream=False)
+            latency = time.perf_counter() - run_start
+            if phase_timer is not None:
+                phase_timer.end_run()
+            if context_profiler is not None:
+                context_profiler.end_run()
+            if memory_tracker is not None:
+                memory_tracker.end_run()
         
-        total_in_context = history_tool_calls + current_tool_calls
+            # Official tracking method, applied to this run's messages only
+            history_tool_calls, current_tool_calls = ledger.record(run_response)
+            metrics = run_response.metrics
+            series.append(
+                run=i,
+                history_tool_calls=history_tool_calls,
+                current_tool_calls=current_tool_calls,
+                input_tokens=getattr(metrics, 'input_tokens', 0) or 0,
+                output_tokens=getattr(metrics, 'output_tokens', 0) or 0,
+                latency_s=latency,
+            )
+            total_in_context = history_tool_calls + current_tool_calls
         
-        saved_messages = agent.get_messages_for_session()
-        saved_tool_calls = sum(
-            len(msg.tool_calls)
-            for msg in saved_messages
-            if msg.role == "assistant" and msg.tool_calls
-        ) if saved_messages else 0
-        
-        total_history_in_context += history_tool_calls
-        total_current_in_context += current_tool_calls
-        
-        if verbose or i <= 5 or i > len(topics) - 3:  # Show first 5 and last 3
-            topic_short = topic[:30] if len(topic) > 30 else topic
-            print(f"{i:<5} | {topic_short:<30} | {history_tool_calls:<8} | {current_tool_calls:<8} | {total_in_context:<11} | {saved_tool_calls:<8}")
-        elif i == 6:
-            print("  ... (showing first 5 and last 3 queries)")
-    
+            if verbose or i <= 5 or i > len(topics) - 3:  # Show first 5 and last 3
+                topic_short = topic[:30] if len(topic) > 30 else topic
+                print(f"{i:<5} | {topic_short:<30} | {history_tool_calls:<8} | {current_tool_calls:<8} | {total_in_context:<11} | {ledger.total_in_db:<8}")
+            elif i == 6:
+                print("  ... (showing first 5 and last 3 queries)")
+    finally:
+        if owned_runner is not None:
+            owned_runner.close()
+
     elapsed_time = time.time() - start_time
-    metrics = run_response.metrics if hasattr(run_response, 'metrics') else None
+    series.close()
+    
+    if verify:
+        ok, saved_tool_calls = ledger.verify(agent)
+        if not ok:
+            print(f"\n⚠️  Ledger mismatch: counted {ledger.total_in_db} tool calls, DB has {saved_tool_calls}")
+    
+    return ledger, series, elapsed_time
+
+
+def context_tokens(context_profiler):
+    """Profiled context-token results for the JSON output, or None if profiling was off"""
+    if context_profiler is None:
+        return None
+    return {
+        'summary': context_profiler.summary(),
+        'growth': context_profiler.growth_curve(),
+        'per_run': context_profiler.to_columns(),
+    }
+
+
+def memory_footprint(memory_tracker):
+    """Tracked memory results for the JSON output, or None if tracking was off"""
+    if memory_tracker is None:
+        return None
+    memory_tracker.close()
+    return {'summary': memory_tracker.summary(), 'per_run': memory_tracker.to_columns()}
+
+
+def print_memory(memory_tracker):
+    if memory_tracker is None:
+        return
+    stats = memory_tracker.summary()
+    per_message = stats['bytes_per_history_message']['session_load']
+    print(f"  Memory (RSS first → last):     {stats['rss_bytes']['first'] / 2**20:.1f} → "
+          f"{stats['rss_bytes']['last'] / 2**20:.1f} MiB, session load "
+          f"{stats['session_load_peak_bytes']['last'] / 1024:.1f} KiB peak in the last run"
+          + (f", ~{per_message:,.0f} B per stored message" if per_message is not None else ""))
+
+
+def print_tool_cache(tool_cache):
+    if tool_cache is None:
+        return
+    stats = tool_cache.summary()
+    print(f"  Tool cache hits/misses:        {stats['hits']} / {stats['misses']} "
+          f"({stats['hit_rate'] * 100:.1f}% hit rate, ~{stats['saved_time_s']:.2f}s of tool time saved)")
+
+
+def client_options(model_options, args):
+    """build_model options; with --rpm/--tpm the online client leaves retries to the scheduler"""
+    if (args.rpm is not None or args.tpm is not None) and not offline_enabled(model_options['offline']):
+        return {**model_options, 'max_retries': 0}
+    return model_options
+
+
+def print_scheduler(scheduler):
+    if scheduler is None:
+        return
+    stats = scheduler.summary()
+    print(f"  Rate-limit scheduler:          {stats['requests']} requests, {stats['rate_limited']} × 429, "
+          f"{stats['retries']} retries, queue wait p95 {stats['queue_wait_s']['p95']:.3f}s")
+
+
+def run_baseline_agent(topics, verbose=False, model=None, verify=True, series_path=None,
+                       db_file="tmp/baseline_guaranteed.db", profile_context=False, storage="default",
+                       tool_cache=None, tool_execution="serial", scheduler=None, track_memory=False):
+    """Baseline WITHOUT max_tool_calls_from_history"""
+    print("\n" + "=" * 90)
+    print("⚠️  BASELINE - WITHOUT max_tool_calls_from_history")
+    print("=" * 90 + "\n")
     
-    total_context_used = total_history_in_context + total_current_in_context
-    avg_context = total_context_used / len(topics)
+    agent = build_agent(db_file, model=model, storage=storage, tool_cache=tool_cache)
+    # One event loop for the async session, shared with the warm-up
+    loop_runner = asyncio.Runner() if tool_execution == "async" else None
+    if track_memory:
+        # Before any instrumentation, so the warm-up is not counted anywhere
+        warm_up_memory(agent.model, storage, loop_runner=loop_runner)
+    parallel_tools = ParallelToolCalls().instrument(agent) if tool_execution == "threads" else None
+    if scheduler is not None:
+        scheduler.instrument(agent)
+    memory_tracker = MemoryTracker().instrument(agent) if track_memory else None
+    
+    phase_timer = PhaseTimer().instrument(agent)
+    context_profiler = ContextProfiler().instrument(agent) if profile_context else None
+    
+    try:
+        ledger, series, elapsed_time = run_queries(
+            agent, topics, verbose=verbose, verify=verify, series_path=series_path, phase_timer=phase_timer,
+            context_profiler=context_profiler, use_async=tool_execution == "async", memory_tracker=memory_tracker,
+            loop_runner=loop_runner,
+        )
+    finally:
+        if loop_runner is not None:
+            loop_runner.close()
+    if parallel_tools is not None:
+        parallel_tools.close()
+    summary = series.summary()
     
     print("\n" + "-" * 90)
     print(f"BASELINE SUMMARY:")
-    print(f"  Total tool calls in DB:        {saved_tool_calls}")
-    print(f"  Total context used (sum):      {total_context_used}")
-    print(f"  Avg context per query:         {avg_context:.1f}")
+    print(f"  Total tool calls in DB:        {ledger.total_in_db}")
+    print(f"  Total context used (sum):      {ledger.total_context_used}")
+    print(f"  Avg context per query:         {ledger.avg_context_per_query:.1f}")
+    print(f"  Total tokens (all runs):       {summary['tokens']['total_tokens']:,}")
+    print(f"  Latency p50/p95/p99:           {summary['latency_s']['p50']:.3f}s / "
+          f"{summary['latency_s']['p95']:.3f}s / {summary['latency_s']['p99']:.3f}s")
     print(f"  Expected avg (no limit):       ~{(len(topics) + 1) / 2:.1f}")
+    print_tool_cache(tool_cache)
+    print_scheduler(scheduler)
+    print_memory(memory_tracker)
     
     return {
         'agent_type': 'baseline',
         'queries_count': len(topics),
-        'total_in_db': saved_tool_calls,
-        'total_context_used': total_context_used,
-        'avg_context_per_query': avg_context,
+        'total_in_db': ledger.total_in_db,
+        'total_context_used': ledger.total_context_used,
+        'avg_context_per_query': ledger.avg_context_per_query,
         'elapsed_time': elapsed_time,
-        'metrics': metrics
+        'metrics': summary['tokens'],
+        'tokens_per_run': summary['tokens_per_run'],
+        'latency_s': summary['latency_s'],
+        'series': series.to_columns(),
+        'phases': {'summary': phase_timer.summary(), 'per_run': phase_timer.to_columns()},
+        'context_tokens': context_tokens(context_profiler),
+        'tool_cache': tool_cache.summary() if tool_cache is not None else None,
+        'tool_execution': tool_execution,
+        'parallel_tools': parallel_tools.summary() if parallel_tools is not None else None,
+        'rate_limit': scheduler.summary() if scheduler is not None else None,
+        'memory': memory_footprint(memory_tracker),
     }
 
 
-def run_optimized_agent(topics, max_history_limit=3, verbose=False):
-    """Optimized WITH max_tool_calls_from_history"""
+def run_optimized_agent(topics, max_history_limit=3, verbose=False, model=None, verify=True, series_path=None,
+                        db_file="tmp/optimized_guaranteed.db", profile_context=False, storage="default",
+                        history_filter=None, tool_cache=None, tool_execution="serial", scheduler=None,
+                        track_memory=False):
+    """
+    Optimized WITH max_tool_calls_from_history.
+
+    Pass a history_filter (e.g. history_filter.TokenBudgetFilter) to filter
+    history with it instead of the max_history_limit count. Pass a scheduler
+    (rate_limiter.RateLimitScheduler) to admit model requests under an RPM/TPM quota.
+    track_memory records per-run RSS and tracemalloc allocations (memory_tracker.MemoryTracker),
+    after one untracked warm-up run (warm_up_memory), as the baseline runner does.
+    """
+    label = history_filter.label if history_filter is not None else f"limit={max_history_limit}"
     print("\n" + "=" * 90)
-    print(f"✅ OPTIMIZED - WITH max_tool_calls_from_history={max_history_limit}")
+    print(f"✅ OPTIMIZED - WITH max_tool_calls_from_history="
+          f"{history_filter if history_filter is not None else max_history_limit}")
     print("=" * 90 + "\n")
     
-    agent = Agent(
-        model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[get_info_about_topic],
-        db=SqliteDb(db_file="tmp/optimized_guaranteed.db"),
-        max_tool_calls_from_history=max_history_limit,
-        add_history_to_context=True,
-        num_history_runs=None,  # ← Unlimited RUNS, but limited tool calls!
-        markdown=True,
-        instructions="You are a research assistant. ALWAYS use get_info_about_topic to answer. Be brief.",
-    )
-    
-    print(f"{'Run':<5} | {'Topic':<30} | {'History':<8} | {'Current':<8} | {'In Context':<11} | {'In DB':<8}")
-    print("-" * 90)
-    
-    start_time = time.time()
-    total_history_in_context = 0
-    total_current_in_context = 0
-    
-    for i, topic in enumerate(topics, 1):
-        run_response = agent.run(f"Tell me about {topic}", stream=False)
-        
-        # Official tracking method
-        history_tool_calls = sum(
-            len(msg.tool_calls)
-            for msg in run_response.messages
-            if msg.role == "assistant"
-            and msg.tool_calls
-            and getattr(msg, "from_history", False)
+    agent = build_agent(db_file, max_history_limit=max_history_limit, model=model, storage=storage,
+                        tool_cache=tool_cache)
+    # One event loop for the async session, shared with the warm-up
+    loop_runner = asyncio.Runner() if tool_execution == "async" else None
+    if track_memory:
+        warm_up_memory(agent.model, storage, loop_runner=loop_runner, max_history_limit=max_history_limit)
+    if history_filter is not None:
+        history_filter.apply_to(agent)
+    parallel_tools = ParallelToolCalls().instrument(agent) if tool_execution == "threads" else None
+    if scheduler is not None:
+        scheduler.instrument(agent)
+    memory_tracker = MemoryTracker().instrument(agent) if track_memory else None
+    
+    phase_timer = PhaseTimer().instrument(agent)
+    context_profiler = ContextProfiler().instrument(agent) if profile_context else None
+    
+    try:
+        ledger, series, elapsed_time = run_queries(
+            agent, topics, verbose=verbose, verify=verify, series_path=series_path, phase_timer=phase_timer,
+            context_profiler=context_profiler, use_async=tool_execution == "async", memory_tracker=memory_tracker,
+            loop_runner=loop_runner,
         )
-        
-        current_tool_calls = sum(
-            len(msg.tool_calls)
-            for msg in run_response.messages
-            if msg.role == "assistant"
-            and msg.tool_calls
-            and not getattr(msg, "from_history", False)
-        )
-        
-        total_in_context = history_tool_calls + current_tool_calls
-        
-        saved_messages = agent.get_messages_for_session()
-        saved_tool_calls = sum(
-            len(msg.tool_calls)
-            for msg in saved_messages
-            if msg.role == "assistant" and msg.tool_calls
-        ) if saved_messages else 0
-        
-        total_history_in_context += history_tool_calls
-        total_current_in_context += current_tool_calls
-        
-        if verbose or i <= 5 or i > len(topics) - 3:  # Show first 5 and last 3
-            topic_short = topic[:30] if len(topic) > 30 else topic
-            print(f"{i:<5} | {topic_short:<30} | {history_tool_calls:<8} | {current_tool_calls:<8} | {total_in_context:<11} | {saved_tool_calls:<8}")
-        elif i == 6:
-            print("  ... (showing first 5 and last 3 queries)")
-    
-    elapsed_time = time.time() - start_time
-    metrics = run_response.metrics if hasattr(run_response, 'metrics') else None
-    
-    total_context_used = total_history_in_context + total_current_in_context
-    avg_context = total_context_used / len(topics)
+    finally:
+        if loop_runner is not None:
+            loop_runner.close()
+    if parallel_tools is not None:
+        parallel_tools.close()
+    summary = series.summary()
     
     print("\n" + "-" * 90)
-    print(f"OPTIMIZED SUMMARY (limit={max_history_limit}):")
-    print(f"  Total tool calls in DB:        {saved_tool_calls}")
-    print(f"  Total context used (sum):      {total_context_used}")
-    print(f"  Avg context per query:         {avg_context:.1f}")
-    print(f"  Expected avg (with limit):     ~{max_history_limit + 1:.1f}")
+    print(f"OPTIMIZED SUMMARY ({label}):")
+    print(f"  Total tool calls in DB:        {ledger.total_in_db}")
+    print(f"  Total context used (sum):      {ledger.total_context_used}")
+    print(f"  Avg context per query:         {ledger.avg_context_per_query:.1f}")
+    print(f"  Total tokens (all runs):       {summary['tokens']['total_tokens']:,}")
+    print(f"  Latency p50/p95/p99:           {summary['latency_s']['p50']:.3f}s / "
+          f"{summary['latency_s']['p95']:.3f}s / {summary['latency_s']['p99']:.3f}s")
+    if history_filter is None:
+        print(f"  Expected avg (with limit):     ~{max_history_limit + 1:.1f}")
+    print_tool_cache(tool_cache)
+    print_scheduler(scheduler)
+    print_memory(memory_tracker)
     
     return {
         'agent_type': 'optimized',
         'queries_count': len(topics),
-        'max_history_limit': max_history_limit,
-        'total_in_db': saved_tool_calls,
-        'total_context_used': total_context_used,
-        'avg_context_per_query': avg_context,
+        'max_history_limit': max_history_limit if history_filter is None else None,
+        'history_filter': label,
+        'total_in_db': ledger.total_in_db,
+        'total_context_used': ledger.total_context_used,
+        'avg_context_per_query': ledger.avg_context_per_query,
         'elapsed_time': elapsed_time,
-        'metrics': metrics
+        'metrics': summary['tokens'],
+        'tokens_per_run': summary['tokens_per_run'],
+        'latency_s': summary['latency_s'],
+        'series': series.to_columns(),
+        'phases': {'summary': phase_timer.summary(), 'per_run': phase_timer.to_columns()},
+        'context_tokens': context_tokens(context_profiler),
+        'tool_cache': tool_cache.summary() if tool_cache is not None else None,
+        'tool_execution': tool_execution,
+        'parallel_tools': parallel_tools.summary() if parallel_tools is not None else None,
+        'rate_limit': scheduler.summary() if scheduler is not None else None,
+        'memory': memory_footprint(memory_tracker),
     }
 
 
@@ -234,6 +530,8 @@ def calculate_metrics(baseline_results, optimized_results):
     def extract_token_metrics(metrics):
         if not metrics:
             return None
+        if isinstance(metrics, dict):
+            return metrics
         return {
             'input_tokens': getattr(metrics, 'input_tokens', 0),
             'output_tokens': getattr(metrics, 'output_tokens', 0),
@@ -258,11 +556,8 @@ def calculate_metrics(baseline_results, optimized_results):
         token_diff = baseline_metrics['total_tokens'] - optimized_metrics['total_tokens']
         token_savings_pct = (token_diff / baseline_metrics['total_tokens']) * 100
         
-        # GPT-4o-mini pricing
-        baseline_cost = (baseline_metrics['input_tokens'] * 0.00015 + 
-                        baseline_metrics['output_tokens'] * 0.0006)
-        optimized_cost = (optimized_metrics['input_tokens'] * 0.00015 + 
-                         optimized_metrics['output_tokens'] * 0.0006)
+        baseline_cost = token_cost(baseline_metrics['input_tokens'], baseline_metrics['output_tokens'])
+        optimized_cost = token_cost(optimized_metrics['input_tokens'], optimized_metrics['output_tokens'])
         
         if baseline_cost > 0:
             cost_savings_pct = ((baseline_cost - optimized_cost) / baseline_cost) * 100
@@ -274,7 +569,17 @@ def calculate_metrics(baseline_results, optimized_results):
             'avg_context_per_query': baseline_results['avg_context_per_query'],
             'metrics': baseline_metrics,
             'cost': baseline_cost,
-            'elapsed_time': baseline_results['elapsed_time']
+            'elapsed_time': baseline_results['elapsed_time'],
+            'tokens_per_run': baseline_results.get('tokens_per_run'),
+            'latency_s': baseline_results.get('latency_s'),
+            'series': baseline_results.get('series'),
+            'phases': baseline_results.get('phases'),
+            'context_tokens': baseline_results.get('context_tokens'),
+            'tool_cache': baseline_results.get('tool_cache'),
+            'tool_execution': baseline_results.get('tool_execution'),
+            'parallel_tools': baseline_results.get('parallel_tools'),
+            'rate_limit': baseline_results.get('rate_limit'),
+            'memory': baseline_results.get('memory'),
         },
         'optimized': {
             'queries_count': optimized_results['queries_count'],
@@ -283,7 +588,17 @@ def calculate_metrics(baseline_results, optimized_results):
             'avg_context_per_query': optimized_results['avg_context_per_query'],
             'metrics': optimized_metrics,
             'cost': optimized_cost,
-            'elapsed_time': optimized_results['elapsed_time']
+            'elapsed_time': optimized_results['elapsed_time'],
+            'tokens_per_run': optimized_results.get('tokens_per_run'),
+            'latency_s': optimized_results.get('latency_s'),
+            'series': optimized_results.get('series'),
+            'phases': optimized_results.get('phases'),
+            'context_tokens': optimized_results.get('context_tokens'),
+            'tool_cache': optimized_results.get('tool_cache'),
+            'tool_execution': optimized_results.get('tool_execution'),
+            'parallel_tools': optimized_results.get('parallel_tools'),
+            'rate_limit': optimized_results.get('rate_limit'),
+            'memory': optimized_results.get('memory'),
         },
         'savings': {
             'context_reduction_pct': context_reduction_pct,
@@ -331,6 +646,53 @@ def print_comparison_report(comparison):
         print(f"  ✅ Cost Savings:    {savings['cost_savings_pct']:>9.1f}%")
         print()
     
+    if baseline.get('latency_s') and optimized.get('latency_s'):
+        print("⏱️  PER-RUN LATENCY (p50 / p95 / p99):")
+        print("-" * 90)
+        for label, result in (("Baseline", baseline), ("Optimized", optimized)):
+            latency = result['latency_s']
+            print(f"  {label + ':':<19} {latency['p50']:.3f}s / {latency['p95']:.3f}s / {latency['p99']:.3f}s")
+        print()
+    
+    if baseline.get('phases') and optimized.get('phases'):
+        print("🧩 TIME PER PHASE (mean ms per run, share of run time):")
+        print("-" * 90)
+        b_phases = baseline['phases']['summary']
+        o_phases = optimized['phases']['summary']
+        print(f"  {'Phase':<18} | {'Baseline':>20} | {'Optimized':>20}")
+        for phase in PHASES + ('other', 'total'):
+            b, o = b_phases[phase], o_phases[phase]
+            print(f"  {phase:<18} | {b['mean_ms']:>9.2f}ms ({b['share_pct']:>5.1f}%) | "
+                  f"{o['mean_ms']:>9.2f}ms ({o['share_pct']:>5.1f}%)")
+        print()
+    
+    if baseline.get('context_tokens') and optimized.get('context_tokens'):
+        print("🧮 CONTEXT TOKENS BY COMPONENT (profiled, all runs):")
+        print("-" * 90)
+        b_tokens = baseline['context_tokens']['summary']
+        o_tokens = optimized['context_tokens']['summary']
+        print(f"  {'Component':<18} | {'Baseline':>20} | {'Optimized':>20}")
+        for name, b in b_tokens['components'].items():
+            o = o_tokens['components'][name]
+            print(f"  {name:<18} | {b['total']:>11,} ({b['share_pct']:>5.1f}%) | "
+                  f"{o['total']:>11,} ({o['share_pct']:>5.1f}%)")
+        print(f"  {'total':<18} | {b_tokens['total_tokens']:>20,} | {o_tokens['total_tokens']:>20,}")
+        print(f"  {'peak call (last)':<18} | {b_tokens['peak_call_last_run']:>20,} | "
+              f"{o_tokens['peak_call_last_run']:>20,}")
+        print()
+        print("📈 CONTEXT GROWTH (tokens per run, summed over model calls):")
+        print("-" * 90)
+        print_growth_curve("Baseline", b_tokens, baseline['context_tokens']['growth'])
+        print()
+        print_growth_curve("Optimized", o_tokens, optimized['context_tokens']['growth'])
+        print()
+    
+    if baseline.get('memory') and optimized.get('memory'):
+        print("🧠 MEMORY (per run; tracemalloc bytes attributed to agno's phases):")
+        print("-" * 90)
+        print_memory_comparison(baseline['memory'], optimized['memory'])
+        print()
+    
     print("=" * 90)
 
 
@@ -372,17 +734,66 @@ Try it: https://docs.agno.com/examples/concepts/agent/context_management/filter_
 """
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="max_tool_calls_from_history benchmark")
+    parser.add_argument("--queries", type=int, default=len(BENCHMARK_QUERIES),
+                        help="Number of runs per session (cycles through BENCHMARK_QUERIES)")
+    parser.add_argument("--skip-verify", action="store_true",
+                        help="Skip the final ledger check against the SqliteDb")
+    parser.add_argument("--profile-context", action="store_true",
+                        help="Tokenize every model request and break context down by component")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="default",
+                        help="Session storage: default SqliteDb, or append-only run rows")
+    parser.add_argument("--tool-latency-ms", type=float, default=0.0,
+                        help="Synthetic latency of each get_info_about_topic call (default: 0)")
+    parser.add_argument("--tool-latency-jitter-ms", type=float, default=0.0,
+                        help="Uniform ± jitter on the synthetic tool latency (default: 0)")
+    parser.add_argument("--fanout", type=int, default=1,
+                        help="Topics per query; >1 asks \"Compare X, Y and Z\" for parallel tool calls (default: 1)")
+    parser.add_argument("--tool-execution", choices=EXECUTION_MODES, default="serial",
+                        help="Run a response's tool calls serially (agno's default), on a thread pool, "
+                             "or via agent.arun (asyncio)")
+    parser.add_argument("--track-memory", action="store_true",
+                        help="Record per-run RSS and tracemalloc allocations (slows runs down)")
+    add_tool_cache_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_offline_arguments(parser)
+    add_results_store_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Run guaranteed tool call benchmark"""
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    if args.seed is not None:
+        seed_tools(args.seed)
+    set_tool_latency(args.tool_latency_ms, args.tool_latency_jitter_ms)
+
     print("\n🎯 GUARANTEED TOOL CALLS BENCHMARK")
     print("=" * 90)
     print("Using simple function that ALWAYS gets called (like official Agno example)")
-    print(f"Running {len(BENCHMARK_QUERIES)} queries...")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    topics = build_topics(args.queries, args.fanout)
+    verify = not args.skip_verify
+    print(f"Running {len(topics)} queries...")
     print("=" * 90)
     
     # Run both agents
-    baseline_results = run_baseline_agent(BENCHMARK_QUERIES)
-    optimized_results = run_optimized_agent(BENCHMARK_QUERIES, max_history_limit=3)
+    baseline_results = run_baseline_agent(
+        topics, model=build_model(MODEL_ID, **client_options(model_options, args)), verify=verify,
+        series_path=f"tmp/run_series_baseline_{timestamp}.jsonl", profile_context=args.profile_context,
+        storage=args.storage, tool_cache=tool_cache_from_args(args), tool_execution=args.tool_execution,
+        scheduler=scheduler_from_args(args), track_memory=args.track_memory,
+    )
+    optimized_results = run_optimized_agent(
+        topics, max_history_limit=3, model=build_model(MODEL_ID, **client_options(model_options, args)),
+        verify=verify,
+        series_path=f"tmp/run_series_optimized_{timestamp}.jsonl", profile_context=args.profile_context,
+        storage=args.storage, tool_cache=tool_cache_from_args(args), tool_execution=args.tool_execution,
+        scheduler=scheduler_from_args(args), track_memory=args.track_memory,
+    )
     
     # Calculate and display
     comparison = calculate_metrics(baseline_results, optimized_results)
@@ -396,13 +807,23 @@ def main():
     print(linkedin_post)
     
     # Save results
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
     with open(f"benchmark_results_guaranteed_{timestamp}.json", 'w') as f:
         json.dump({'comparison': comparison}, f, indent=2)
     
     with open(f"linkedin_post_guaranteed_{timestamp}.txt", 'w') as f:
         f.write(linkedin_post)
+
+    record_from_args(
+        args, RESULTS_BENCHMARK, comparison,
+        config={'queries': len(topics), 'max_history_limit': 3, 'storage': args.storage,
+                'profile_context': args.profile_context, 'tool_latency_ms': args.tool_latency_ms,
+                'tool_latency_jitter_ms': args.tool_latency_jitter_ms, 'memoize_tools': args.memoize_tools,
+                'tool_cache_ttl': args.tool_cache_ttl, 'tool_cache_size': args.tool_cache_size,
+                'fanout': args.fanout, 'tool_execution': args.tool_execution, 'rpm': args.rpm, 'tpm': args.tpm,
+                'track_memory': args.track_memory,
+                **model_options},
+        model=f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}",
+    )
     
     print(f"\n✅ Files saved with timestamp: {timestamp}")
     print("\n🎉 Benchmark complete with REAL savings!")
@@ -0,0 +1,191 @@
+"""
+Token-budget vs count-limited tool call history.
+
+Runs the benchmark session with tool results of widely varying size (padded
+log-uniformly between --tool-result-chars bounds) and filters history three
+ways:
+
+- count:   max_tool_calls_from_history=--limit (agno's built-in filter)
+- budget:  TokenBudgetFilter(--budget) from history_filter.py
+- dedupe:  TokenBudgetFilter(--budget, dedupe=True), also collapsing repeated
+           calls with the same arguments
+
+Queries are drawn at random (seeded) from --distinct-topics topics, so the
+same call recurs within a few runs, as it does in real sessions.
+
+For each it reports input tokens per run, the tokens of historical tool results
+per model request (p50 / p95 / max, and their coefficient of variation, i.e.
+how predictable they are), latency and the time spent building the context.
+A run makes several model requests (the tool call, then the answer), each
+sending the same history, so per request is what --budget bounds.
+
+Usage:
+    python budget_benchmark.py --offline --queries 150
+    python budget_benchmark.py --offline --queries 150 --limit 3 --budget 1500 --tool-result-chars 20,20000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+from benchmark import (
+    MODEL_ID,
+    BENCHMARK_QUERIES,
+    add_offline_arguments,
+    build_model,
+    model_options_from_args,
+    offline_enabled,
+    run_baseline_agent,
+    run_optimized_agent,
+    seed_tools,
+    set_tool_result_size,
+)
+from history_filter import TokenBudgetFilter
+from percentiles import percentile
+from results_store import add_results_store_arguments, record_from_args
+
+RESULTS_BENCHMARK = "history_budget"
+
+
+def distribution(values):
+    ordered = sorted(values)
+    mean = sum(ordered) / len(ordered) if ordered else 0.0
+    return {
+        'mean': mean,
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'max': ordered[-1] if ordered else 0,
+        'cv': statistics.pstdev(ordered) / mean if len(ordered) > 1 and mean else 0.0,
+    }
+
+
+def summarize(name, result):
+    """Per-run token and latency distributions of one configuration"""
+    per_run = result['context_tokens']['per_run']
+    # The profiler sums each component over a run's model calls; --budget applies to each call
+    history_per_request = [tokens / calls if calls else 0.0
+                           for tokens, calls in zip(per_run['history_tool'], per_run['model_calls'])]
+    return {
+        'config': name,
+        'filter': result.get('history_filter') or 'unlimited',
+        'total_tokens': result['metrics']['total_tokens'],
+        'input_tokens_per_run': distribution(result['series']['input_tokens']),
+        'history_tool_tokens_per_request': distribution(history_per_request),
+        'avg_context_per_query': result['avg_context_per_query'],
+        'latency_s': result['latency_s'],
+        'context_build_ms': result['phases']['summary']['context_build']['mean_ms'],
+        'elapsed_time': result['elapsed_time'],
+    }
+
+
+def run_config(name, topics, model_options, seed, db_dir, limit=None, history_filter=None):
+    """Run one configuration from the same seed and return its summary"""
+    seed_tools(seed)
+    model = build_model(MODEL_ID, **{**model_options, 'seed': seed})
+    db_file = os.path.join(db_dir, f"{name}.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        if name == "baseline":
+            result = run_baseline_agent(topics, model=model, verify=False, db_file=db_file, profile_context=True)
+        else:
+            result = run_optimized_agent(
+                topics, max_history_limit=limit, model=model, verify=False, db_file=db_file,
+                profile_context=True, history_filter=history_filter,
+            )
+    return summarize(name, result)
+
+
+def print_report(rows):
+    print("\n" + "=" * 100)
+    print("📊 HISTORY FILTERS (p50 / p95 / max)")
+    print("=" * 100)
+    print(f"{'Config':<8} | {'Filter':<25} | {'Input tokens/run':>24} | {'History tool tok/request':>24} | "
+          f"{'CV':>5} | {'Lat p50':>8}")
+    print("-" * 100)
+    for r in rows:
+        i, h = r['input_tokens_per_run'], r['history_tool_tokens_per_request']
+        print(f"{r['config']:<8} | {r['filter']:<25} | "
+              f"{i['p50']:>7,.0f} /{i['p95']:>7,.0f} /{i['max']:>7,.0f} | "
+              f"{h['p50']:>7,.0f} /{h['p95']:>7,.0f} /{h['max']:>7,.0f} | {h['cv']:>5.2f} | "
+              f"{r['latency_s']['p50'] * 1000:>6.1f}ms")
+    print("-" * 100)
+    for r in rows:
+        print(f"  {r['config']:<10} total tokens {r['total_tokens']:>12,} | tool calls in context "
+              f"{r['avg_context_per_query']:>5.1f}/run | context build {r['context_build_ms']:>6.2f}ms/run")
+    print("=" * 100)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=150, help="Runs per session (default: 150)")
+    parser.add_argument("--limit", type=int, default=3, help="Count limit to compare against (default: 3)")
+    parser.add_argument("--budget", type=int, default=1500,
+                        help="Token budget for historical tool calls (default: 1500)")
+    parser.add_argument("--tool-result-chars", default="20,20000",
+                        help="min,max characters of each tool result (default: 20,20000)")
+    parser.add_argument("--distinct-topics", type=int, default=10,
+                        help="Topics the queries are drawn from (default: 10)")
+    parser.add_argument("--include-baseline", action="store_true", help="Also run unlimited history")
+    parser.add_argument("--db-dir", default=None, help="Directory for the session databases")
+    add_offline_arguments(parser)
+    add_results_store_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.seed is None:
+        args.seed = 42
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    min_chars, max_chars = (int(v) for v in args.tool_result_chars.split(","))
+    set_tool_result_size(min_chars, max_chars)
+    rng = random.Random(args.seed)
+    pool = BENCHMARK_QUERIES[:args.distinct_topics]
+    topics = [rng.choice(pool) for _ in range(args.queries)]
+    db_dir = args.db_dir or os.path.join("tmp", f"budget_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(db_dir, exist_ok=True)
+
+    print("\n💰 TOKEN-BUDGET HISTORY FILTER BENCHMARK")
+    print("=" * 100)
+    print(f"Queries: {args.queries} | Count limit: {args.limit} | Budget: {args.budget:,} tokens | "
+          f"Tool results: {min_chars:,}–{max_chars:,} chars")
+    print("=" * 100)
+
+    configs = [("baseline", {})] if args.include_baseline else []
+    configs += [
+        ("count", {'limit': args.limit}),
+        ("budget", {'history_filter': TokenBudgetFilter(args.budget)}),
+        ("dedupe", {'history_filter': TokenBudgetFilter(args.budget, dedupe=True)}),
+    ]
+    rows = []
+    start = time.time()
+    for name, options in configs:
+        rows.append(run_config(name, topics, model_options, args.seed, db_dir, **options))
+        print(f"  ✓ {name:<8} {rows[-1]['elapsed_time']:.1f}s")
+    print_report(rows)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"budget_results_{timestamp}.json"
+    results = {'configs': rows, 'elapsed_time': time.time() - start}
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, results,
+        config={'queries': args.queries, 'distinct_topics': args.distinct_topics, 'limit': args.limit,
+                'budget': args.budget, 'tool_result_chars': [min_chars, max_chars],
+                'include_baseline': args.include_baseline,
+                **model_options},
+        model=f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Token-accurate context profiling per run.
+
+The benchmark's "context" metric counts tool calls, which is only a proxy for
+what a run costs. ContextProfiler hooks the model's invoke methods, tokenizes
+the messages and tool definitions actually sent on every model call, and
+attributes the tokens to:
+
+- system:             system/developer messages
+- tool_definitions:   the JSON schemas of the tools offered to the model
+- history_user:       user turns replayed from earlier runs
+- history_assistant:  assistant turns (including tool calls) from earlier runs
+- history_tool:       tool results from earlier runs
+- current_turn:       this run's user message, tool calls and tool results
+
+Each run records the sum over its model calls (what is billed) and the largest
+single call (how full the context window gets). Tokens come from tiktoken when
+it is available offline, else from the bundled approximation in
+shared/tokenizer.py.
+"""
+
+import os
+import sys
+from array import array
+from functools import wraps
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from tokenizer import TOKENS_PER_REPLY, Tokenizer  # noqa: E402
+
+COMPONENTS = ("system", "tool_definitions", "history_user", "history_assistant", "history_tool", "current_turn")
+INVOKE_METHODS = ("invoke", "ainvoke", "invoke_stream", "ainvoke_stream")
+
+
+def classify(message):
+    """Context component a message belongs to"""
+    if message.role in ("system", "developer"):
+        return "system"
+    if getattr(message, "from_history", False):
+        if message.role == "user":
+            return "history_user"
+        if message.role == "tool":
+            return "history_tool"
+        return "history_assistant"
+    return "current_turn"
+
+
+class ContextProfiler:
+    """Per-run token breakdown of the context sent to the model"""
+
+    COLUMNS = ("run", "model_calls") + COMPONENTS + ("total", "peak_call")
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer or Tokenizer()
+        self.columns = {name: array("q") for name in self.COLUMNS}
+        self._current = None
+
+    def instrument(self, agent):
+        """Wrap the invoke methods of agent.model in place"""
+        model = agent.model
+        for name in INVOKE_METHODS:
+            method = getattr(model, name, None)
+            if method is None or getattr(method, "_context_profiler", None) is self:
+                continue
+            wrapper = self._wrap(method)
+            wrapper._context_profiler = self
+            setattr(model, name, wrapper)
+        return self
+
+    def _wrap(self, fn):
+        # Recording happens when the call is made, so one wrapper serves
+        # functions, coroutines and (async) generators alike
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            self.record_call(kwargs.get("messages", args[0] if args else []), kwargs.get("tools"))
+            return fn(*args, **kwargs)
+        return wrapper
+
+    # --- Recording ---------------------------------------------------------
+
+    def begin_run(self):
+        self._current = {"model_calls": 0, "peak_call": 0, **dict.fromkeys(COMPONENTS, 0)}
+
+    def record_call(self, messages, tools):
+        """Tokenize one model request and add it to the current run"""
+        if self._current is None:
+            self.begin_run()
+        call = dict.fromkeys(COMPONENTS, 0)
+        for message in messages or []:
+            call[classify(message)] += self.tokenizer.count_message(message)
+        call["tool_definitions"] = self.tokenizer.count_tools(tools)
+        call["current_turn"] += TOKENS_PER_REPLY
+        for name in COMPONENTS:
+            self._current[name] += call[name]
+        self._current["model_calls"] += 1
+        self._current["peak_call"] = max(self._current["peak_call"], sum(call.values()))
+        return call
+
+    def end_run(self):
+        """Close the current run and return its record (tokens)"""
+        record = self._current or {"model_calls": 0, "peak_call": 0, **dict.fromkeys(COMPONENTS, 0)}
+        record["run"] = len(self) + 1
+        record["total"] = sum(record[name] for name in COMPONENTS)
+        for name in self.COLUMNS:
+            self.columns[name].append(record[name])
+        self._current = None
+        return record
+
+    def __len__(self):
+        return len(self.columns["run"])
+
+    # --- Aggregation -------------------------------------------------------
+
+    def summary(self):
+        """Total tokens per component, share of all context tokens, and final-run peak"""
+        grand_total = sum(self.columns["total"]) or 1
+        return {
+            'tokenizer': self.tokenizer.name,
+            'runs': len(self),
+            'total_tokens': sum(self.columns["total"]),
+            'components': {
+                name: {
+                    'total': sum(self.columns[name]),
+                    'share_pct': sum(self.columns[name]) / grand_total * 100,
+                    'last_run': self.columns[name][-1] if len(self) else 0,
+                }
+                for name in COMPONENTS
+            },
+            'peak_call_last_run': self.columns["peak_call"][-1] if len(self) else 0,
+            'peak_call_max': max(self.columns["peak_call"]) if len(self) else 0,
+        }
+
+    def growth_curve(self, points=10):
+        """Per-run records at ~`points` evenly spaced runs (always including first and last)"""
+        runs = len(self)
+        if runs == 0:
+            return []
+        indexes = sorted({0, runs - 1} | {round(i * (runs - 1) / max(1, points - 1)) for i in range(points)})
+        return [{name: self.columns[name][i] for name in self.COLUMNS} for i in indexes]
+
+    def to_columns(self):
+        """Per-run records as a columnar dict of plain lists"""
+        return {name: self.columns[name].tolist() for name in self.COLUMNS}
+
+
+def print_growth_curve(label, summary, growth):
+    """Print one agent's context composition at evenly spaced runs"""
+    short = {
+        "system": "system", "tool_definitions": "tools", "history_user": "h.user",
+        "history_assistant": "h.asst", "history_tool": "h.tool", "current_turn": "current",
+    }
+    print(f"  {label} (tokenizer: {summary['tokenizer']}):")
+    print(f"  {'Run':>6} | " + " | ".join(f"{short[name]:>8}" for name in COMPONENTS) +
+          f" | {'Total':>8} | {'Peak call':>9}")
+    for row in growth:
+        print(f"  {row['run']:>6} | " + " | ".join(f"{row[name]:>8,}" for name in COMPONENTS) +
+              f" | {row['total']:>8,} | {row['peak_call']:>9,}")
+    shares = ", ".join(
+        f"{short[name]} {summary['components'][name]['share_pct']:.0f}%" for name in COMPONENTS
+        if summary['components'][name]['total']
+    )
+    print(f"  Share of all context tokens: {shares}")
@@ -0,0 +1,162 @@
+"""
+Per-run latency of fan-out queries with serial vs concurrent tool execution.
+
+Every BENCHMARK_QUERIES prompt triggers one tool call. Here each run asks
+"Compare X, Y and Z" over `fanout` topics, and the model answers with one tool
+call per topic in a single response. get_info_about_topic is given a
+synthetic latency (--tool-latency-ms), and for each fan-out in --fanouts the
+optimized agent runs the same session once per execution mode:
+
+- serial:   agno's synchronous path, one tool call after another
+- threads:  ParallelToolCalls (../shared/parallel_tools.py), the response's
+            calls on a thread pool
+- async:    agent.arun, which gathers the calls on asyncio
+
+It reports run latency p50 / p95, the mean time per run in the tool execution
+phase, and each mode's latency reduction against serial at the same fan-out.
+
+Usage:
+    python fanout_benchmark.py --offline --fanouts 1,2,4,8 --queries 20 --tool-latency-ms 100
+    python fanout_benchmark.py --offline --modes serial,threads --tool-latency-ms 300 --tool-latency-jitter-ms 100
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from benchmark import (
+    MODEL_ID,
+    EXECUTION_MODES,
+    add_offline_arguments,
+    build_model,
+    build_topics,
+    model_options_from_args,
+    offline_enabled,
+    run_optimized_agent,
+    seed_tools,
+    set_tool_latency,
+)
+from results_store import add_results_store_arguments, record_from_args
+
+RESULTS_BENCHMARK = "tool_fanout"
+
+
+def run_config(fanout, mode, topics, model_options, seed, db_dir, limit):
+    """Run one fan-out / execution mode cell from `seed` and return its summary"""
+    seed_tools(seed)
+    model = build_model(MODEL_ID, **{**model_options, 'seed': seed})
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_optimized_agent(
+            topics, max_history_limit=limit, model=model, verify=False,
+            db_file=os.path.join(db_dir, f"fanout_{fanout}_{mode}.db"), tool_execution=mode,
+        )
+    return {
+        'fanout': fanout,
+        'mode': mode,
+        'tool_calls': result['total_in_db'],
+        'latency_s': result['latency_s'],
+        'tool_execution_ms': result['phases']['summary']['tool_execution']['mean_ms'],
+        'elapsed_time': result['elapsed_time'],
+        'total_tokens': result['metrics']['total_tokens'],
+        'parallel_tools': result['parallel_tools'],
+    }
+
+
+def add_reductions(rows):
+    """Latency reduction of each row against the serial row with the same fan-out"""
+    serial = {r['fanout']: r for r in rows if r['mode'] == "serial"}
+    for r in rows:
+        base = serial.get(r['fanout'])
+        if base is None or not base['latency_s']['p50']:
+            r['latency_reduction_pct'] = None
+            continue
+        r['latency_reduction_pct'] = {
+            q: (base['latency_s'][q] - r['latency_s'][q]) / base['latency_s'][q] * 100 for q in ('mean', 'p50', 'p95')
+        }
+    return rows
+
+
+def print_report(rows):
+    print("\n" + "=" * 90)
+    print("📊 TOOL FAN-OUT (per run)")
+    print("=" * 90)
+    print(f"{'Fan-out':>7} | {'Mode':<8} | {'Lat p50':>9} | {'Lat p95':>9} | {'Tool ms/run':>11} | "
+          f"{'p50 vs serial':>13}")
+    print("-" * 90)
+    for r in rows:
+        reduction = r['latency_reduction_pct']
+        versus = f"{-reduction['p50']:+.1f}%" if reduction and r['mode'] != "serial" else "-"
+        print(f"{r['fanout']:>7} | {r['mode']:<8} | {r['latency_s']['p50'] * 1000:>7.1f}ms | "
+              f"{r['latency_s']['p95'] * 1000:>7.1f}ms | {r['tool_execution_ms']:>9.1f}ms | {versus:>13}")
+    print("=" * 90)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fanouts", default="1,2,4,8", help="Topics per query (default: 1,2,4,8)")
+    parser.add_argument("--modes", default=",".join(EXECUTION_MODES),
+                        help=f"Execution modes to compare (default: {','.join(EXECUTION_MODES)})")
+    parser.add_argument("--queries", type=int, default=20, help="Runs per session (default: 20)")
+    parser.add_argument("--limit", type=int, default=3, help="max_tool_calls_from_history (default: 3)")
+    parser.add_argument("--tool-latency-ms", type=float, default=100.0,
+                        help="Synthetic latency of each tool call (default: 100)")
+    parser.add_argument("--tool-latency-jitter-ms", type=float, default=0.0,
+                        help="Uniform ± jitter on the tool latency (default: 0)")
+    parser.add_argument("--db-dir", default=None, help="Directory for the session databases")
+    add_offline_arguments(parser)
+    add_results_store_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.seed is None:
+        args.seed = 42
+    args.fanouts = [int(v) for v in args.fanouts.split(",")]
+    args.modes = args.modes.split(",")
+    unknown = set(args.modes) - set(EXECUTION_MODES)
+    if unknown:
+        parser.error(f"unknown execution modes: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    set_tool_latency(args.tool_latency_ms, args.tool_latency_jitter_ms)
+    db_dir = args.db_dir or os.path.join("tmp", f"fanout_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(db_dir, exist_ok=True)
+
+    print("\n🪭 TOOL FAN-OUT BENCHMARK")
+    print("=" * 90)
+    print(f"Fan-outs: {args.fanouts} | Modes: {', '.join(args.modes)} | Queries: {args.queries} | "
+          f"Tool latency: {args.tool_latency_ms:g}±{args.tool_latency_jitter_ms:g}ms")
+    print("=" * 90)
+
+    start = time.time()
+    rows = []
+    for fanout in args.fanouts:
+        topics = build_topics(args.queries, fanout)
+        for mode in args.modes:
+            rows.append(run_config(fanout, mode, topics, model_options, args.seed, db_dir, args.limit))
+            print(f"  ✓ fan-out {fanout:<3} {mode:<8} {rows[-1]['elapsed_time']:.1f}s")
+    print_report(add_reductions(rows))
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"fanout_results_{timestamp}.json"
+    results = {'configs': rows, 'elapsed_time': time.time() - start}
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, results,
+        config={'fanouts': args.fanouts, 'modes': args.modes, 'queries': args.queries, 'limit': args.limit,
+                'tool_latency_ms': args.tool_latency_ms, 'tool_latency_jitter_ms': args.tool_latency_jitter_ms,
+                **model_options},
+        model=f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,43 @@
 """
 Generate visual charts for the benchmark comparison.
-Creates publication-ready charts (300 DPI) showing token and cost savings.
+Creates publication-ready charts (300 DPI) showing context, token and cost savings.
+
+Charts are built from the results file benchmark.py writes: the comparison
+summary plus the per-run series (tool calls in context, tokens and latency of
+every run). The scaling projection fits the measured per-run series with NumPy
+instead of assuming a growth model.
+
+Each chart is named after a hash of the data it is drawn from, so re-running on
+unchanged results skips charts that already exist. Charts render in parallel
+worker processes on the headless Agg backend.
+
+Results come from the newest max_tool_calls run in benchmark_results.db (or
+--run-id), falling back to the newest benchmark_results_guaranteed_*.json.
+
+Usage:
+    python generate_charts.py
+    python generate_charts.py --run-id max_tool_calls-20250101_120000-1a2b3c --project-runs 500
+    python generate_charts.py --results benchmark_results_guaranteed_20250101_120000.json
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from datetime import datetime
+import argparse
+import glob
+import hashlib
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
-# Set style for professional charts
-plt.style.use('seaborn-v0_8-darkgrid')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from results_store import DEFAULT_PATH, ResultsStore  # noqa: E402
+from benchmark import token_cost  # noqa: E402
+
+# Benchmark name benchmark.py records its runs under
+RESULTS_BENCHMARK = "max_tool_calls"
+# Bump when chart drawing changes so cached charts are redrawn
+CHART_VERSION = 3
 COLORS = {
     'baseline': '#FF6B6B',  # Red
     'optimized': '#4ECDC4',  # Teal
@@ -18,260 +45,306 @@ COLORS = {
 }
 
 
-def create_tool_calls_comparison_chart(comparison, filename=None):
-    """Create a bar chart comparing tool calls in context"""
-    baseline = comparison['baseline']
-    optimized = comparison['optimized']
-    savings = comparison['savings']
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    categories = ['Tool Calls\nin Context']
-    baseline_vals = [baseline['tool_calls_in_context']]
-    optimized_vals = [optimized['tool_calls_in_context']]
-    
-    x = range(len(categories))
+def _pyplot():
+    """Import pyplot on the headless Agg backend (only in processes that draw)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.style.use('seaborn-v0_8-darkgrid')
+    return plt
+
+
+def _save(plt, fig, filename, dpi):
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return filename
+
+
+def _label_bars(ax, bars, fmt):
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height, fmt(height),
+                ha='center', va='bottom', fontweight='bold', fontsize=11)
+
+
+def _paired_bars(ax, categories, baseline_vals, optimized_vals, optimized_label, fmt):
+    x = np.arange(len(categories))
     width = 0.35
-    
-    bars1 = ax.bar([i - width/2 for i in x], baseline_vals, width, 
-                    label='Without Optimization', color=COLORS['baseline'], alpha=0.8)
-    bars2 = ax.bar([i + width/2 for i in x], optimized_vals, width,
-                    label='With max_tool_calls_from_history=3', color=COLORS['optimized'], alpha=0.8)
-    
-    # Add value labels on bars
-    for bars in [bars1, bars2]:
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}',
-                   ha='center', va='bottom', fontweight='bold', fontsize=12)
-    
-    ax.set_ylabel('Number of Tool Calls', fontsize=12, fontweight='bold')
-    ax.set_title('Tool Calls in Context: Baseline vs Optimized', 
-                 fontsize=14, fontweight='bold', pad=20)
+    bars1 = ax.bar(x - width / 2, baseline_vals, width,
+                   label='Without Optimization', color=COLORS['baseline'], alpha=0.8)
+    bars2 = ax.bar(x + width / 2, optimized_vals, width,
+                   label=optimized_label, color=COLORS['optimized'], alpha=0.8)
+    _label_bars(ax, bars1, fmt)
+    _label_bars(ax, bars2, fmt)
     ax.set_xticks(x)
     ax.set_xticklabels(categories, fontsize=11)
+
+
+def _annotate_savings(ax, x, y, text):
+    ax.text(x, y, text, ha='center', fontsize=13, fontweight='bold',
+            bbox=dict(boxstyle='round', facecolor=COLORS['accent'], alpha=0.7))
+
+
+# --- Chart inputs ------------------------------------------------------------
+
+def series_arrays(side):
+    """Per-run series of one agent as NumPy arrays, or None for results without a series"""
+    series = side.get('series')
+    if not series or not series.get('run'):
+        return None
+    arrays = {name: np.asarray(values) for name, values in series.items()}
+    arrays['context_tool_calls'] = arrays['history_tool_calls'] + arrays['current_tool_calls']
+    return arrays
+
+
+def tool_calls_inputs(comparison):
+    def side(s):
+        arrays = series_arrays(s)
+        return {
+            'avg_context_per_query': s['avg_context_per_query'],
+            'final_context': int(arrays['context_tool_calls'][-1]) if arrays is not None else None,
+        }
+    return {
+        'baseline': side(comparison['baseline']),
+        'optimized': side(comparison['optimized']),
+        'max_history_limit': comparison['optimized'].get('max_history_limit'),
+        'context_reduction_pct': comparison['savings']['context_reduction_pct'],
+    }
+
+
+def token_cost_inputs(comparison):
+    baseline, optimized = comparison['baseline'], comparison['optimized']
+    if not baseline.get('metrics') or not optimized.get('metrics'):
+        return None
+    return {
+        'baseline': baseline['metrics'],
+        'optimized': optimized['metrics'],
+        'max_history_limit': optimized.get('max_history_limit'),
+        'token_savings_pct': comparison['savings']['token_savings_pct'],
+        'cost_savings_pct': comparison['savings']['cost_savings_pct'],
+    }
+
+
+def scaling_inputs(comparison, project_runs=None):
+    baseline, optimized = series_arrays(comparison['baseline']), series_arrays(comparison['optimized'])
+    if baseline is None or optimized is None:
+        return None
+    measured = int(max(baseline['run'][-1], optimized['run'][-1]))
+    return {
+        'baseline': {name: baseline[name].tolist() for name in ('run', 'context_tool_calls', 'input_tokens')},
+        'optimized': {name: optimized[name].tolist() for name in ('run', 'context_tool_calls', 'input_tokens')},
+        'max_history_limit': comparison['optimized'].get('max_history_limit'),
+        'project_runs': project_runs or max(100, 4 * measured),
+    }
+
+
+def fit_growth(runs, values):
+    """Linear fit of a per-run series, as numpy.polyfit coefficients"""
+    runs = np.asarray(runs, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(runs) < 2:
+        return np.array([0.0, values[-1] if len(values) else 0.0])
+    return np.polyfit(runs, values, 1)
+
+
+def project(side, project_runs, settled=False):
+    """
+    Fitted context tool calls and input tokens per run for runs 1..project_runs.
+
+    A capped series (the optimized agent) grows only until it reaches its cap,
+    so with settled=True it is fitted on its second half only.
+    """
+    runs = np.asarray(side['run'])
+    start = len(runs) // 2 if settled and len(runs) >= 4 else 0
+    grid = np.arange(1, project_runs + 1)
+    context = np.polyval(fit_growth(runs[start:], side['context_tool_calls'][start:]), grid)
+    tokens = np.polyval(fit_growth(runs[start:], side['input_tokens'][start:]), grid)
+    return grid, np.maximum(context, 0), np.maximum(tokens, 0)
+
+
+# --- Charts ------------------------------------------------------------------
+
+def create_tool_calls_comparison_chart(inputs, filename, dpi=300):
+    """Bar chart of tool calls in context: average per run and in the final run"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    categories = ['Avg per Run']
+    baseline_vals = [inputs['baseline']['avg_context_per_query']]
+    optimized_vals = [inputs['optimized']['avg_context_per_query']]
+    if inputs['baseline']['final_context'] is not None and inputs['optimized']['final_context'] is not None:
+        categories.append('Final Run')
+        baseline_vals.append(inputs['baseline']['final_context'])
+        optimized_vals.append(inputs['optimized']['final_context'])
+
+    _paired_bars(ax, categories, baseline_vals, optimized_vals,
+                 f"With max_tool_calls_from_history={inputs['max_history_limit']}", lambda h: f'{h:,.1f}')
+    ax.set_ylabel('Tool Calls in Context', fontsize=12, fontweight='bold')
+    ax.set_title('Tool Calls in Context: Baseline vs Optimized', fontsize=14, fontweight='bold', pad=20)
     ax.legend(fontsize=10)
-    
-    # Add savings annotation
-    ax.text(0, max(baseline_vals) * 0.85, 
-           f'{savings["tool_call_reduction_pct"]:.1f}% Reduction',
-           ha='center', fontsize=14, fontweight='bold',
-           bbox=dict(boxstyle='round', facecolor=COLORS['accent'], alpha=0.7))
-    
-    plt.tight_layout()
-    
-    if filename:
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        print(f"✅ Chart saved: {filename}")
-    else:
-        plt.show()
-    
-    plt.close()
-
-
-def create_token_cost_comparison_chart(comparison, filename=None):
-    """Create a grouped bar chart comparing tokens and costs"""
-    baseline = comparison['baseline']
-    optimized = comparison['optimized']
-    savings = comparison['savings']
-    
-    if not baseline['metrics'] or not optimized['metrics']:
-        print("⚠️  No token metrics available, skipping token/cost chart")
-        return
-    
+    _annotate_savings(ax, 0, max(baseline_vals) * 0.85, f"{inputs['context_reduction_pct']:.1f}% Reduction")
+    return _save(plt, fig, filename, dpi)
+
+
+def create_token_cost_comparison_chart(inputs, filename, dpi=300):
+    """Grouped bar charts comparing total tokens and cost"""
+    plt = _pyplot()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-    
-    # Token comparison
-    categories = ['Tokens']
-    baseline_tokens = [baseline['metrics']['total_tokens']]
-    optimized_tokens = [optimized['metrics']['total_tokens']]
-    
-    x = range(len(categories))
-    width = 0.35
-    
-    bars1 = ax1.bar([i - width/2 for i in x], baseline_tokens, width,
-                     label='Without Optimization', color=COLORS['baseline'], alpha=0.8)
-    bars2 = ax1.bar([i + width/2 for i in x], optimized_tokens, width,
-                     label='With Optimization', color=COLORS['optimized'], alpha=0.8)
-    
-    # Add value labels
-    for bars in [bars1, bars2]:
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height):,}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
+    baseline, optimized = inputs['baseline'], inputs['optimized']
+    optimized_label = f"With max_tool_calls_from_history={inputs['max_history_limit']}"
+
+    _paired_bars(ax1, ['Tokens'], [baseline['total_tokens']], [optimized['total_tokens']],
+                 optimized_label, lambda h: f'{int(h):,}')
     ax1.set_ylabel('Total Tokens', fontsize=12, fontweight='bold')
     ax1.set_title('Token Usage Comparison', fontsize=13, fontweight='bold')
-    ax1.set_xticks(x)
-    ax1.set_xticklabels(categories, fontsize=11)
     ax1.legend(fontsize=9)
-    
-    # Add savings annotation
-    ax1.text(0, max(baseline_tokens) * 0.75,
-            f'{savings["token_savings_pct"]:.1f}% Savings',
-            ha='center', fontsize=13, fontweight='bold',
-            bbox=dict(boxstyle='round', facecolor=COLORS['accent'], alpha=0.7))
-    
-    # Cost comparison
-    baseline_cost = (baseline['metrics']['input_tokens'] * 0.00015 + 
-                    baseline['metrics']['output_tokens'] * 0.0006)
-    optimized_cost = (optimized['metrics']['input_tokens'] * 0.00015 + 
-                     optimized['metrics']['output_tokens'] * 0.0006)
-    
-    bars3 = ax2.bar([i - width/2 for i in x], [baseline_cost], width,
-                     label='Without Optimization', color=COLORS['baseline'], alpha=0.8)
-    bars4 = ax2.bar([i + width/2 for i in x], [optimized_cost], width,
-                     label='With Optimization', color=COLORS['optimized'], alpha=0.8)
-    
-    # Add value labels
-    for bars in [bars3, bars4]:
-        for bar in bars:
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height,
-                    f'${height:.4f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
+    _annotate_savings(ax1, 0, baseline['total_tokens'] * 0.75, f"{inputs['token_savings_pct']:.1f}% Savings")
+
+    def cost(m):
+        return token_cost(m['input_tokens'], m['output_tokens'])
+
+    _paired_bars(ax2, ['Cost'], [cost(baseline)], [cost(optimized)], optimized_label, lambda h: f'${h:.4f}')
     ax2.set_ylabel('Cost (USD)', fontsize=12, fontweight='bold')
     ax2.set_title('Cost Comparison (GPT-4o-mini)', fontsize=13, fontweight='bold')
-    ax2.set_xticks(x)
-    ax2.set_xticklabels(['Cost'], fontsize=11)
     ax2.legend(fontsize=9)
-    
-    # Add savings annotation
-    ax2.text(0, max([baseline_cost]) * 0.75,
-            f'{savings["cost_savings_pct"]:.1f}% Savings',
-            ha='center', fontsize=13, fontweight='bold',
-            bbox=dict(boxstyle='round', facecolor=COLORS['accent'], alpha=0.7))
-    
-    plt.suptitle('Token & Cost Impact of max_tool_calls_from_history',
+    _annotate_savings(ax2, 0, cost(baseline) * 0.75, f"{inputs['cost_savings_pct']:.1f}% Savings")
+
+    fig.suptitle('Token & Cost Impact of max_tool_calls_from_history', fontsize=15, fontweight='bold', y=1.02)
+    return _save(plt, fig, filename, dpi)
+
+
+def create_scaling_projection_chart(inputs, filename, dpi=300):
+    """Measured per-run context growth with a fitted projection to more runs"""
+    plt = _pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    limit = inputs['max_history_limit']
+    horizon = inputs['project_runs']
+
+    for name, settled, marker in (('baseline', False, 'o'), ('optimized', True, 's')):
+        side = inputs[name]
+        label = 'Without Optimization' if name == 'baseline' else f'With max_tool_calls_from_history={limit}'
+        grid, context, tokens = project(side, horizon, settled=settled)
+        # Thin the measured points so long series stay readable
+        step = max(1, len(side['run']) // 50)
+        ax1.plot(side['run'][::step], side['context_tool_calls'][::step], marker, markersize=4,
+                 color=COLORS[name], alpha=0.6)
+        ax1.plot(grid, context, '-', linewidth=3, color=COLORS[name], alpha=0.8, label=f'{label} (fit)')
+        measured_cumulative = np.cumsum(side['input_tokens'])
+        ax2.plot(side['run'][::step], measured_cumulative[::step], marker, markersize=4,
+                 color=COLORS[name], alpha=0.6)
+        ax2.plot(grid, np.cumsum(tokens), '-', linewidth=3, color=COLORS[name], alpha=0.8, label=f'{label} (fit)')
+
+    measured = max(inputs['baseline']['run'][-1], inputs['optimized']['run'][-1])
+    for ax in (ax1, ax2):
+        ax.axvline(x=measured, color='gray', linestyle=':', linewidth=2, alpha=0.7, label=f'Measured up to run {measured}')
+        ax.set_xlabel('Run', fontsize=13, fontweight='bold')
+        ax.legend(fontsize=9, loc='upper left')
+        ax.grid(True, alpha=0.3)
+    if limit is not None:
+        ax1.axhline(y=limit, color=COLORS['optimized'], linestyle='--', linewidth=2, alpha=0.5)
+
+    ax1.set_ylabel('Tool Calls in Context per Run', fontsize=13, fontweight='bold')
+    ax1.set_title('Context per Run (points: measured, lines: fit)', fontsize=13, fontweight='bold')
+    ax2.set_ylabel('Cumulative Input Tokens', fontsize=13, fontweight='bold')
+    ax2.set_title(f'Cumulative Input Tokens Projected to {horizon:,} Runs', fontsize=13, fontweight='bold')
+    fig.suptitle('Context Growth Over Time: Why max_tool_calls_from_history Matters',
                  fontsize=15, fontweight='bold', y=1.02)
-    plt.tight_layout()
-    
-    if filename:
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        print(f"✅ Chart saved: {filename}")
-    else:
-        plt.show()
-    
-    plt.close()
-
-
-def create_scaling_projection_chart(comparison, filename=None):
-    """Create a line chart showing context growth projection"""
-    baseline = comparison['baseline']
-    optimized = comparison['optimized']
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    # Calculate average tool calls per query
-    queries_count = 18  # From benchmark
-    avg_tool_calls = baseline['tool_calls_total'] / queries_count
-    max_limit = optimized['max_history_limit']
-    
-    # Project for up to 100 queries
-    query_counts = list(range(0, 101, 5))
-    baseline_context = [min(avg_tool_calls * q, avg_tool_calls * q) for q in query_counts]
-    optimized_context = [min(avg_tool_calls * q, max_limit) for q in query_counts]
-    
-    # Plot lines
-    ax.plot(query_counts, baseline_context, 'o-', linewidth=3, markersize=6,
-            color=COLORS['baseline'], label='Without Optimization', alpha=0.8)
-    ax.plot(query_counts, optimized_context, 's-', linewidth=3, markersize=6,
-            color=COLORS['optimized'], label=f'With max_tool_calls_from_history={max_limit}', alpha=0.8)
-    
-    # Add horizontal line for max limit
-    ax.axhline(y=max_limit, color=COLORS['optimized'], linestyle='--', 
-               linewidth=2, alpha=0.5, label=f'Context Limit = {max_limit}')
-    
-    # Fill area between lines to show savings
-    ax.fill_between(query_counts, baseline_context, optimized_context,
-                     color=COLORS['accent'], alpha=0.3, label='Tokens Saved')
-    
-    ax.set_xlabel('Number of Queries', fontsize=13, fontweight='bold')
-    ax.set_ylabel('Tool Calls in Context', fontsize=13, fontweight='bold')
-    ax.set_title('Context Growth Over Time: Why max_tool_calls_from_history Matters',
-                 fontsize=14, fontweight='bold', pad=20)
-    ax.legend(fontsize=10, loc='upper left')
-    ax.grid(True, alpha=0.3)
-    
-    # Add annotations
-    ax.annotate('Context explodes\nwithout limit!',
-                xy=(80, baseline_context[-5]), xytext=(60, baseline_context[-5] + 20),
-                arrowprops=dict(arrowstyle='->', color='red', lw=2),
-                fontsize=11, fontweight='bold', color='red')
-    
-    ax.annotate('Context stays\nCONSTANT!',
-                xy=(80, max_limit), xytext=(60, max_limit + 20),
-                arrowprops=dict(arrowstyle='->', color=COLORS['optimized'], lw=2),
-                fontsize=11, fontweight='bold', color=COLORS['optimized'])
-    
-    plt.tight_layout()
-    
-    if filename:
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        print(f"✅ Chart saved: {filename}")
-    else:
-        plt.show()
-    
-    plt.close()
-
-
-def load_latest_results():
-    """Load the most recent benchmark results"""
-    import glob
-    import os
-    
-    # Find most recent results file
-    result_files = glob.glob('benchmark_results_*.json')
-    if not result_files:
-        print("❌ No benchmark results found. Run benchmark_comparison.py first!")
-        sys.exit(1)
-    
-    latest_file = max(result_files, key=os.path.getctime)
-    print(f"📂 Loading results from: {latest_file}")
-    
-    with open(latest_file, 'r') as f:
+    return _save(plt, fig, filename, dpi)
+
+
+# name -> (draw function, inputs function)
+CHARTS = {
+    'tool_calls': (create_tool_calls_comparison_chart, tool_calls_inputs),
+    'token_cost': (create_token_cost_comparison_chart, token_cost_inputs),
+    'scaling': (create_scaling_projection_chart, scaling_inputs),
+}
+
+
+def inputs_digest(inputs, dpi):
+    payload = json.dumps({'version': CHART_VERSION, 'dpi': dpi, 'inputs': inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def plan_charts(comparison, out_dir=".", dpi=300, project_runs=None, force=False):
+    """(name, draw function, inputs, filename) for every chart that needs drawing"""
+    jobs = []
+    for name, (draw, build_inputs) in CHARTS.items():
+        inputs = build_inputs(comparison, project_runs) if name == 'scaling' else build_inputs(comparison)
+        if inputs is None:
+            print(f"⚠️  No data for the {name} chart in these results, skipping")
+            continue
+        filename = os.path.join(out_dir, f"chart_{name}_{inputs_digest(inputs, dpi)}.png")
+        if os.path.exists(filename) and not force:
+            print(f"⏭️  {filename} is up to date")
+            continue
+        jobs.append((name, draw, inputs, filename))
+    return jobs
+
+
+def render(jobs, dpi=300, workers=None):
+    """Draw charts in parallel worker processes; returns the files written"""
+    if not jobs:
+        return []
+    if len(jobs) == 1 or workers == 1:
+        return [draw(inputs, filename, dpi) for _, draw, inputs, filename in jobs]
+    with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(draw, inputs, filename, dpi) for _, draw, inputs, filename in jobs]
+        return [future.result() for future in futures]
+
+
+def load_latest_results(path=None, results_db=DEFAULT_PATH, run_id=None):
+    """Load the given run or results file, else the most recent benchmark run"""
+    if path is None and (run_id or os.path.exists(results_db)):
+        with ResultsStore(results_db) as store:
+            run_id = run_id or store.latest(RESULTS_BENCHMARK)
+            if run_id:
+                print(f"📂 Loading run {run_id} from: {results_db}")
+                return store.load(run_id)['results']
+    if path is None:
+        result_files = glob.glob('benchmark_results_guaranteed_*.json')
+        if not result_files:
+            print("❌ No benchmark results found. Run benchmark.py first!")
+            sys.exit(1)
+        path = max(result_files, key=os.path.getmtime)
+    print(f"📂 Loading results from: {path}")
+
+    with open(path, 'r') as f:
         data = json.load(f)
-    
+
     return data['comparison']
 
 
-def main():
+def main(argv=None):
     """Generate all charts from benchmark results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", default=None, help="Results JSON file to chart instead of a recorded run")
+    parser.add_argument("--results-db", default=DEFAULT_PATH, help=f"Results store (default: {DEFAULT_PATH})")
+    parser.add_argument("--run-id", default=None, help="Recorded run to chart (default: newest)")
+    parser.add_argument("--out-dir", default=".", help="Directory for the chart images")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--project-runs", type=int, default=None,
+                        help="Runs to project the scaling chart to (default: 4x measured, at least 100)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: one per chart)")
+    parser.add_argument("--force", action="store_true", help="Redraw charts even if their inputs are unchanged")
+    args = parser.parse_args(argv)
+
     print("\n📊 GENERATING BENCHMARK CHARTS")
     print("=" * 70 + "\n")
-    
-    # Load results
-    comparison = load_latest_results()
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Generate all charts
+
+    comparison = load_latest_results(args.results, args.results_db, args.run_id)
+    os.makedirs(args.out_dir, exist_ok=True)
+
     print("\n🎨 Creating charts...")
-    
-    create_tool_calls_comparison_chart(
-        comparison, 
-        f"chart_tool_calls_{timestamp}.png"
-    )
-    
-    create_token_cost_comparison_chart(
-        comparison,
-        f"chart_token_cost_{timestamp}.png"
-    )
-    
-    create_scaling_projection_chart(
-        comparison,
-        f"chart_scaling_{timestamp}.png"
-    )
-    
+    jobs = plan_charts(comparison, args.out_dir, args.dpi, args.project_runs, args.force)
+    for filename in render(jobs, args.dpi, args.workers):
+        print(f"✅ Chart saved: {filename}")
+
     print("\n" + "=" * 70)
     print("✅ All charts generated successfully!")
     print("=" * 70)
     print("\n💡 TIP: Use these charts in your LinkedIn post for maximum impact!")
-    print("   The charts are publication-ready at 300 DPI.\n")
+    print(f"   The charts are publication-ready at {args.dpi} DPI.\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Token-budget filtering of tool calls replayed from history.
+
+`max_tool_calls_from_history=N` keeps the N most recent tool calls, whatever
+their size. When tool results range from a few bytes to tens of kilobytes, the
+same N can cost 50 tokens or 50,000. TokenBudgetFilter keeps the most recent
+tool calls whose call and result together fit in `budget_tokens` instead:
+
+- Tool results are walked newest first. Each costs the tokens of its result
+  message plus its entry in the assistant's tool_calls. Walking stops at the
+  first call that no longer fits, so what is kept is always a recent, unbroken
+  stretch of history.
+- With dedupe=True, an older call with the same function and arguments as a
+  newer kept call is dropped without using any budget. The model has already
+  seen a fresher result for it.
+- Dropped calls are removed exactly as agno removes them for the count limit:
+  tool messages go, assistant messages lose those tool_calls, and an assistant
+  message with neither tool calls nor content is dropped.
+
+agno applies its count limit by calling `filter_tool_calls(history, limit)`
+from the agent module. install() makes that call hand history to the limit
+itself when the limit is callable, so a filter plugs in through the agent's
+own setting:
+
+    TokenBudgetFilter(2000, dedupe=True).apply_to(agent)
+"""
+
+import os
+import sys
+from copy import deepcopy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from tokenizer import Tokenizer  # noqa: E402
+
+
+def install():
+    """Let agno's agents and teams accept a callable as max_tool_calls_from_history (idempotent)"""
+    import agno.agent.agent as agent_module
+    import agno.team.team as team_module
+
+    for module in (agent_module, team_module):
+        original = module.filter_tool_calls
+        if getattr(original, "_history_filter_dispatch", False):
+            continue
+
+        def filter_tool_calls(messages, limit, _original=original):
+            if callable(limit):
+                return limit(messages)
+            return _original(messages, limit)
+
+        filter_tool_calls._history_filter_dispatch = True
+        module.filter_tool_calls = filter_tool_calls
+
+
+def _call_key(call):
+    function = call.get("function", {}) if isinstance(call, dict) else {}
+    return function.get("name"), function.get("arguments")
+
+
+def drop_tool_calls(messages, keep_ids):
+    """Filter messages in place to the tool calls in keep_ids, the way agno's filter_tool_calls does"""
+    filtered = []
+    for msg in messages:
+        if msg.role == "tool":
+            if msg.tool_call_id in keep_ids:
+                filtered.append(msg)
+        elif msg.role == "assistant" and msg.tool_calls:
+            if all(call.get("id") in keep_ids for call in msg.tool_calls):
+                filtered.append(msg)
+                continue
+            msg = deepcopy(msg)
+            msg.tool_calls = [call for call in msg.tool_calls if call.get("id") in keep_ids]
+            if msg.tool_calls:
+                filtered.append(msg)
+            elif msg.content:
+                msg.tool_calls = None
+                filtered.append(msg)
+        else:
+            filtered.append(msg)
+    messages[:] = filtered
+
+
+class TokenBudgetFilter:
+    """Keep the most recent history tool calls that fit in a token budget"""
+
+    def __init__(self, budget_tokens, dedupe=False, tokenizer=None):
+        self.budget_tokens = budget_tokens
+        self.dedupe = dedupe
+        self.tokenizer = tokenizer or Tokenizer()
+        # Outcome of the last filtering pass
+        self.last = {'kept': 0, 'dropped': 0, 'duplicates': 0, 'tokens': 0}
+
+    @property
+    def label(self):
+        return f"token_budget={self.budget_tokens}" + (" +dedupe" if self.dedupe else "")
+
+    def __repr__(self):
+        return f"TokenBudgetFilter({self.budget_tokens}, dedupe={self.dedupe})"
+
+    def apply_to(self, agent):
+        """Use this filter for agent's history instead of a tool call count"""
+        install()
+        agent.max_tool_calls_from_history = self
+        return agent
+
+    def __call__(self, messages):
+        calls = {}
+        for msg in messages:
+            if msg.role == "assistant" and msg.tool_calls:
+                for call in msg.tool_calls:
+                    name, arguments = _call_key(call)
+                    calls[call.get("id")] = ((name, arguments),
+                                             self.tokenizer.count(name) + self.tokenizer.count(arguments))
+
+        results = sum(1 for msg in messages if msg.role == "tool")
+        keep_ids, seen, used, duplicates = set(), set(), 0, 0
+        for msg in reversed(messages):
+            if msg.role != "tool" or not msg.tool_call_id:
+                continue
+            key, call_tokens = calls.get(msg.tool_call_id, ((msg.tool_name, None), 0))
+            if self.dedupe and key in seen:
+                duplicates += 1
+                continue
+            cost = self.tokenizer.count_message(msg) + call_tokens
+            if used + cost > self.budget_tokens:
+                break
+            used += cost
+            keep_ids.add(msg.tool_call_id)
+            seen.add(key)
+
+        self.last = {'kept': len(keep_ids), 'dropped': results - len(keep_ids), 'duplicates': duplicates,
+                     'tokens': used}
+        if self.last['dropped']:
+            drop_tool_calls(messages, keep_ids)
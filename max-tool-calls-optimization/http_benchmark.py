@@ -0,0 +1,254 @@
+"""
+HTTP client reuse against a local OpenAI-compatible endpoint.
+
+OfflineChat skips the network, so the offline benchmarks cannot show what the
+HTTP client costs. This script starts ../shared/stub_server.py in a separate
+process and drives benchmark.py-style sessions (the optimized agent, one
+"Tell me about X" query per run) through OpenAIChat pointed at it, with
+--concurrency sessions on threads. Each client mode gets a fresh server with
+the same seed, so latency and injected failures line up across modes:
+
+- per-run:   a new OpenAI client (and connection pool) for every run, closed
+             after it, as code that builds its client per request does
+- per-agent: agno's default, one client per OpenAIChat, reused across runs
+- shared:    one httpx.Client with a --pool-size connection pool, passed as
+             http_client to every session's model
+
+It reports runs/s, HTTP requests/s, run latency p50/p95/p99, the time spent
+getting a client, TCP connections the server accepted, and responses by
+status. With --rate-429 / --rate-5xx the openai client's own retries
+(--max-retries, honouring Retry-After) show up as extra requests and latency.
+agno only logs a failed session save, so a run whose save failed is counted
+as failed too.
+
+Usage:
+    python http_benchmark.py --concurrency 8 --runs-per-session 10 --latency-ms 50
+    python http_benchmark.py --concurrency 16 --rate-429 0.05 --rate-5xx 0.02 --max-retries 3 --stream
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import wraps
+
+from benchmark import MODEL_ID, STORAGE_MODES, build_agent, build_model, build_prompt, build_topics, make_db
+from percentiles import percentile
+from results_store import add_results_store_arguments, record_from_args
+from stub_server import StubProcess, add_stub_arguments, stub_options_from_args
+
+RESULTS_BENCHMARK = "http_clients"
+CLIENT_MODES = ("per-run", "per-agent", "shared")
+
+
+def time_get_client(model, totals, lock):
+    """Accumulate the time spent in model.get_client() (client construction on a miss)"""
+    get_client = model.get_client
+
+    def timed():
+        start = time.perf_counter()
+        try:
+            return get_client()
+        finally:
+            with lock:
+                totals['get_client_s'] += time.perf_counter() - start
+
+    model.get_client = timed
+
+
+def track_persist_failures(agent):
+    """List that gets an entry whenever agent's session save fails (agno logs it and returns None)"""
+    upsert = agent._upsert_session
+    failures = []
+
+    @wraps(upsert)
+    def tracked(*args, **kwargs):
+        saved = upsert(*args, **kwargs)
+        if saved is None:
+            failures.append(True)
+        return saved
+
+    agent._upsert_session = tracked
+    return failures
+
+
+def run_session(agent, prompts, mode, stream, latencies, errors, lock):
+    """Run one session's prompts in order, recording per-run latency"""
+    from agno.run.base import RunStatus
+
+    persist_failures = track_persist_failures(agent)
+    for prompt in prompts:
+        failed_saves = len(persist_failures)
+        if mode == "per-run" and agent.model.client is not None:
+            agent.model.client.close()
+            agent.model.client = None
+        start = time.perf_counter()
+        try:
+            if stream:
+                for _ in agent.run(prompt, stream=True):
+                    pass
+                failed = None
+            else:
+                output = agent.run(prompt, stream=False)
+                failed = output.content if output.status == RunStatus.error else None
+        except Exception as e:  # keep the load going; report failures at the end
+            failed = f"{type(e).__name__}: {e}"
+        if not failed and len(persist_failures) > failed_saves:
+            failed = "session persist failed"
+        elapsed = time.perf_counter() - start
+        with lock:
+            if failed:
+                errors.append(str(failed)[:200])
+            else:
+                latencies.append(elapsed)
+    if mode != "shared" and agent.model.client is not None:
+        # Closing an OpenAI client closes its httpx client, which in shared mode every session uses
+        agent.model.client.close()
+
+
+def run_mode(mode, args, db_dir):
+    """Run every session for one client mode against a fresh stub server"""
+    import httpx
+
+    db = make_db(os.path.join(db_dir, f"http_{mode}.db"), args.storage)
+    # Create the sessions table up front: concurrent first saves race to create it (as AgentFactory._prepare)
+    db._get_table(table_type="sessions", create_table_if_not_found=True)
+    topics = build_topics(args.concurrency * args.runs_per_session)
+    lock = threading.Lock()
+    totals = {'get_client_s': 0.0}
+    latencies, errors = [], []
+
+    with StubProcess(**stub_options_from_args(args)) as server:
+        shared = None
+        if mode == "shared":
+            shared = httpx.Client(limits=httpx.Limits(max_connections=args.pool_size,
+                                                      max_keepalive_connections=args.pool_size))
+        agents = []
+        for i in range(args.concurrency):
+            model = build_model(MODEL_ID, offline=False, base_url=server.base_url, api_key="stub",
+                                max_retries=args.max_retries, http_client=shared)
+            time_get_client(model, totals, lock)
+            agent = build_agent(None, max_history_limit=args.limit, model=model, db=db, session_id=f"http-{mode}-{i}")
+            agent.telemetry = args.telemetry
+            agents.append(agent)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                for future in [
+                    pool.submit(run_session, agent, [build_prompt(t) for t in topics[i::args.concurrency]],
+                                mode, args.stream, latencies, errors, lock)
+                    for i, agent in enumerate(agents)
+                ]:
+                    future.result()
+            wall = time.perf_counter() - start
+        stats = server.stats()
+        if shared is not None:
+            shared.close()
+
+    ordered = sorted(latencies)
+    return {
+        'mode': mode,
+        'completed_runs': len(latencies),
+        'failed_runs': len(errors),
+        'error_samples': errors[:5],
+        'wall_time_s': wall,
+        'runs_per_s': len(latencies) / wall if wall > 0 else 0.0,
+        'http_requests_per_s': stats['requests'] / wall if wall > 0 else 0.0,
+        'get_client_ms_per_run': totals['get_client_s'] * 1000 / max(1, len(latencies) + len(errors)),
+        'latency_s': {
+            'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50': percentile(ordered, 50),
+            'p95': percentile(ordered, 95),
+            'p99': percentile(ordered, 99),
+            'max': ordered[-1] if ordered else 0.0,
+        },
+        'server': stats,
+    }
+
+
+def print_report(rows):
+    print("\n" + "=" * 90)
+    print("📊 HTTP CLIENT REUSE (OpenAIChat → local stub server)")
+    print("=" * 90)
+    print(f"{'Client':<10} | {'Runs/s':>7} | {'Req/s':>7} | {'p50':>8} | {'p99':>8} | {'Client ms':>9} | "
+          f"{'Conns':>6} | {'Failed':>6} | Status")
+    print("-" * 90)
+    for r in rows:
+        lat = r['latency_s']
+        status = " ".join(f"{code}×{count}" for code, count in sorted(r['server']['status'].items()))
+        print(f"{r['mode']:<10} | {r['runs_per_s']:>7.1f} | {r['http_requests_per_s']:>7.1f} | "
+              f"{lat['p50'] * 1000:>6.1f}ms | {lat['p99'] * 1000:>6.1f}ms | {r['get_client_ms_per_run']:>7.2f}ms | "
+              f"{r['server']['connections']:>6} | {r['failed_runs']:>6} | {status}")
+    print("=" * 90)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(CLIENT_MODES),
+                        help=f"Client modes to compare (default: {','.join(CLIENT_MODES)})")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent sessions (default: 8)")
+    parser.add_argument("--runs-per-session", type=int, default=10, help="Queries per session (default: 10)")
+    parser.add_argument("--limit", type=int, default=3, help="max_tool_calls_from_history (default: 3)")
+    parser.add_argument("--pool-size", type=int, default=16,
+                        help="Connections in the shared client's pool (default: 16)")
+    parser.add_argument("--max-retries", type=int, default=2,
+                        help="openai client retries on 429/5xx/connection errors (default: 2)")
+    parser.add_argument("--stream", action="store_true", help="Stream responses (SSE) instead of JSON")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="default",
+                        help="Session storage: default SqliteDb, or append-only run rows")
+    parser.add_argument("--no-telemetry", dest="telemetry", action="store_false",
+                        help="Turn off agno's per-run telemetry call")
+    parser.add_argument("--db-dir", default=None, help="Directory for the session databases")
+    add_stub_arguments(parser)
+    add_results_store_arguments(parser)
+    args = parser.parse_args(argv)
+    args.modes = args.modes.split(",")
+    unknown = set(args.modes) - set(CLIENT_MODES)
+    if unknown:
+        parser.error(f"unknown client modes: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    db_dir = args.db_dir or os.path.join("tmp", f"http_{timestamp}")
+    os.makedirs(db_dir, exist_ok=True)
+
+    print("\n🌐 HTTP CLIENT BENCHMARK")
+    print("=" * 90)
+    print(f"Modes: {', '.join(args.modes)} | Sessions: {args.concurrency} × {args.runs_per_session} runs | "
+          f"Latency: {args.latency_ms:g}±{args.latency_jitter_ms:g}ms | 429: {args.rate_429:.0%} | "
+          f"5xx: {args.rate_5xx:.0%} | Retries: {args.max_retries} | Stream: {args.stream}")
+    print("=" * 90)
+
+    rows = []
+    for mode in args.modes:
+        rows.append(run_mode(mode, args, db_dir))
+        print(f"  ✓ {mode:<10} {rows[-1]['wall_time_s']:.1f}s")
+    print_report(rows)
+
+    filename = f"http_results_{timestamp}.json"
+    results = {'configs': rows}
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, results,
+        config={'modes': args.modes, 'concurrency': args.concurrency, 'runs_per_session': args.runs_per_session,
+                'limit': args.limit, 'pool_size': args.pool_size, 'max_retries': args.max_retries,
+                'stream': args.stream, 'storage': args.storage, 'telemetry': args.telemetry,
+                **stub_options_from_args(args)},
+        model=f"stub:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Incremental bookkeeping for benchmark runs.
+
+ToolCallLedger counts tool calls from each new run_response only, so the cost of
+measuring a run stays constant instead of re-reading the whole session from the
+database after every query. A single optional verification pass at the end
+checks the running totals against what the SqliteDb actually stored.
+
+RunSeries keeps the per-run tokens and latency behind the totals, so reports
+reflect every run instead of whichever run happened to finish last.
+"""
+
+import json
+import os
+import sys
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from percentiles import percentile  # noqa: E402
+
+
+def count_tool_calls(messages):
+    """Return (history_tool_calls, current_tool_calls) for a run's messages."""
+    history = 0
+    current = 0
+    for msg in messages or []:
+        if msg.role != "assistant" or not msg.tool_calls:
+            continue
+        if getattr(msg, "from_history", False):
+            history += len(msg.tool_calls)
+        else:
+            current += len(msg.tool_calls)
+    return history, current
+
+
+class ToolCallLedger:
+    """Running tool-call totals for one agent session"""
+
+    def __init__(self):
+        self.runs = 0
+        self.total_in_db = 0
+        self.total_history_in_context = 0
+        self.total_current_in_context = 0
+        self.last_history = 0
+        self.last_current = 0
+
+    def record(self, run_response):
+        """Update counters from a single run_response. O(messages in this run)."""
+        history, current = count_tool_calls(run_response.messages)
+        self.runs += 1
+        self.total_in_db += current
+        self.total_history_in_context += history
+        self.total_current_in_context += current
+        self.last_history = history
+        self.last_current = current
+        return history, current
+
+    @property
+    def total_context_used(self):
+        return self.total_history_in_context + self.total_current_in_context
+
+    @property
+    def avg_context_per_query(self):
+        return self.total_context_used / self.runs if self.runs else 0.0
+
+    def verify(self, agent):
+        """
+        Compare the ledger with the tool calls persisted in the agent's DB.
+
+        Reads the session once. Returns (ok, saved_tool_calls).
+        """
+        saved_messages = agent.get_messages_for_session()
+        saved_tool_calls = sum(
+            len(msg.tool_calls)
+            for msg in saved_messages
+            if msg.role == "assistant" and msg.tool_calls
+        ) if saved_messages else 0
+        return saved_tool_calls == self.total_in_db, saved_tool_calls
+
+
+class RunSeries:
+    """
+    Per-run time series for one agent session.
+
+    Columns are stored in typed arrays (8 bytes per value) rather than a list of
+    dicts, and each run is optionally streamed as one JSONL line as soon as it
+    finishes, so a crashed or interrupted 10k-run session still leaves data.
+    """
+
+    INT_COLUMNS = ("run", "history_tool_calls", "current_tool_calls", "input_tokens", "output_tokens")
+    FLOAT_COLUMNS = ("latency_s",)
+    COLUMNS = INT_COLUMNS + FLOAT_COLUMNS
+
+    def __init__(self, stream_path=None):
+        self.columns = {name: array("q") for name in self.INT_COLUMNS}
+        self.columns.update({name: array("d") for name in self.FLOAT_COLUMNS})
+        self.stream_path = stream_path
+        self._stream = None
+        if stream_path:
+            os.makedirs(os.path.dirname(stream_path) or ".", exist_ok=True)
+            self._stream = open(stream_path, "w", buffering=1)
+
+    def __len__(self):
+        return len(self.columns["run"])
+
+    def append(self, **values):
+        """Record one run. Expects a value for every name in COLUMNS."""
+        for name in self.COLUMNS:
+            self.columns[name].append(values[name])
+        if self._stream is not None:
+            self._stream.write(json.dumps({name: values[name] for name in self.COLUMNS}) + "\n")
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def total(self, name):
+        return sum(self.columns[name])
+
+    def percentiles(self, name, pcts=(50, 95, 99)):
+        values = sorted(self.columns[name])
+        return {f"p{p}": percentile(values, p) for p in pcts}
+
+    def token_totals(self):
+        input_tokens = self.total("input_tokens")
+        output_tokens = self.total("output_tokens")
+        return {
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens,
+        }
+
+    def summary(self):
+        """Totals and percentiles used by the comparison report"""
+        total_tokens = [i + o for i, o in zip(self.columns["input_tokens"], self.columns["output_tokens"])]
+        total_tokens.sort()
+        return {
+            'runs': len(self),
+            'tokens': self.token_totals(),
+            'tokens_per_run': {f"p{p}": percentile(total_tokens, p) for p in (50, 95, 99)},
+            'latency_s': {
+                'total': self.total("latency_s"),
+                'mean': self.total("latency_s") / len(self) if len(self) else 0.0,
+                **self.percentiles("latency_s"),
+            },
+        }
+
+    def to_columns(self):
+        """Columnar dict of plain lists, for JSON output"""
+        return {name: self.columns[name].tolist() for name in self.COLUMNS}
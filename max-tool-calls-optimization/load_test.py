@@ -0,0 +1,228 @@
+"""
+Asyncio multi-session load generator.
+
+Drives many concurrent sessions through `agent.arun` against one shared SqliteDb
+and reports throughput (runs/s) and p50/p95/p99 latency. It runs once for
+unlimited tool call history and once for max_tool_calls_from_history, so the two
+can be compared under concurrent load.
+
+Arrival model:
+- --arrival-rate 0 (default): closed loop. Each session sends its next query as
+  soon as the previous one finishes.
+- --arrival-rate R: open loop. Each session's queries arrive as a Poisson
+  process of rate R / concurrency, scheduled up front and independent of
+  completions, so the aggregate offered load is R runs/s. A session's runs stay
+  sequential: a query that arrives while the previous one is still running
+  waits for it. Latency is measured from the scheduled arrival, so that wait
+  counts (no coordinated omission). Service time, from the actual start, is
+  reported separately.
+
+With --rpm / --tpm, every configuration's model requests go through a
+RateLimitScheduler (../shared/rate_limiter.py) instead of being sent as soon
+as a session is ready.
+
+Usage:
+    python load_test.py --offline --latency-ms 300 --concurrency 64 --runs-per-session 20
+    python load_test.py --offline --concurrency 32 --arrival-rate 50
+    python load_test.py --concurrency 32 --rpm 500 --tpm 200000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime
+
+from benchmark import (
+    BENCHMARK_QUERIES,
+    MODEL_ID,
+    add_offline_arguments,
+    build_agent,
+    build_model,
+    client_options,
+    make_db,
+    model_options_from_args,
+)
+from percentiles import percentile
+from rate_limiter import add_scheduler_arguments, scheduler_from_args
+
+
+def arrival_times(runs, session_rate, rng):
+    """Poisson arrival offsets (seconds from the start) for one session's runs"""
+    offsets = []
+    at = 0.0
+    for _ in range(runs):
+        at += rng.expovariate(session_rate)
+        offsets.append(at)
+    return offsets
+
+
+async def run_session(index, agent, runs, session_rate, rng, latencies, service_times, errors, origin):
+    """
+    Run one session's queries sequentially, recording per-run latency.
+    With session_rate > 0 queries arrive on a Poisson schedule fixed up front and
+    latency counts from the scheduled arrival; otherwise from the actual start
+    """
+    # Stagger start topics so sessions don't send identical queries in lockstep
+    offset = index * 7
+    arrivals = arrival_times(runs, session_rate, rng) if session_rate > 0 else None
+    for i in range(runs):
+        if arrivals is not None:
+            arrival = origin + arrivals[i]
+            await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        topic = BENCHMARK_QUERIES[(offset + i) % len(BENCHMARK_QUERIES)]
+        start = time.perf_counter()
+        if arrivals is None:
+            arrival = start
+        try:
+            await agent.arun(f"Tell me about {topic}", session_id=agent.session_id)
+        except Exception as e:  # keep the load going; report failures at the end
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+        end = time.perf_counter()
+        latencies.append(end - arrival)
+        service_times.append(end - start)
+
+
+async def run_load(label, max_history_limit, db, model_options, concurrency, runs_per_session,
+                   arrival_rate, seed, scheduler=None):
+    """Run `concurrency` sessions for one agent configuration, optionally through a rate-limit scheduler"""
+    # The DB file persists across invocations; fresh session ids keep every run starting from empty history
+    run_tag = uuid.uuid4().hex[:8]
+    # One agent per session: agents carry per-run state and are not shared across tasks
+    agents = [
+        build_agent(
+            None,
+            max_history_limit=max_history_limit,
+            model=build_model(MODEL_ID, **model_options),
+            db=db,
+            session_id=f"load-{label}-{run_tag}-{i}",
+        )
+        for i in range(concurrency)
+    ]
+    if scheduler is not None:
+        for agent in agents:
+            scheduler.instrument(agent)
+    # Aggregate rate R spread over N sessions => each session arrives at R / N
+    session_rate = arrival_rate / concurrency if arrival_rate > 0 else 0.0
+    rng = random.Random(seed)
+
+    latencies = []
+    service_times = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(i, agent, runs_per_session, session_rate, random.Random(rng.random()),
+                    latencies, service_times, errors, start)
+        for i, agent in enumerate(agents)
+    ))
+    wall = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    service = sorted(service_times)
+    return {
+        'config': label,
+        'max_history_limit': max_history_limit,
+        'concurrency': concurrency,
+        'runs_per_session': runs_per_session,
+        'arrival_rate': arrival_rate,
+        'completed_runs': len(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'wall_time_s': wall,
+        'throughput_rps': len(latencies) / wall if wall > 0 else 0.0,
+        'latency_s': {
+            'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50': percentile(ordered, 50),
+            'p95': percentile(ordered, 95),
+            'p99': percentile(ordered, 99),
+            'max': ordered[-1] if ordered else 0.0,
+        },
+        'service_time_s': {
+            'p50': percentile(service, 50),
+            'p99': percentile(service, 99),
+        },
+        'rate_limit': scheduler.summary() if scheduler is not None else None,
+    }
+
+
+def print_load_report(results):
+    """Print throughput and tail latency per configuration"""
+    print("\n" + "=" * 90)
+    print("📈 LOAD TEST RESULTS")
+    print("=" * 90 + "\n")
+    print(f"{'Config':<22} | {'Runs':>6} | {'Errors':>6} | {'Runs/s':>8} | "
+          f"{'p50':>8} | {'p95':>8} | {'p99':>8} | {'Svc p99':>8}")
+    print("-" * 90)
+    for r in results:
+        lat = r['latency_s']
+        print(f"{r['config']:<22} | {r['completed_runs']:>6} | {r['errors']:>6} | "
+              f"{r['throughput_rps']:>8.1f} | {lat['p50']:>7.3f}s | {lat['p95']:>7.3f}s | {lat['p99']:>7.3f}s | "
+              f"{r['service_time_s']['p99']:>7.3f}s")
+    print("=" * 90)
+    if any(r['arrival_rate'] > 0 for r in results):
+        print("  Latency counts from each query's scheduled arrival (queueing included); "
+              "Svc is the run alone.")
+    for r in results:
+        if r['rate_limit']:
+            stats = r['rate_limit']
+            print(f"  {r['config']:<22} scheduler: {stats['requests']} requests, {stats['rate_limited']} × 429, "
+                  f"{stats['retries']} retries, queue wait p95 {stats['queue_wait_s']['p95']:.3f}s")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load test")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent sessions")
+    parser.add_argument("--runs-per-session", type=int, default=10, help="Queries per session")
+    parser.add_argument("--arrival-rate", type=float, default=0.0,
+                        help="Open-loop aggregate Poisson arrivals per second (0 = closed loop, as fast as possible)")
+    parser.add_argument("--max-history-limit", type=int, default=3,
+                        help="max_tool_calls_from_history for the optimized configuration")
+    parser.add_argument("--db-file", default="tmp/load_test.db", help="Shared SqliteDb file")
+    add_scheduler_arguments(parser)
+    add_offline_arguments(parser)
+    return parser.parse_args(argv)
+
+
+async def amain(args):
+    os.makedirs(os.path.dirname(args.db_file) or ".", exist_ok=True)
+    db = make_db(args.db_file)
+    model_options = model_options_from_args(args)
+    seed = args.seed if args.seed is not None else 42
+
+    results = []
+    for label, limit in (("unlimited", None), (f"max_tool_calls={args.max_history_limit}", args.max_history_limit)):
+        print(f"🚀 {label}: {args.concurrency} sessions × {args.runs_per_session} runs...")
+        results.append(await run_load(
+            label, limit, db, client_options(model_options, args), args.concurrency, args.runs_per_session,
+            args.arrival_rate, seed, scheduler_from_args(args),
+        ))
+    return results
+
+
+def main(argv=None):
+    """Run the load test for both configurations and save results"""
+    args = parse_args(argv)
+
+    print("\n⚡ MULTI-SESSION LOAD TEST")
+    print("=" * 90)
+    print(f"Concurrency: {args.concurrency} | Runs/session: {args.runs_per_session} | "
+          f"Arrival rate: {'closed loop' if args.arrival_rate <= 0 else f'{args.arrival_rate}/s'}")
+    print("=" * 90 + "\n")
+
+    results = asyncio.run(amain(args))
+    print_load_report(results)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"load_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump({'load_test': results}, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
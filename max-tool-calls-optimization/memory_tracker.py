@@ -0,0 +1,276 @@
+"""
+Per-run memory footprint as session history grows.
+
+max_tool_calls_from_history bounds the tool calls sent to the model, but agno
+still loads the whole session and copies its history on every run. MemoryTracker
+records, for each run of an instrumented agent:
+
+- rss_bytes:            process resident set size after the run
+- traced_current_bytes: Python heap traced by tracemalloc after the run
+- traced_peak_bytes:    highest traced heap during the run
+
+It also attributes allocations to the hooked phases. `<phase>_bytes` is the
+memory a phase allocated and still held when it returned. `<phase>_peak_bytes` is
+the highest transient allocation above the phase's starting point:
+
+- session_load:  reading the session (every stored run and its messages) from the DB
+- messages:      building the run's messages, including copying and filtering history
+- tool_results:  executing the model's tool calls and collecting their results
+
+The message counts that go with them are also recorded. session_messages is the
+number of messages in the loaded session. context_messages is the number of
+messages in the run's context, and history_messages is how many of those came
+from history. Fitting bytes against these counts gives bytes per history message.
+
+Tracing starts at instrument(). Allocations made once per process (lazy
+imports, table setup, the model's client) would land in the first traced run,
+so callers comparing agents do one untracked run first, as benchmark.py's
+runners do (warm_up_memory).
+
+tracemalloc slows Python allocations down noticeably, so timings taken with
+tracking on are not comparable to timings without it. Runs are assumed to be
+sequential (the benchmark's runners), not concurrent.
+"""
+
+import inspect
+import os
+import statistics
+import sys
+import tracemalloc
+from array import array
+from functools import wraps
+
+# (method name, phase) hooked on the agent and on agent.model respectively
+AGENT_HOOKS = (
+    ("_read_or_create_session", "session_load"),
+    ("_aread_or_create_session", "session_load"),
+    ("_get_run_messages", "messages"),
+    ("_aget_run_messages", "messages"),
+)
+MODEL_HOOKS = (
+    ("run_function_calls", "tool_results"),
+    ("arun_function_calls", "tool_results"),
+)
+MEMORY_PHASES = ("session_load", "messages", "tool_results")
+COUNTS = ("session_messages", "context_messages", "history_messages")
+
+
+def rss_bytes():
+    """Current resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def session_message_count(session):
+    return sum(len(getattr(run, "messages", None) or []) for run in getattr(session, "runs", None) or [])
+
+
+def run_message_counts(run_messages):
+    messages = getattr(run_messages, "messages", None) or []
+    return len(messages), sum(1 for m in messages if getattr(m, "from_history", False))
+
+
+class MemoryTracker:
+    """Per-run RSS, tracemalloc totals and per-phase retained/peak allocations"""
+
+    COLUMNS = (("run", "rss_bytes", "traced_current_bytes", "traced_peak_bytes")
+               + tuple(f"{phase}{suffix}" for phase in MEMORY_PHASES for suffix in ("_bytes", "_peak_bytes"))
+               + COUNTS)
+
+    def __init__(self):
+        self.columns = {name: array("q") for name in self.COLUMNS}
+        self._current = None
+        self._run_peak = 0
+        self._started_tracing = False
+
+    # --- Instrumentation ---------------------------------------------------
+
+    def instrument(self, agent):
+        """Start tracemalloc if needed and wrap the phase methods on this agent (and its model)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        for name, phase in AGENT_HOOKS:
+            self._hook(agent, name, phase)
+        for name, phase in MODEL_HOOKS:
+            self._hook(agent.model, name, phase)
+        return self
+
+    def close(self):
+        """Stop tracemalloc if this tracker started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _hook(self, target, name, phase):
+        method = getattr(target, name, None)
+        if method is None or getattr(method, "_memory_tracker", None) is self:
+            return
+        if inspect.isasyncgenfunction(method):
+            wrapper = self._wrap_async_gen(method, phase)
+        elif inspect.iscoroutinefunction(method):
+            wrapper = self._wrap_coroutine(method, phase)
+        elif inspect.isgeneratorfunction(method):
+            wrapper = self._wrap_gen(method, phase)
+        else:
+            wrapper = self._wrap_function(method, phase)
+        wrapper._memory_tracker = self
+        setattr(target, name, wrapper)
+
+    def _checkpoint(self):
+        """Traced heap now; folds the peak since the last checkpoint into the run's peak"""
+        current, peak = tracemalloc.get_traced_memory()
+        self._run_peak = max(self._run_peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _enter(self):
+        if self._current is None:
+            self.begin_run()
+        return self._checkpoint()
+
+    def _exit(self, phase, start, result=None):
+        current, peak = tracemalloc.get_traced_memory()
+        self._checkpoint()
+        self._current[f"{phase}_bytes"] += current - start
+        self._current[f"{phase}_peak_bytes"] = max(self._current[f"{phase}_peak_bytes"], peak - start)
+        if phase == "session_load" and result is not None:
+            self._current["session_messages"] = session_message_count(result)
+        elif phase == "messages" and result is not None:
+            self._current["context_messages"], self._current["history_messages"] = run_message_counts(result)
+
+    def _wrap_function(self, fn, phase):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = self._enter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                self._exit(phase, start, result)
+        return wrapper
+
+    def _wrap_coroutine(self, fn, phase):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = self._enter()
+            result = None
+            try:
+                result = await fn(*args, **kwargs)
+                return result
+            finally:
+                self._exit(phase, start, result)
+        return wrapper
+
+    def _wrap_gen(self, fn, phase):
+        # Measured from the first item to exhaustion, so what the consumer keeps of the items counts too
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = self._enter()
+            try:
+                return (yield from fn(*args, **kwargs))
+            finally:
+                self._exit(phase, start)
+        return wrapper
+
+    def _wrap_async_gen(self, fn, phase):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = self._enter()
+            try:
+                async for item in fn(*args, **kwargs):
+                    yield item
+            finally:
+                self._exit(phase, start)
+        return wrapper
+
+    # --- Per-run records ---------------------------------------------------
+
+    def begin_run(self):
+        self._current = dict.fromkeys(self.COLUMNS, 0)
+        self._run_peak = 0
+        self._checkpoint()
+        self._run_peak = 0
+
+    def end_run(self):
+        """Close the current run and return its record (bytes and message counts)"""
+        if self._current is None:
+            self.begin_run()
+        record = self._current
+        record["run"] = len(self) + 1
+        record["traced_current_bytes"] = self._checkpoint()
+        record["traced_peak_bytes"] = self._run_peak
+        record["rss_bytes"] = rss_bytes()
+        for name in self.COLUMNS:
+            self.columns[name].append(record[name])
+        self._current = None
+        return record
+
+    def __len__(self):
+        return len(self.columns["run"])
+
+    # --- Aggregation -------------------------------------------------------
+
+    def _slope(self, x_name, y_name):
+        """Least-squares bytes per unit of x (None if x never varies)"""
+        x, y = self.columns[x_name], self.columns[y_name]
+        if len(x) < 2 or min(x) == max(x):
+            return None
+        return statistics.linear_regression(x, y).slope
+
+    def summary(self):
+        """First/last/max per column, growth per run and bytes per history message"""
+        runs = len(self)
+        result = {'runs': runs}
+        for name in self.COLUMNS[1:]:
+            values = self.columns[name]
+            result[name] = {
+                'first': values[0] if runs else 0,
+                'last': values[-1] if runs else 0,
+                'max': max(values) if runs else 0,
+                'mean': sum(values) / runs if runs else 0.0,
+                'growth_per_run': self._slope("run", name),
+            }
+        result['bytes_per_history_message'] = {
+            # Loading keeps every stored message, whatever the history limit
+            'session_load': self._slope("session_messages", "session_load_bytes"),
+            'session_load_peak': self._slope("session_messages", "session_load_peak_bytes"),
+            # Building messages copies history before filtering it: transient cost per stored message,
+            # retained cost per message that stays in the context
+            'messages_peak': self._slope("session_messages", "messages_peak_bytes"),
+            'messages': self._slope("history_messages", "messages_bytes"),
+        }
+        return result
+
+    def to_columns(self):
+        """Per-run records as a columnar dict of plain lists"""
+        return {name: self.columns[name].tolist() for name in self.COLUMNS}
+
+
+def print_memory_comparison(baseline, optimized):
+    """Print memory at the first and last run and bytes per message for both agents"""
+    mib = 1024 * 1024
+    b, o = baseline['summary'], optimized['summary']
+    print(f"  {'Metric':<38} | {'Baseline':>24} | {'Optimized':>24}")
+    for name, label in (("rss_bytes", "RSS (MiB)"), ("traced_current_bytes", "Traced heap (MiB)"),
+                        ("traced_peak_bytes", "Traced peak in run (MiB)")):
+        print(f"  {label + ' first → last':<38} | {b[name]['first'] / mib:>10.1f} → {b[name]['last'] / mib:>10.1f} | "
+              f"{o[name]['first'] / mib:>10.1f} → {o[name]['last'] / mib:>10.1f}")
+    for phase in MEMORY_PHASES:
+        name = f"{phase}_peak_bytes"
+        print(f"  {phase + ' peak KiB first → last':<38} | {b[name]['first'] / 1024:>10.1f} → "
+              f"{b[name]['last'] / 1024:>10.1f} | {o[name]['first'] / 1024:>10.1f} → {o[name]['last'] / 1024:>10.1f}")
+    for name in COUNTS:
+        print(f"  {name + ' (last run)':<38} | {b[name]['last']:>24,} | {o[name]['last']:>24,}")
+    for name, per_message in b['bytes_per_history_message'].items():
+        other = o['bytes_per_history_message'][name]
+        cells = [f"{v:>20,.0f} B/msg" if v is not None else f"{'-':>24}" for v in (per_message, other)]
+        print(f"  {'bytes/msg: ' + name:<38} | {cells[0]} | {cells[1]}")
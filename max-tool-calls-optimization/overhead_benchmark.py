@@ -0,0 +1,281 @@
+"""
+Framework overhead of agent.run as history depth grows.
+
+With a zero-latency OfflineChat and an instant tool, everything left in an
+agent.run is agno's own orchestration: loading the session, building messages,
+filtering history, serializing and the DB round trip. This script runs one
+long session per configuration and times each agent.run alone (nothing else
+in the loop), then reports µs per run and runs/sec for each window of
+`--window` runs, plus the fitted growth in µs per extra run of history:
+
+- unlimited: max_tool_calls_from_history=None (the baseline)
+- limit=N:   max_tool_calls_from_history=--limit
+
+Most of the growth in both is the default SqliteDb rewriting the whole session
+on every save; --storage append shows what is left without it.
+
+To see where the overhead goes, --profile-runs more runs are made after the
+timed ones, at the deepest history, and profiled (they are not in the timings):
+
+- --cprofile writes a cProfile dump (overhead_<config>_<ts>.prof, for pstats
+  or snakeviz) and prints the hottest frames.
+- --flamegraph samples the running thread's stack every --sample-interval-ms
+  and writes folded stacks (overhead_<config>_<ts>.folded) for flamegraph.pl
+  or speedscope.
+- <config> is the label without "=", e.g. overhead_limit3_<ts>.prof.
+
+agno's telemetry opens an HTTPS client on every run; --no-telemetry turns it
+off to take that cost out of the picture.
+
+Usage:
+    python overhead_benchmark.py --runs 100
+    python overhead_benchmark.py --runs 200 --window 20 --storage append --cprofile --flamegraph --top 15
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import statistics
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+
+from benchmark import MODEL_ID, STORAGE_MODES, build_agent, build_model, build_topics
+from percentiles import percentile
+from results_store import add_results_store_arguments, record_from_args
+
+RESULTS_BENCHMARK = "framework_overhead"
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts folded stacks"""
+
+    def __init__(self, interval_s=0.001, thread_id=None):
+        self.interval_s = interval_s
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if names:
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def hottest_frames(profile, top):
+    """Top frames by own time from a cProfile.Profile"""
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{name} ({os.path.basename(filename)}:{line})",
+            'calls': calls,
+            'tottime_s': tottime,
+            'cumtime_s': cumtime,
+        })
+    rows.sort(key=lambda r: r['tottime_s'], reverse=True)
+    return rows[:top]
+
+
+def windows(run_us, window):
+    """µs per run and runs/sec for each window of `window` runs"""
+    rows = []
+    for start in range(0, len(run_us), window):
+        chunk = sorted(run_us[start:start + window])
+        mean = sum(chunk) / len(chunk)
+        rows.append({
+            'runs': f"{start + 1}-{start + len(chunk)}",
+            'history_depth': start + len(chunk) / 2,
+            'mean_us': mean,
+            'p50_us': percentile(chunk, 50),
+            'p95_us': percentile(chunk, 95),
+            'runs_per_s': 1e6 / mean if mean else 0.0,
+        })
+    return rows
+
+
+def run_config(name, limit, args, timestamp):
+    """Time every agent.run of one session, then profile --profile-runs more runs"""
+    # Labels like "limit=3" would put "=" in the file names
+    slug = name.replace('=', '')
+    db_file = os.path.join(args.db_dir, f"overhead_{slug}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_file + suffix):
+            os.remove(db_file + suffix)
+    # Zero latency regardless of AGNO_DEMO_* settings: only agno's own work is left
+    model = build_model(MODEL_ID, offline=True, latency_ms=0, latency_jitter_ms=0, chunk_interval_ms=0)
+    agent = build_agent(db_file, max_history_limit=limit, model=model, storage=args.storage)
+    agent.telemetry = args.telemetry
+    profiled_runs = args.profile_runs if (args.cprofile or args.flamegraph) else 0
+    topics = build_topics(args.runs + profiled_runs)
+
+    profiler = cProfile.Profile() if args.cprofile else None
+    sampler = StackSampler(args.sample_interval_ms / 1000) if args.flamegraph else None
+    run_us = array("d")
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for topic in topics[:args.runs]:
+            run_start = time.perf_counter_ns()
+            agent.run(f"Tell me about {topic}", stream=False)
+            run_us.append((time.perf_counter_ns() - run_start) / 1000)
+        elapsed = time.perf_counter() - start
+
+        if profiler is not None:
+            profiler.enable()
+        if sampler is not None:
+            sampler.start()
+        for topic in topics[args.runs:]:
+            agent.run(f"Tell me about {topic}", stream=False)
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+
+    fit = statistics.linear_regression(range(1, len(run_us) + 1), run_us) if len(run_us) > 1 else None
+    result = {
+        'config': name,
+        'max_tool_calls_from_history': limit,
+        'runs': len(run_us),
+        'elapsed_time': elapsed,
+        'mean_us': sum(run_us) / len(run_us),
+        'runs_per_s': len(run_us) / elapsed,
+        'growth_us_per_run': fit.slope if fit else 0.0,
+        'intercept_us': fit.intercept if fit else 0.0,
+        'windows': windows(run_us, args.window),
+        'run_us': list(run_us),
+        'profiled_runs': profiled_runs,
+    }
+    stem = f"overhead_{slug}_{timestamp}"
+    if profiler is not None:
+        path = f"{stem}.prof"
+        profiler.dump_stats(path)
+        result['cprofile'] = {'path': path, 'hottest': hottest_frames(profiler, args.top)}
+    if sampler is not None:
+        path = f"{stem}.folded"
+        sampler.write_folded(path)
+        result['flamegraph'] = {'path': path, 'samples': sampler.samples}
+    return result
+
+
+def print_report(results):
+    print("\n" + "=" * 90)
+    print("📊 FRAMEWORK OVERHEAD PER agent.run (zero-latency model)")
+    print("=" * 90)
+    names = [r['config'] for r in results]
+    print(f"{'Runs':<12} | " + " | ".join(f"{name + ' µs/run (p95)':>26}" for name in names))
+    print("-" * 90)
+    for i, window in enumerate(results[0]['windows']):
+        cells = []
+        for r in results:
+            w = r['windows'][i]
+            cells.append(f"{w['mean_us']:>10,.0f} ({w['p95_us']:>7,.0f}) {w['runs_per_s']:>5.0f}/s")
+        print(f"{window['runs']:<12} | " + " | ".join(f"{cell:>26}" for cell in cells))
+    print("-" * 90)
+    for r in results:
+        print(f"  {r['config']:<10} mean {r['mean_us']:>9,.0f} µs/run | {r['runs_per_s']:>6.1f} runs/s | "
+              f"growth {r['growth_us_per_run']:>+8.2f} µs per extra run of history")
+    print("=" * 90)
+
+    for r in results:
+        if 'cprofile' in r:
+            print(f"\n🔥 HOTTEST FRAMES: {r['config']} (own time, {r['profiled_runs']} runs after the timed ones)")
+            print("-" * 90)
+            for frame in r['cprofile']['hottest']:
+                print(f"  {frame['tottime_s'] * 1000:>9.1f}ms own | {frame['cumtime_s'] * 1000:>9.1f}ms cum | "
+                      f"{frame['calls']:>8,} calls | {frame['function'][:50]}")
+            print(f"  → {r['cprofile']['path']}")
+        if 'flamegraph' in r:
+            print(f"  🌡️  {r['flamegraph']['samples']:,} stack samples → {r['flamegraph']['path']}")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=100, help="Runs per session (default: 100)")
+    parser.add_argument("--window", type=int, default=10, help="Runs per reported window (default: 10)")
+    parser.add_argument("--limit", type=int, default=3,
+                        help="max_tool_calls_from_history of the limited config (default: 3)")
+    parser.add_argument("--cprofile", action="store_true", help="cProfile the last --profile-runs runs")
+    parser.add_argument("--flamegraph", action="store_true",
+                        help="Sample stacks over the last --profile-runs runs into a folded-stacks file")
+    parser.add_argument("--profile-runs", type=int, default=10,
+                        help="Extra runs to profile after the timed ones (default: 10)")
+    parser.add_argument("--sample-interval-ms", type=float, default=1.0,
+                        help="Stack sampling interval for --flamegraph (default: 1)")
+    parser.add_argument("--top", type=int, default=15, help="Hottest frames to print (default: 15)")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="default",
+                        help="Session storage: default SqliteDb, or append-only run rows")
+    parser.add_argument("--no-telemetry", dest="telemetry", action="store_false",
+                        help="Turn off agno's per-run telemetry call")
+    parser.add_argument("--db-dir", default="tmp", help="Directory for the session databases (default: tmp)")
+    add_results_store_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.db_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    print("\n⚙️  FRAMEWORK OVERHEAD BENCHMARK")
+    print("=" * 90)
+    print(f"Runs: {args.runs} | Window: {args.window} | Limit: {args.limit} | Storage: {args.storage} | "
+          f"Telemetry: {args.telemetry} | cProfile: {args.cprofile} | Flamegraph: {args.flamegraph}")
+    print("=" * 90)
+
+    results = []
+    for name, limit in (("unlimited", None), (f"limit={args.limit}", args.limit)):
+        results.append(run_config(name, limit, args, timestamp))
+        print(f"  ✓ {name:<10} {results[-1]['elapsed_time']:.1f}s")
+    print_report(results)
+
+    filename = f"overhead_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump({'configs': results}, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, {'configs': results},
+        config={'runs': args.runs, 'window': args.window, 'limit': args.limit, 'storage': args.storage,
+                'telemetry': args.telemetry, 'cprofile': args.cprofile,
+                'flamegraph': args.flamegraph, 'profile_runs': args.profile_runs},
+        model=f"offline:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
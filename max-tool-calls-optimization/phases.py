@@ -0,0 +1,199 @@
+"""
+Per-phase timing for agent runs.
+
+PhaseTimer wraps a handful of Agent and Model methods on one agent instance
+and attributes wall time inside each run to:
+
+- session_load:     reading (or creating) the session from the DB
+- context_build:    building run messages, including history filtering
+- model_call:       provider calls (OpenAIChat.invoke / OfflineChat.invoke)
+- tool_execution:   running tool calls requested by the model
+- session_persist:  writing the session back to the DB
+- other:            everything else agno does during the run
+
+The hooked method names match agno 2.2. Methods that don't exist in the
+installed version are skipped, so that phase just reports zero.
+"""
+
+import inspect
+import os
+import sys
+import time
+from array import array
+from functools import wraps
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from percentiles import percentile  # noqa: E402
+
+PHASES = ("session_load", "context_build", "model_call", "tool_execution", "session_persist")
+
+# (method name, phase) hooked on the agent and on agent.model respectively
+AGENT_HOOKS = (
+    ("_read_or_create_session", "session_load"),
+    ("_aread_or_create_session", "session_load"),
+    ("_get_run_messages", "context_build"),
+    ("_aget_run_messages", "context_build"),
+    ("save_session", "session_persist"),
+    ("asave_session", "session_persist"),
+)
+MODEL_HOOKS = (
+    ("invoke", "model_call"),
+    ("ainvoke", "model_call"),
+    ("invoke_stream", "model_call"),
+    ("ainvoke_stream", "model_call"),
+    ("run_function_calls", "tool_execution"),
+    ("arun_function_calls", "tool_execution"),
+)
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+HISTOGRAM_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PhaseTimer:
+    """Accumulates per-phase wall time for each run of an instrumented agent"""
+
+    COLUMNS = ("total_s",) + tuple(f"{phase}_s" for phase in PHASES) + ("other_s",)
+
+    def __init__(self):
+        self.columns = {name: array("d") for name in self.COLUMNS}
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._run_start = None
+
+    # --- Instrumentation ---------------------------------------------------
+
+    def instrument(self, agent):
+        """Wrap the phase methods on this agent (and its model) in place"""
+        for name, phase in AGENT_HOOKS:
+            self._hook(agent, name, phase)
+        for name, phase in MODEL_HOOKS:
+            self._hook(agent.model, name, phase)
+        return self
+
+    def _hook(self, target, name, phase):
+        method = getattr(target, name, None)
+        if method is None or getattr(method, "_phase_timer", None) is self:
+            return
+        if inspect.isasyncgenfunction(method):
+            wrapper = self._wrap_async_gen(method, phase)
+        elif inspect.iscoroutinefunction(method):
+            wrapper = self._wrap_coroutine(method, phase)
+        elif inspect.isgeneratorfunction(method):
+            wrapper = self._wrap_gen(method, phase)
+        else:
+            wrapper = self._wrap_function(method, phase)
+        wrapper._phase_timer = self
+        # Instance attribute shadows the class method for this object only
+        setattr(target, name, wrapper)
+
+    def _add(self, phase, start):
+        self._current[phase] += time.perf_counter() - start
+
+    def _wrap_function(self, fn, phase):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(phase, start)
+        return wrapper
+
+    def _wrap_coroutine(self, fn, phase):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._add(phase, start)
+        return wrapper
+
+    def _wrap_gen(self, fn, phase):
+        # Only time spent inside the generator counts, not time spent by the consumer
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            gen = fn(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(gen)
+                except StopIteration as stop:
+                    self._add(phase, start)
+                    return stop.value
+                self._add(phase, start)
+                yield item
+        return wrapper
+
+    def _wrap_async_gen(self, fn, phase):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            agen = fn(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = await agen.__anext__()
+                except StopAsyncIteration:
+                    self._add(phase, start)
+                    return
+                self._add(phase, start)
+                yield item
+        return wrapper
+
+    # --- Per-run records ---------------------------------------------------
+
+    def begin_run(self):
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._run_start = time.perf_counter()
+
+    def end_run(self):
+        """Close the current run and return its phase record (seconds)"""
+        total = time.perf_counter() - self._run_start
+        record = {"total_s": total}
+        for phase in PHASES:
+            record[f"{phase}_s"] = self._current[phase]
+        record["other_s"] = max(0.0, total - sum(self._current.values()))
+        for name in self.COLUMNS:
+            self.columns[name].append(record[name])
+        return record
+
+    def __len__(self):
+        return len(self.columns["total_s"])
+
+    # --- Aggregation -------------------------------------------------------
+
+    @staticmethod
+    def histogram(values):
+        """Bucket durations (seconds) into HISTOGRAM_BUCKETS_MS"""
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for value in values:
+            ms = value * 1000
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if ms <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, counts))
+
+    def summary(self):
+        """Per-phase totals, mean, percentiles, share of run time and histogram"""
+        runs = len(self)
+        grand_total = sum(self.columns["total_s"]) or 1.0
+        result = {}
+        for name in self.COLUMNS:
+            values = self.columns[name]
+            ordered = sorted(values)
+            result[name[:-2]] = {
+                'total_s': sum(values),
+                'mean_ms': sum(values) / runs * 1000 if runs else 0.0,
+                'p50_ms': percentile(ordered, 50) * 1000,
+                'p95_ms': percentile(ordered, 95) * 1000,
+                'share_pct': sum(values) / grand_total * 100,
+                'histogram': self.histogram(values),
+            }
+        return result
+
+    def to_columns(self):
+        """Per-run phase records as a columnar dict of plain lists"""
+        return {name: self.columns[name].tolist() for name in self.COLUMNS}
@@ -0,0 +1,158 @@
+"""
+Sustained throughput under a provider quota: tight loop vs rate-limit scheduler.
+
+Starts ../shared/stub_server.py in a separate process with a requests-per-minute
+and tokens-per-minute quota (enforced over --quota-window-s, like a provider),
+then runs load_test.py's concurrent sessions (agent.arun, optimized agent)
+against it through OpenAIChat, once per mode:
+
+- tight-loop: every session sends its next run as soon as the last one ends;
+              the openai client retries 429s itself (--client-retries, honouring
+              Retry-After), as the scripts do without a scheduler
+- scheduled:  model requests go through RateLimitScheduler
+              (../shared/rate_limiter.py) set to the same quota, with the client's
+              retries off so the scheduler is the only layer that retries
+
+Each mode gets a fresh server with the same seed. Reported: runs/s, failed runs,
+429s per completed run, tokens/min and requests/min accepted against the quota,
+run latency p50/p99 and, for the scheduler, queue wait and estimate error.
+
+Usage:
+    python ratelimit_benchmark.py --quota-rpm 600 --quota-tpm 200000 --concurrency 16
+    python ratelimit_benchmark.py --quota-tpm 60000 --concurrency 32 --runs-per-session 10 --no-telemetry
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+from datetime import datetime
+
+from benchmark import MODEL_ID, make_db
+from load_test import run_load
+from rate_limiter import RateLimitScheduler
+from results_store import add_results_store_arguments, record_from_args
+from stub_server import StubProcess, add_stub_arguments, stub_options_from_args
+
+RESULTS_BENCHMARK = "rate_limit"
+MODES = ("tight-loop", "scheduled")
+
+
+def run_mode(mode, args, db_dir):
+    """Run every session for one mode against a fresh, quota-enforcing stub server"""
+    db = make_db(os.path.join(db_dir, f"ratelimit_{mode}.db"))
+    scheduler = None
+    if mode == "scheduled":
+        scheduler = RateLimitScheduler(rpm=args.quota_rpm, tpm=args.quota_tpm, burst_s=args.quota_window_s,
+                                       max_retries=args.rate_retries, seed=args.seed)
+    with StubProcess(**stub_options_from_args(args)) as server:
+        model_options = {
+            'offline': False,
+            'base_url': server.base_url,
+            'api_key': "stub",
+            'max_retries': 0 if scheduler is not None else args.client_retries,
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = asyncio.run(run_load(
+                mode, args.limit, db, model_options, args.concurrency, args.runs_per_session, 0.0, args.seed,
+                scheduler,
+            ))
+        stats = server.stats()
+
+    minutes = result['wall_time_s'] / 60
+    rejected = stats['status'].get('429', 0)
+    result['server'] = stats
+    result['rate_limited'] = rejected
+    result['rate_limited_per_run'] = rejected / result['completed_runs'] if result['completed_runs'] else None
+    result['accepted_rpm'] = stats['status'].get('200', 0) / minutes if minutes else 0.0
+    result['accepted_tpm'] = (stats['prompt_tokens'] + stats['completion_tokens']) / minutes if minutes else 0.0
+    return result
+
+
+def print_report(rows, args):
+    print("\n" + "=" * 90)
+    print(f"📊 THROUGHPUT UNDER QUOTA (rpm {args.quota_rpm or '-'} | tpm {args.quota_tpm or '-'})")
+    print("=" * 90)
+    print(f"{'Mode':<11} | {'Runs/s':>6} | {'Failed':>6} | {'429s':>5} | {'429/run':>7} | {'Req/min':>8} | "
+          f"{'Tok/min':>9} | {'p50':>7} | {'p99':>7}")
+    print("-" * 90)
+    for r in rows:
+        lat = r['latency_s']
+        per_run = f"{r['rate_limited_per_run']:.2f}" if r['rate_limited_per_run'] is not None else "-"
+        print(f"{r['config']:<11} | {r['throughput_rps']:>6.1f} | {r['errors']:>6} | {r['rate_limited']:>5} | "
+              f"{per_run:>7} | {r['accepted_rpm']:>8,.0f} | {r['accepted_tpm']:>9,.0f} | "
+              f"{lat['p50']:>6.2f}s | {lat['p99']:>6.2f}s")
+    print("=" * 90)
+    for r in rows:
+        if r['rate_limit']:
+            stats = r['rate_limit']
+            error = stats['estimate_error_pct']
+            print(f"  scheduler: queue wait p50/p95 {stats['queue_wait_s']['p50']:.3f}s / "
+                  f"{stats['queue_wait_s']['p95']:.3f}s | retries {stats['retries']} | "
+                  f"token estimate {'n/a' if error is None else f'{error:+.1f}%'} | min rate scale "
+                  f"{stats['min_scale']:.2f}")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Modes to compare (default: {','.join(MODES)})")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent sessions (default: 16)")
+    parser.add_argument("--runs-per-session", type=int, default=10, help="Queries per session (default: 10)")
+    parser.add_argument("--limit", type=int, default=3, help="max_tool_calls_from_history (default: 3)")
+    parser.add_argument("--client-retries", type=int, default=2,
+                        help="openai client retries in tight-loop mode (default: 2, the client's default)")
+    parser.add_argument("--rate-retries", type=int, default=5,
+                        help="Scheduler retries of a refused request (default: 5)")
+    parser.add_argument("--no-telemetry", action="store_true", help="Turn off agno's per-run telemetry call")
+    parser.add_argument("--db-dir", default=None, help="Directory for the session databases")
+    add_stub_arguments(parser)
+    add_results_store_arguments(parser)
+    parser.set_defaults(quota_rpm=600, quota_tpm=200000)
+    args = parser.parse_args(argv)
+    args.modes = args.modes.split(",")
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.no_telemetry:
+        # load_test builds its own agents; agno reads this when each Agent is created
+        os.environ["AGNO_TELEMETRY"] = "false"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    db_dir = args.db_dir or os.path.join("tmp", f"ratelimit_{timestamp}")
+    os.makedirs(db_dir, exist_ok=True)
+
+    print("\n🚦 RATE LIMIT BENCHMARK")
+    print("=" * 90)
+    print(f"Quota: {args.quota_rpm or '-'} rpm / {args.quota_tpm or '-'} tpm over {args.quota_window_s:g}s windows | "
+          f"Sessions: {args.concurrency} × {args.runs_per_session} runs | Latency: {args.latency_ms:g}ms")
+    print("=" * 90)
+
+    rows = []
+    for mode in args.modes:
+        rows.append(run_mode(mode, args, db_dir))
+        print(f"  ✓ {mode:<11} {rows[-1]['wall_time_s']:.1f}s")
+    print_report(rows, args)
+
+    filename = f"ratelimit_results_{timestamp}.json"
+    results = {'configs': rows}
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, results,
+        config={'modes': args.modes, 'concurrency': args.concurrency, 'runs_per_session': args.runs_per_session,
+                'limit': args.limit, 'client_retries': args.client_retries, 'rate_retries': args.rate_retries,
+                'telemetry': not args.no_telemetry, **stub_options_from_args(args)},
+        model=f"stub:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Long-horizon scaling: per-run cost as a function of history depth.
+
+Runs --sessions sessions of --runs runs each into one database per
+configuration, with queries from the synthetic workload generator (workload.py):
+Zipf-repeated topics from a --vocabulary sized vocabulary, and multi-tool
+comparisons. Sessions advance round-robin, so after round d every session has d
+runs of history and the database holds --sessions × d runs.
+
+For each history depth it records, averaged over the sessions:
+
+- run_ms:       wall time of agent.run
+- load_ms:      time reading the session back (PhaseTimer's session_load)
+- persist_ms:   time saving the session
+- input_tokens: input tokens of the run (summed over its model calls)
+
+plus the database size (main file + WAL) after the round. Each series is
+fitted against depth with a linear and a quadratic least-squares fit. The
+report gives both R², says which describes the growth, and projects the fits to
+--project-depth.
+
+Configurations are "unlimited" (benchmark.py's baseline) and "limit=N"
+(max_tool_calls_from_history=N, from --limits). agno stores each run's history
+copies with the run by default, so stored history grows quadratically with depth
+whatever the limit. --no-store-history turns that off (store_history_messages=False).
+--storage append stores runs with AppendOnlySqliteDb instead of rewriting the
+session row on every save.
+Unlimited history is slow beyond a few hundred runs. --max-minutes stops a
+configuration at the end of the round in which it runs out of time, and the
+depth it reached is reported.
+
+Usage:
+    python scaling_benchmark.py --offline --sessions 4 --runs 300 --no-telemetry
+    python scaling_benchmark.py --offline --sessions 1000 --runs 20 --limits 3 --no-unlimited
+    python scaling_benchmark.py --offline --sessions 1 --runs 10000 --limits 3 --no-unlimited --no-store-history
+"""
+
+import argparse
+import json
+import os
+import time
+from array import array
+from datetime import datetime
+
+import numpy as np
+
+from benchmark import (
+    MODEL_ID,
+    STORAGE_MODES,
+    add_offline_arguments,
+    build_agent,
+    build_model,
+    build_prompt,
+    make_db,
+    model_options_from_args,
+    offline_enabled,
+)
+from phases import PhaseTimer
+from results_store import add_results_store_arguments, record_from_args
+from storage_benchmark import db_size
+from workload import add_workload_arguments, workload_from_args
+
+RESULTS_BENCHMARK = "scaling"
+METRICS = ("run_ms", "load_ms", "persist_ms", "input_tokens", "db_bytes")
+# A quadratic term must explain this much more variance than a line to call growth quadratic
+QUADRATIC_R2_GAIN = 0.01
+
+
+def parse_limits(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def config_label(limit):
+    return "unlimited" if limit is None else f"limit={limit}"
+
+
+def run_config(limit, args, workload, model_options, db_dir):
+    """Run every session round-robin for one history configuration; per-depth means over sessions"""
+    label = config_label(limit)
+    db_file = os.path.join(db_dir, f"scaling_{label.replace('=', '')}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_file + suffix):
+            os.remove(db_file + suffix)
+    agent = build_agent(None, max_history_limit=limit, model=build_model(MODEL_ID, **model_options),
+                        db=make_db(db_file, args.storage))
+    agent.telemetry = args.telemetry
+    agent.store_history_messages = args.store_history
+    phase_timer = PhaseTimer().instrument(agent)
+
+    session_ids = [f"scaling-{label}-{s}" for s in range(args.sessions)]
+    queries = [workload.topics(args.runs, session=s) for s in range(args.sessions)]
+    columns = {name: array("d") for name in ("depth",) + METRICS}
+    start = time.perf_counter()
+    stopped_early = False
+    for depth in range(1, args.runs + 1):
+        totals = dict.fromkeys(("run_ms", "load_ms", "persist_ms", "input_tokens"), 0.0)
+        for session_id, topics in zip(session_ids, queries):
+            phase_timer.begin_run()
+            response = agent.run(build_prompt(next(topics)), session_id=session_id, stream=False)
+            record = phase_timer.end_run()
+            totals["run_ms"] += record["total_s"] * 1000
+            totals["load_ms"] += record["session_load_s"] * 1000
+            totals["persist_ms"] += record["session_persist_s"] * 1000
+            totals["input_tokens"] += getattr(response.metrics, "input_tokens", 0) or 0
+        columns["depth"].append(depth)
+        for name, total in totals.items():
+            columns[name].append(total / args.sessions)
+        columns["db_bytes"].append(db_size(db_file))
+        if depth % max(1, args.runs // 10) == 0:
+            print(f"   {label:<10} depth {depth:>6,}: run {columns['run_ms'][-1]:8.2f}ms, load "
+                  f"{columns['load_ms'][-1]:8.2f}ms, db {columns['db_bytes'][-1] / 1024**2:8.1f} MB")
+        if args.max_minutes and time.perf_counter() - start > args.max_minutes * 60 and depth < args.runs:
+            print(f"   {label:<10} stopped at depth {depth:,} after {args.max_minutes:g} minutes")
+            stopped_early = True
+            break
+    if args.storage == "append":
+        agent.db.flush()
+
+    per_depth = {name: values.tolist() for name, values in columns.items()}
+    return {
+        'config': label,
+        'max_history_limit': limit,
+        'sessions': args.sessions,
+        'depth_reached': len(columns["depth"]),
+        'stopped_early': stopped_early,
+        'wall_time_s': time.perf_counter() - start,
+        'per_depth': per_depth,
+        'fits': {name: fit_scaling(per_depth["depth"], per_depth[name], args.project_depth) for name in METRICS},
+    }
+
+
+def fit_scaling(depths, values, project_depth):
+    """Linear and quadratic least-squares fits of a per-depth series, with R² and a projection"""
+    x = np.asarray(depths, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if len(x) < 3:
+        return None
+    ss_total = float(np.sum((y - y.mean()) ** 2))
+    fits = {}
+    for name, degree in (("linear", 1), ("quadratic", 2)):
+        coefficients = np.polyfit(x, y, degree)
+        ss_residual = float(np.sum((y - np.polyval(coefficients, x)) ** 2))
+        fits[name] = {
+            'coefficients': coefficients.tolist(),  # highest power first, as numpy.polyfit
+            'r2': 1.0 - ss_residual / ss_total if ss_total > 0 else 1.0,
+            'projected': float(np.polyval(coefficients, project_depth)),
+        }
+    quadratic = fits["quadratic"]["coefficients"][0] > 0 and \
+        fits["quadratic"]["r2"] - fits["linear"]["r2"] > QUADRATIC_R2_GAIN
+    fits['growth'] = "quadratic" if quadratic else "linear"
+    fits['project_depth'] = project_depth
+    return fits
+
+
+def bucket_means(per_depth, name, buckets=10):
+    """Mean of a per-depth series over `buckets` equal depth ranges, labelled by their last depth"""
+    values, depths = per_depth[name], per_depth["depth"]
+    size = max(1, len(values) // buckets)
+    rows = []
+    for end in range(size, len(values) + 1, size):
+        window = values[end - size:end]
+        rows.append((int(depths[end - 1]), values[end - 1] if name == "db_bytes" else sum(window) / len(window)))
+    return rows
+
+
+def print_report(rows, args):
+    print("\n" + "=" * 90)
+    print(f"📊 SCALING BY HISTORY DEPTH ({args.sessions:,} sessions per DB; mean per run over each depth range)")
+    print("=" * 90)
+    for r in rows:
+        print(f"\n{r['config']} (depth reached {r['depth_reached']:,}, {r['wall_time_s']:.0f}s)")
+        print(f"  {'Depth':>7} | {'Run ms':>9} | {'Load ms':>9} | {'Persist ms':>10} | {'Input tok':>10} | {'DB MB':>9}")
+        series = {name: bucket_means(r['per_depth'], name) for name in METRICS}
+        for i, (depth, run_ms) in enumerate(series["run_ms"]):
+            print(f"  {depth:>7,} | {run_ms:>9.2f} | {series['load_ms'][i][1]:>9.2f} | "
+                  f"{series['persist_ms'][i][1]:>10.2f} | {series['input_tokens'][i][1]:>10,.0f} | "
+                  f"{series['db_bytes'][i][1] / 1024**2:>9.2f}")
+
+    print("\n" + "-" * 90)
+    print(f"📈 FITS AGAINST DEPTH (R²; projection to depth {args.project_depth:,} with the better fit)")
+    print("-" * 90)
+    print(f"  {'Metric':<13} | {'Config':<10} | {'Linear R²':>9} | {'Quad R²':>8} | {'Growth':<9} | "
+          f"{'Slope/depth':>12} | {'Projected':>14}")
+    for name in METRICS:
+        for r in rows:
+            fit = r['fits'][name]
+            if fit is None:
+                continue
+            best = fit[fit['growth']]
+            scale = 1024**2 if name == "db_bytes" else 1
+            unit = " MB" if name == "db_bytes" else ""
+            print(f"  {name:<13} | {r['config']:<10} | {fit['linear']['r2']:>9.3f} | {fit['quadratic']['r2']:>8.3f} | "
+                  f"{fit['growth']:<9} | {fit['linear']['coefficients'][0] / scale:>12,.4f} | "
+                  f"{best['projected'] / scale:>11,.1f}{unit:<3}")
+    print("=" * 90)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="Sessions per database (default: 4)")
+    parser.add_argument("--runs", type=int, default=300, help="Runs per session, i.e. final depth (default: 300)")
+    parser.add_argument("--limits", type=parse_limits, default=[3],
+                        help="Comma-separated max_tool_calls_from_history values (default: 3)")
+    parser.add_argument("--no-unlimited", dest="unlimited", action="store_false",
+                        help="Skip the unlimited-history configuration")
+    parser.add_argument("--no-store-history", dest="store_history", action="store_false",
+                        help="Do not store history copies with each run (store_history_messages=False)")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="default",
+                        help="Session storage: default SqliteDb, or append-only run rows")
+    parser.add_argument("--project-depth", type=int, default=10000,
+                        help="Depth to project the fits to (default: 10000)")
+    parser.add_argument("--max-minutes", type=float, default=None,
+                        help="Stop a configuration after the round in which it exceeds this")
+    parser.add_argument("--no-telemetry", dest="telemetry", action="store_false",
+                        help="Turn off agno's per-run telemetry call")
+    parser.add_argument("--db-dir", default=None, help="Directory for the session databases")
+    add_workload_arguments(parser)
+    add_offline_arguments(parser)
+    add_results_store_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    workload = workload_from_args(args)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    db_dir = args.db_dir or os.path.join("tmp", f"scaling_{timestamp}")
+    os.makedirs(db_dir, exist_ok=True)
+    limits = ([None] if args.unlimited else []) + args.limits
+
+    print("\n📏 LONG-HORIZON SCALING BENCHMARK")
+    print("=" * 90)
+    print(f"Configs: {', '.join(config_label(limit) for limit in limits)} | Sessions: {args.sessions:,} × "
+          f"{args.runs:,} runs | Storage: {args.storage} | "
+          f"Store history copies: {args.store_history}")
+    print(f"Workload: {workload} (~{workload.expected_tool_calls():.2f} tool calls per query)")
+    print("=" * 90)
+
+    rows = []
+    for limit in limits:
+        print(f"\n▶ {config_label(limit)}")
+        rows.append(run_config(limit, args, workload, model_options, db_dir))
+    print_report(rows, args)
+
+    filename = f"scaling_results_{timestamp}.json"
+    results = {'configs': rows}
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, results,
+        config={'sessions': args.sessions, 'runs': args.runs, 'limits': limits, 'storage': args.storage,
+                'store_history': args.store_history,
+                'telemetry': args.telemetry, 'vocabulary': args.vocabulary, 'zipf_s': args.zipf_s,
+                'multi_tool_rate': args.multi_tool_rate, 'max_fanout': args.max_fanout,
+                'workload_seed': args.workload_seed, **model_options},
+        model=f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
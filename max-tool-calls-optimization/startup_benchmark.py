@@ -0,0 +1,234 @@
+"""
+Cold-start cost of the demos: imports, Agent construction and first request.
+
+Short-lived workers pay for imports and agent setup on their first request.
+Every measurement that involves imports runs in a fresh interpreter (this
+script re-invoked with --child), --repeats times, and the median is reported:
+
+- imports:  time to import each module on its own, and whether importing it
+            printed anything (a demo that does its work at import time does)
+- startup:  a worker that imports benchmark, builds the optimized agent and
+            serves two queries, either eagerly (build_agent, as the runners do)
+            or through AgentFactory (../shared/agent_factory.py) with warm()
+            before the first request. Reported: import, ready (construction,
+            plus warm-up for the factory), first and second request, and the
+            whole process from spawn to exit
+- construct: in this process, µs per build_agent() call against µs per
+            AgentFactory.get() of an already built agent
+
+Usage:
+    python startup_benchmark.py
+    python startup_benchmark.py --repeats 7 --no-telemetry
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from results_store import add_results_store_arguments, record_from_args  # noqa: E402
+
+RESULTS_BENCHMARK = "startup"
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEARCH_PATH = [HERE, os.path.join(HERE, "..", "shared"), os.path.join(HERE, "..", "response-caching")]
+IMPORTS = (
+    "agno.agent",
+    "agno.db.sqlite",
+    "agno.models.openai",
+    "offline_model",
+    "benchmark",
+    "scenarios",
+    "simple_comparison",
+    "full_day_simulation",
+)
+STARTUP_MODES = ("eager", "factory")
+QUERIES = ("Tell me about AI chips", "Tell me about edge AI")
+
+
+def child_import(module):
+    """Import `module` and report how long it took and whether it printed"""
+    sys.path[:0] = SEARCH_PATH
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        importlib.import_module(module)
+    return {'import_ms': (time.perf_counter() - start) * 1000, 'printed_chars': len(out.getvalue())}
+
+
+def child_startup(mode, db_file, telemetry):
+    """Serve QUERIES from a fresh process, building the agent eagerly or through AgentFactory"""
+    start = time.perf_counter()
+    sys.path[:0] = SEARCH_PATH
+    import benchmark
+
+    imported = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "eager":
+            agent = benchmark.build_agent(db_file, max_history_limit=3,
+                                          model=benchmark.build_model(benchmark.MODEL_ID, offline=True))
+            if telemetry is not None:
+                agent.telemetry = telemetry
+        else:
+            from agent_factory import AgentFactory
+
+            factory = AgentFactory(telemetry=telemetry)
+            factory.register("optimized", lambda f: benchmark.build_agent(
+                None, max_history_limit=3, model=f.model(benchmark.MODEL_ID, offline=True), db=f.db(db_file)))
+            factory.warm()
+            agent = factory.get("optimized")
+        ready = time.perf_counter()
+        request_ms = []
+        for query in QUERIES:
+            request_start = time.perf_counter()
+            agent.run(query, stream=False)
+            request_ms.append((time.perf_counter() - request_start) * 1000)
+    return {
+        'import_ms': (imported - start) * 1000,
+        'ready_ms': (ready - imported) * 1000,
+        'first_request_ms': request_ms[0],
+        'second_request_ms': request_ms[1],
+        'to_first_response_ms': (ready - start) * 1000 + request_ms[0],
+    }
+
+
+def spawn(args):
+    """Run this script with --child args in a fresh interpreter and return its JSON and wall time"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *args],
+                               capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def median_of(records):
+    return {key: statistics.median(r[key] for r in records) for key in records[0]}
+
+
+def measure_imports(repeats):
+    rows = []
+    for module in IMPORTS:
+        records = [spawn(["import", module]) for _ in range(repeats)]
+        row = {'module': module, **median_of(records)}
+        row['side_effects'] = any(r['printed_chars'] for r in records)
+        rows.append(row)
+        print(f"  ✓ import {module:<22} {row['import_ms']:>8.1f}ms")
+    return rows
+
+
+def measure_startup(repeats, telemetry, db_dir):
+    rows = []
+    for mode in STARTUP_MODES:
+        records = []
+        for i in range(repeats):
+            db_file = os.path.join(db_dir, f"startup_{mode}_{i}.db")
+            records.append(spawn(["startup", mode, db_file, json.dumps(telemetry)]))
+        rows.append({'mode': mode, **median_of(records)})
+        print(f"  ✓ startup {mode:<8} first response after {rows[-1]['to_first_response_ms']:.0f}ms")
+    return rows
+
+
+def measure_construction(count, db_dir):
+    """µs per build_agent() vs per AgentFactory.get() of a built agent, in this process"""
+    sys.path[:0] = SEARCH_PATH
+    import benchmark
+    from agent_factory import AgentFactory
+
+    model = benchmark.build_model(benchmark.MODEL_ID, offline=True)
+    db = benchmark.make_db(os.path.join(db_dir, "construct.db"))
+    benchmark.build_agent(None, max_history_limit=3, model=model, db=db)  # first build pays for lazy imports
+    start = time.perf_counter()
+    for _ in range(count):
+        benchmark.build_agent(None, max_history_limit=3, model=model, db=db)
+    build_us = (time.perf_counter() - start) / count * 1e6
+
+    factory = AgentFactory().register(
+        "optimized", lambda f: benchmark.build_agent(None, max_history_limit=3, model=model, db=db))
+    factory.get("optimized")
+    start = time.perf_counter()
+    for _ in range(count):
+        factory.get("optimized")
+    get_us = (time.perf_counter() - start) / count * 1e6
+    return {'constructions': count, 'build_agent_us': build_us, 'factory_get_us': get_us}
+
+
+def print_report(results):
+    print("\n" + "=" * 90)
+    print("📊 STARTUP (median of fresh processes)")
+    print("=" * 90)
+    print(f"{'Module':<24} | {'Import':>10} | Side effects at import")
+    print("-" * 90)
+    for row in results['imports']:
+        print(f"{row['module']:<24} | {row['import_ms']:>8.1f}ms | {'⚠️  yes' if row['side_effects'] else 'no'}")
+    print()
+    print(f"{'Worker':<8} | {'Import':>9} | {'Ready':>9} | {'1st req':>9} | {'2nd req':>9} | "
+          f"{'To 1st response':>15} | {'Process':>9}")
+    print("-" * 90)
+    for row in results['startup']:
+        print(f"{row['mode']:<8} | {row['import_ms']:>7.1f}ms | {row['ready_ms']:>7.1f}ms | "
+              f"{row['first_request_ms']:>7.1f}ms | {row['second_request_ms']:>7.1f}ms | "
+              f"{row['to_first_response_ms']:>13.1f}ms | {row['process_ms']:>7.0f}ms")
+    construct = results['construct']
+    print()
+    print(f"Agent construction: {construct['build_agent_us']:,.0f}µs per build_agent() | "
+          f"{construct['factory_get_us']:,.1f}µs per AgentFactory.get() (reused)")
+    print("=" * 90)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh processes per measurement (default: 5)")
+    parser.add_argument("--constructions", type=int, default=200,
+                        help="build_agent() calls timed in-process (default: 200)")
+    parser.add_argument("--no-telemetry", dest="telemetry", action="store_const", const=False, default=None,
+                        help="Turn off agno's per-run telemetry call in the startup workers")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    add_results_store_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        kind, *rest = args.child
+        if kind == "import":
+            result = child_import(rest[0])
+        else:
+            result = child_startup(rest[0], rest[1], json.loads(rest[2]))
+        print(json.dumps(result))
+        return
+
+    print("\n🚀 STARTUP BENCHMARK")
+    print("=" * 90)
+    print(f"Repeats: {args.repeats} | Telemetry: {'agno default' if args.telemetry is None else args.telemetry}")
+    print("=" * 90)
+    with tempfile.TemporaryDirectory() as db_dir:
+        results = {
+            'imports': measure_imports(args.repeats),
+            'startup': measure_startup(args.repeats, args.telemetry, db_dir),
+            'construct': measure_construction(args.constructions, db_dir),
+        }
+    print_report(results)
+
+    filename = f"startup_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(args, RESULTS_BENCHMARK, results,
+                     config={'repeats': args.repeats, 'constructions': args.constructions,
+                             'telemetry': args.telemetry},
+                     model="offline:gpt-4o-mini")
+
+
+if __name__ == "__main__":
+    main()
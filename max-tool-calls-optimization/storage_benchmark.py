@@ -0,0 +1,226 @@
+"""
+Session storage growth benchmark.
+
+Runs one long agent session and records, for every run:
+
+- persist latency (time inside agent.save_session)
+- load latency (time inside reading the session back)
+- bytes written to disk while persisting (from /proc/self/io where available,
+  otherwise the growth of the database file and its WAL)
+- database file size (main file + WAL)
+
+for agno's default SqliteDb, which rewrites the whole session row on every
+save, and for AppendOnlySqliteDb (shared/append_only_db.py), which appends each
+run as its own row.
+
+Only the last 3 runs are put in the model context by default, so the numbers
+isolate storage cost. The full history is still stored either way.
+--full-context uses the benchmark's unlimited-history baseline agent instead.
+
+Both storages read the session back from the DB on every run. --cache-session
+keeps it in memory instead (agno's cache_session) for both, and the load column
+is then labelled as cached, since it no longer measures the store.
+
+--batch-size > 1 implies --cache-session. AppendOnlySqliteDb flushes buffered
+saves before every read, so reading the session back would move the batched
+writes into load time and show persist cost as ~0. The last, partial batch is
+flushed after the final run and counted as that run's persist work.
+
+Usage:
+    python storage_benchmark.py --offline --runs 2000
+    python storage_benchmark.py --offline --runs 5000 --storage append --batch-size 20 --cache-session
+"""
+
+import argparse
+import json
+import os
+import time
+from array import array
+from datetime import datetime
+from functools import wraps
+
+from benchmark import (
+    MODEL_ID,
+    STORAGE_MODES,
+    add_offline_arguments,
+    build_agent,
+    build_model,
+    build_topics,
+    make_db,
+    model_options_from_args,
+)
+from percentiles import percentile
+from phases import PhaseTimer
+
+
+def bytes_written():
+    """Bytes this process has passed to write() so far, or None if not available"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def db_size(db_file):
+    return sum(os.path.getsize(db_file + suffix) for suffix in ("", "-wal") if os.path.exists(db_file + suffix))
+
+
+class PersistMeter:
+    """Bytes written by each agent.save_session call"""
+
+    def __init__(self, agent, db_file):
+        self.db_file = db_file
+        self.last = 0
+        save = agent.save_session
+
+        @wraps(save)
+        def metered_save(*args, **kwargs):
+            before = bytes_written()
+            size_before = db_size(db_file) if before is None else 0
+            try:
+                return save(*args, **kwargs)
+            finally:
+                after = bytes_written()
+                self.last += (after - before) if before is not None else max(0, db_size(db_file) - size_before)
+
+        agent.save_session = metered_save
+
+
+def run_storage(storage, runs, db_file, model_options, batch_size=1, full_context=False, cache_session=False):
+    """Run one session of `runs` runs and return per-run storage columns"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_file + suffix):
+            os.remove(db_file + suffix)
+    db = make_db(db_file, storage, batch_size)
+    agent = build_agent(None, model=build_model(MODEL_ID, **model_options), db=db, session_id=f"storage-{storage}",
+                        cache_session=cache_session)
+    if not full_context:
+        agent.num_history_runs = 3
+    # PhaseTimer wraps save_session first, so its persist time excludes the byte accounting below
+    phase_timer = PhaseTimer().instrument(agent)
+    meter = PersistMeter(agent, db_file)
+
+    columns = {
+        "persist_ms": array("d"), "load_ms": array("d"), "run_ms": array("d"),
+        "bytes_written": array("q"), "db_bytes": array("q"),
+    }
+    for i, topic in enumerate(build_topics(runs), 1):
+        meter.last = 0
+        phase_timer.begin_run()
+        agent.run(f"Tell me about {topic}")
+        record = phase_timer.end_run()
+        columns["persist_ms"].append(record["session_persist_s"] * 1000)
+        columns["load_ms"].append(record["session_load_s"] * 1000)
+        columns["run_ms"].append(record["total_s"] * 1000)
+        columns["bytes_written"].append(meter.last)
+        columns["db_bytes"].append(db_size(db_file))
+        if i % max(1, runs // 10) == 0:
+            print(f"   {storage:<8} run {i:>6,}: persist {columns['persist_ms'][-1]:7.2f}ms, "
+                  f"{columns['bytes_written'][-1]:>10,} B written, db {columns['db_bytes'][-1] / 1024**2:7.1f} MB")
+    if storage == "append" and runs:
+        # Buffered saves still pending are this session's persist work too
+        before = bytes_written()
+        size_before = db_size(db_file) if before is None else 0
+        start = time.perf_counter()
+        db.flush()
+        columns["persist_ms"][-1] += (time.perf_counter() - start) * 1000
+        after = bytes_written()
+        flushed = (after - before) if before is not None else max(0, db_size(db_file) - size_before)
+        columns["bytes_written"][-1] += flushed
+        columns["db_bytes"][-1] = db_size(db_file)
+    return {name: values.tolist() for name, values in columns.items()}
+
+
+def window_stats(values, start, end):
+    ordered = sorted(values[start:end])
+    return {'mean': sum(ordered) / len(ordered) if ordered else 0.0, 'p50': percentile(ordered, 50),
+            'p95': percentile(ordered, 95)}
+
+
+def summarize(storage, columns):
+    """Compare the first and last 10% of runs to show how per-run cost grows"""
+    runs = len(columns["persist_ms"])
+    tenth = max(1, runs // 10)
+    first, last = (0, tenth), (runs - tenth, runs)
+    summary = {'storage': storage, 'runs': runs, 'final_db_bytes': columns["db_bytes"][-1] if runs else 0,
+               'total_bytes_written': sum(columns["bytes_written"])}
+    for name in ("persist_ms", "load_ms", "bytes_written"):
+        head = window_stats(columns[name], *first)
+        tail = window_stats(columns[name], *last)
+        summary[name] = {'first_10pct': head, 'last_10pct': tail,
+                         'growth': tail['mean'] / head['mean'] if head['mean'] else 0.0}
+    return summary
+
+
+def print_report(summaries, cache_session=False):
+    print("\n" + "=" * 90)
+    print("📊 SESSION STORAGE GROWTH (mean per run: first 10% → last 10% of runs)")
+    print("=" * 90)
+    load_label = "Load ms (cached)" if cache_session else "Load ms (from DB)"
+    print(f"{'Storage':<9} | {'Persist ms':>22} | {load_label:>20} | {'Bytes written/run':>24} | {'DB size':>8}")
+    print("-" * 90)
+    for s in summaries:
+        p, l, b = s['persist_ms'], s['load_ms'], s['bytes_written']
+        print(f"{s['storage']:<9} | {p['first_10pct']['mean']:>7.2f} → {p['last_10pct']['mean']:>7.2f} "
+              f"({p['growth']:>4.1f}x) | {l['first_10pct']['mean']:>6.2f} → {l['last_10pct']['mean']:>6.2f} "
+              f"({l['growth']:>4.1f}x) | {b['first_10pct']['mean']:>8,.0f} → {b['last_10pct']['mean']:>8,.0f} "
+              f"({b['growth']:>4.1f}x) | {s['final_db_bytes'] / 1024**2:>6.1f}MB")
+    print("=" * 90)
+    if cache_session:
+        print("Sessions were kept in memory between runs (--cache-session); load time does not include the DB read.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=2000, help="Runs in the session (default: 2000)")
+    parser.add_argument("--storage", choices=STORAGE_MODES + ("both",), default="both")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="AppendOnlySqliteDb: commit every N saves (default: 1, write-through)")
+    parser.add_argument("--full-context", action="store_true",
+                        help="Put the unlimited history in context, like the benchmark baseline")
+    parser.add_argument("--cache-session", action="store_true",
+                        help="Keep the session in memory between runs instead of reading it back (both storages)")
+    parser.add_argument("--db-dir", default="tmp", help="Directory for the benchmark databases")
+    add_offline_arguments(parser)
+    args = parser.parse_args(argv)
+    model_options = model_options_from_args(args)
+    if args.batch_size > 1 and args.storage != "default" and not args.cache_session:
+        print("ℹ️  --batch-size > 1 implies --cache-session: reading the session back would flush the batch "
+              "and count its writes as load time")
+        args.cache_session = True
+
+    print("\n💾 SESSION STORAGE GROWTH BENCHMARK")
+    print("=" * 90)
+    print(f"Runs: {args.runs:,} | Storage: {args.storage} | Batch size: {args.batch_size} | "
+          f"Session: {'cached' if args.cache_session else 'read from DB'}")
+    print("=" * 90)
+
+    os.makedirs(args.db_dir, exist_ok=True)
+    modes = STORAGE_MODES if args.storage == "both" else (args.storage,)
+    per_run = {}
+    summaries = []
+    for storage in modes:
+        print(f"\n▶ {storage}")
+        start = time.perf_counter()
+        per_run[storage] = run_storage(
+            storage, args.runs, os.path.join(args.db_dir, f"storage_{storage}.db"), model_options,
+            batch_size=args.batch_size, full_context=args.full_context, cache_session=args.cache_session,
+        )
+        summaries.append(summarize(storage, per_run[storage]))
+        summaries[-1]['wall_time_s'] = time.perf_counter() - start
+        summaries[-1]['cache_session'] = args.cache_session
+    print_report(summaries, args.cache_session)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"storage_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump({'summary': summaries, 'per_run': per_run}, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
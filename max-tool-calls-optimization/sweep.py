@@ -0,0 +1,174 @@
+"""
+Parallel parameter sweep for max_tool_calls_from_history.
+
+Runs every (limit, session length) combination in its own process with its own
+SqliteDb file, then merges the results into one table showing how tokens and
+latency per run change with the history limit.
+
+Usage:
+    python sweep.py --offline
+    python sweep.py --offline --limits 0,1,3,unlimited --queries 50,500 --workers 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from benchmark import (
+    MODEL_ID,
+    add_offline_arguments,
+    build_model,
+    build_topics,
+    model_options_from_args,
+    run_baseline_agent,
+    run_optimized_agent,
+)
+
+DEFAULT_LIMITS = "0,1,2,3,5,10,unlimited"
+DEFAULT_QUERY_COUNTS = "50,500,5000"
+
+
+def parse_limits(value):
+    """Parse "0,3,unlimited" into [0, 3, None]"""
+    limits = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        limits.append(None if item in ("unlimited", "none", "inf") else int(item))
+    return limits
+
+
+def limit_label(limit):
+    return "unlimited" if limit is None else str(limit)
+
+
+def run_cell(limit, queries, model_options, db_dir, verify):
+    """Run one sweep cell in a worker process and return its summary"""
+    label = limit_label(limit)
+    db_file = os.path.join(db_dir, f"limit_{label}_n{queries}.db")
+    series_path = os.path.join(db_dir, f"limit_{label}_n{queries}.jsonl")
+    topics = build_topics(queries)
+    model = build_model(MODEL_ID, **model_options)
+
+    # Per-run tables from the runners are noise when dozens of cells run at once
+    with contextlib.redirect_stdout(io.StringIO()):
+        if limit is None:
+            result = run_baseline_agent(
+                topics, model=model, verify=verify, series_path=series_path, db_file=db_file
+            )
+        else:
+            result = run_optimized_agent(
+                topics, max_history_limit=limit, model=model, verify=verify,
+                series_path=series_path, db_file=db_file,
+            )
+
+    return {
+        'limit': label,
+        'queries': queries,
+        'avg_context_per_query': result['avg_context_per_query'],
+        'total_tokens': result['metrics']['total_tokens'],
+        'tokens_per_run': result['metrics']['total_tokens'] / queries,
+        'tokens_per_run_p95': result['tokens_per_run']['p95'],
+        'latency_mean_s': result['latency_s']['mean'],
+        'latency_p50_s': result['latency_s']['p50'],
+        'latency_p95_s': result['latency_s']['p95'],
+        'elapsed_time': result['elapsed_time'],
+        'series_path': series_path,
+    }
+
+
+def run_sweep(limits, query_counts, model_options, workers=None, verify=False, db_dir=None):
+    """Run the full grid across a process pool and return the merged rows"""
+    db_dir = db_dir or os.path.join("tmp", f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(db_dir, exist_ok=True)
+
+    # Longest sessions first so the slowest cells don't start last
+    cells = sorted(
+        ((limit, queries) for limit in limits for queries in query_counts),
+        key=lambda cell: cell[1],
+        reverse=True,
+    )
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_cell, limit, queries, model_options, db_dir, verify): (limit, queries)
+            for limit, queries in cells
+        }
+        for future in as_completed(futures):
+            limit, queries = futures[future]
+            row = future.result()
+            rows.append(row)
+            print(f"  ✓ limit={limit_label(limit):<9} queries={queries:<6} "
+                  f"{row['elapsed_time']:.1f}s ({len(rows)}/{len(cells)})")
+
+    order = {limit_label(limit): i for i, limit in enumerate(limits)}
+    rows.sort(key=lambda row: (order[row['limit']], row['queries']))
+    return rows
+
+
+def print_sweep_table(rows):
+    """Print the merged token/latency curve, one block per limit"""
+    print("\n" + "=" * 90)
+    print("📊 SWEEP RESULTS")
+    print("=" * 90 + "\n")
+    print(f"{'Limit':<10} | {'Queries':>7} | {'Avg Ctx':>8} | {'Tokens/Run':>10} | "
+          f"{'p95 Tok':>9} | {'Lat p50':>8} | {'Lat p95':>8}")
+    print("-" * 90)
+    previous = None
+    for row in rows:
+        if previous is not None and row['limit'] != previous:
+            print("-" * 90)
+        previous = row['limit']
+        print(f"{row['limit']:<10} | {row['queries']:>7} | {row['avg_context_per_query']:>8.1f} | "
+              f"{row['tokens_per_run']:>10,.0f} | {row['tokens_per_run_p95']:>9,.0f} | "
+              f"{row['latency_p50_s']:>7.3f}s | {row['latency_p95_s']:>7.3f}s")
+    print("=" * 90)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Sweep max_tool_calls_from_history limits in parallel")
+    parser.add_argument("--limits", default=DEFAULT_LIMITS,
+                        help=f"Comma-separated limits, 'unlimited' for no limit (default: {DEFAULT_LIMITS})")
+    parser.add_argument("--queries", default=DEFAULT_QUERY_COUNTS,
+                        help=f"Comma-separated session lengths (default: {DEFAULT_QUERY_COUNTS})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Cross-check each cell's tool call ledger against its SqliteDb")
+    add_offline_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the sweep and save merged results"""
+    args = parse_args(argv)
+    limits = parse_limits(args.limits)
+    query_counts = [int(q) for q in args.queries.split(",")]
+
+    print("\n🧪 max_tool_calls_from_history SWEEP")
+    print("=" * 90)
+    print(f"Limits:   {', '.join(limit_label(limit) for limit in limits)}")
+    print(f"Queries:  {', '.join(str(q) for q in query_counts)}")
+    print(f"Workers:  {args.workers}")
+    print("=" * 90 + "\n")
+
+    start = time.time()
+    rows = run_sweep(limits, query_counts, model_options_from_args(args),
+                     workers=args.workers, verify=args.verify)
+    print_sweep_table(rows)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"sweep_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump({'sweep': rows, 'elapsed_time': time.time() - start}, f, indent=2)
+    print(f"\n✅ Sweep finished in {time.time() - start:.1f}s, results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
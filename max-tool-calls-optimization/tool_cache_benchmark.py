@@ -0,0 +1,160 @@
+"""
+End-to-end effect of memoizing tool results when tools are slow.
+
+get_info_about_topic is given a synthetic latency (--tool-latency-ms, with
+--tool-latency-jitter-ms of uniform jitter), standing in for a search API or
+database query. The optimized agent (max_tool_calls_from_history=--limit) then
+runs the same session twice:
+
+- direct:   every tool call executes the tool
+- memoized: tool calls go through ToolCache (../shared/tool_cache.py), keyed by
+            tool name and normalized arguments, with --tool-cache-ttl and
+            --tool-cache-size
+
+Queries are drawn at random (seeded) from --distinct-topics topics, so the
+same call recurs within a few runs. For each it reports session wall time, run
+latency p50 / p95, the mean time per run in agno's tool execution phase and
+the cache's hit rate.
+
+Usage:
+    python tool_cache_benchmark.py --offline --queries 100 --tool-latency-ms 200
+    python tool_cache_benchmark.py --offline --tool-latency-ms 500 --tool-latency-jitter-ms 200 --tool-cache-ttl 5
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from benchmark import (
+    MODEL_ID,
+    BENCHMARK_QUERIES,
+    add_offline_arguments,
+    build_model,
+    model_options_from_args,
+    offline_enabled,
+    run_optimized_agent,
+    seed_tools,
+    set_tool_latency,
+)
+from results_store import add_results_store_arguments, record_from_args
+from tool_cache import ToolCache
+
+RESULTS_BENCHMARK = "tool_cache"
+
+
+def summarize(name, result):
+    """Wall time, latency and tool-phase time of one configuration"""
+    return {
+        'config': name,
+        'elapsed_time': result['elapsed_time'],
+        'latency_s': result['latency_s'],
+        'tool_execution_ms': result['phases']['summary']['tool_execution']['mean_ms'],
+        'total_tokens': result['metrics']['total_tokens'],
+        'tool_cache': result['tool_cache'],
+    }
+
+
+def run_config(name, topics, model_options, seed, db_dir, limit, tool_cache=None):
+    """Run the optimized agent from `seed` and return its summary"""
+    seed_tools(seed)
+    model = build_model(MODEL_ID, **{**model_options, 'seed': seed})
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_optimized_agent(
+            topics, max_history_limit=limit, model=model, verify=False,
+            db_file=os.path.join(db_dir, f"{name}.db"), tool_cache=tool_cache,
+        )
+    return summarize(name, result)
+
+
+def print_report(rows):
+    direct = rows[0]
+    print("\n" + "=" * 90)
+    print("📊 TOOL MEMOIZATION")
+    print("=" * 90)
+    print(f"{'Config':<9} | {'Wall time':>10} | {'Lat p50':>9} | {'Lat p95':>9} | {'Tool ms/run':>11} | "
+          f"{'Hit rate':>8} | {'Speedup':>7}")
+    print("-" * 90)
+    for r in rows:
+        cache = r['tool_cache']
+        hit_rate = f"{cache['hit_rate'] * 100:.1f}%" if cache else "-"
+        print(f"{r['config']:<9} | {r['elapsed_time']:>9.2f}s | {r['latency_s']['p50'] * 1000:>7.1f}ms | "
+              f"{r['latency_s']['p95'] * 1000:>7.1f}ms | {r['tool_execution_ms']:>9.1f}ms | {hit_rate:>8} | "
+              f"{direct['elapsed_time'] / r['elapsed_time']:>6.2f}x")
+    print("=" * 90)
+    for r in rows[1:]:
+        cache = r['tool_cache']
+        print(f"  {r['config']}: {cache['hits']} hits, {cache['misses']} misses, {cache['expired']} expired, "
+              f"{cache['evictions']} evicted, {direct['elapsed_time'] - r['elapsed_time']:.2f}s saved end to end")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100, help="Runs per session (default: 100)")
+    parser.add_argument("--limit", type=int, default=3, help="max_tool_calls_from_history (default: 3)")
+    parser.add_argument("--distinct-topics", type=int, default=10,
+                        help="Topics the queries are drawn from (default: 10)")
+    parser.add_argument("--tool-latency-ms", type=float, default=200.0,
+                        help="Synthetic latency of each tool call (default: 200)")
+    parser.add_argument("--tool-latency-jitter-ms", type=float, default=0.0,
+                        help="Uniform ± jitter on the tool latency (default: 0)")
+    parser.add_argument("--tool-cache-ttl", type=float, default=None,
+                        help="Seconds a memoized result stays valid (default: no expiry)")
+    parser.add_argument("--tool-cache-size", type=int, default=None,
+                        help="Maximum memoized results (default: unbounded)")
+    parser.add_argument("--db-dir", default=None, help="Directory for the session databases")
+    add_offline_arguments(parser)
+    add_results_store_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.seed is None:
+        args.seed = 42
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    set_tool_latency(args.tool_latency_ms, args.tool_latency_jitter_ms)
+    rng = random.Random(args.seed)
+    pool = BENCHMARK_QUERIES[:args.distinct_topics]
+    topics = [rng.choice(pool) for _ in range(args.queries)]
+    db_dir = args.db_dir or os.path.join("tmp", f"tool_cache_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(db_dir, exist_ok=True)
+
+    print("\n🧠 TOOL MEMOIZATION BENCHMARK")
+    print("=" * 90)
+    print(f"Queries: {args.queries} over {len(pool)} topics | Tool latency: {args.tool_latency_ms:g}"
+          f"±{args.tool_latency_jitter_ms:g}ms | TTL: {args.tool_cache_ttl} | Size: {args.tool_cache_size}")
+    print("=" * 90)
+
+    start = time.time()
+    rows = []
+    for name, tool_cache in (("direct", None),
+                             ("memoized", ToolCache(ttl_s=args.tool_cache_ttl, max_entries=args.tool_cache_size))):
+        rows.append(run_config(name, topics, model_options, args.seed, db_dir, args.limit, tool_cache))
+        print(f"  ✓ {name:<9} {rows[-1]['elapsed_time']:.1f}s")
+    print_report(rows)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"tool_cache_results_{timestamp}.json"
+    results = {'configs': rows, 'elapsed_time': time.time() - start}
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, RESULTS_BENCHMARK, results,
+        config={'queries': args.queries, 'distinct_topics': args.distinct_topics, 'limit': args.limit,
+                'tool_latency_ms': args.tool_latency_ms, 'tool_latency_jitter_ms': args.tool_latency_jitter_ms,
+                'tool_cache_ttl': args.tool_cache_ttl, 'tool_cache_size': args.tool_cache_size,
+                **model_options},
+        model=f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Repeated, seeded trials of the benchmark with bootstrap confidence intervals
+and a regression gate.
+
+benchmark.py runs each configuration once, so its savings percentages come
+with unknown variance. trials.py runs the baseline and optimized agents
+`--trials` times. Trial i seeds the tool responses and the offline model's
+latency with `--seed + i`, and both agents in a trial share that seed. For each
+configuration it reports the mean and a percentile-bootstrap confidence
+interval of:
+
+- total and input tokens per session
+- average tool calls in context per run
+- run latency p50 / p95 and session wall time
+- the paired savings (token, cost, context reduction) between the two agents
+
+Every trials run is recorded in the results store (`../shared/results_store.py`).
+With --gate, the run is checked against a stored baseline: the previous run
+with the same configuration, or --baseline-run. A metric regresses when even
+the optimistic end of its confidence interval is worse than the baseline mean
+by more than --threshold-pct. Any regression makes the script exit with
+status 1, e.g. to catch performance regressions after an agno upgrade.
+Without a stored baseline the gate passes and this run is stored as the
+baseline, unless --no-results-db is given; --require-baseline makes a missing
+baseline fail the gate instead, so a CI job cannot pass without comparing.
+
+Usage:
+    python trials.py --offline --trials 10 --queries 50
+    python trials.py --offline --latency-ms 50 --latency-jitter-ms 20 --trials 20 --gate --threshold-pct 5
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from benchmark import (
+    MODEL_ID,
+    add_offline_arguments,
+    build_model,
+    build_topics,
+    calculate_metrics,
+    model_options_from_args,
+    offline_enabled,
+    run_baseline_agent,
+    run_optimized_agent,
+    seed_tools,
+)
+from percentiles import percentile
+from results_store import ResultsStore, add_results_store_arguments, record_from_args
+
+RESULTS_BENCHMARK = "max_tool_calls_trials"
+CONFIGS = ("baseline", "optimized")
+# metric -> True if lower is better
+METRICS = {
+    'total_tokens': True,
+    'input_tokens': True,
+    'avg_context_per_query': True,
+    'latency_p50_s': True,
+    'latency_p95_s': True,
+    'elapsed_s': True,
+}
+SAVINGS = {
+    'token_savings_pct': False,
+    'cost_savings_pct': False,
+    'context_reduction_pct': False,
+}
+
+
+def bootstrap_ci(values, confidence=0.95, resamples=2000, seed=0):
+    """Mean of `values` and a percentile-bootstrap confidence interval for it"""
+    n = len(values)
+    if n == 0:
+        return {'mean': 0.0, 'ci_low': 0.0, 'ci_high': 0.0}
+    mean = sum(values) / n
+    if n == 1:
+        return {'mean': mean, 'ci_low': mean, 'ci_high': mean}
+    rng = random.Random(seed)
+    means = sorted(sum(rng.choices(values, k=n)) / n for _ in range(resamples))
+    tail = (1 - confidence) / 2 * 100
+    return {'mean': mean, 'ci_low': percentile(means, tail), 'ci_high': percentile(means, 100 - tail)}
+
+
+def trial_metrics(result):
+    return {
+        'total_tokens': result['metrics']['total_tokens'],
+        'input_tokens': result['metrics']['input_tokens'],
+        'avg_context_per_query': result['avg_context_per_query'],
+        'latency_p50_s': result['latency_s']['p50'],
+        'latency_p95_s': result['latency_s']['p95'],
+        'elapsed_s': result['elapsed_time'],
+    }
+
+
+def run_trial(trial, seed, queries, max_history_limit, model_options, db_dir, verify):
+    """Run the baseline and optimized agents once with `seed` and return their metrics"""
+    topics = build_topics(queries)
+    options = {**model_options, 'seed': seed}
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_tools(seed)
+        baseline = run_baseline_agent(
+            topics, model=build_model(MODEL_ID, **options), verify=verify,
+            db_file=os.path.join(db_dir, f"trial_{trial}_baseline.db"),
+        )
+        seed_tools(seed)
+        optimized = run_optimized_agent(
+            topics, max_history_limit=max_history_limit, model=build_model(MODEL_ID, **options), verify=verify,
+            db_file=os.path.join(db_dir, f"trial_{trial}_optimized.db"),
+        )
+    comparison = calculate_metrics(baseline, optimized)
+    return {
+        'trial': trial,
+        'seed': seed,
+        'baseline': trial_metrics(baseline),
+        'optimized': trial_metrics(optimized),
+        'savings': dict(comparison['savings']),
+    }
+
+
+def run_trials(trials, seed, queries, max_history_limit, model_options, workers=1, verify=False, db_dir=None):
+    """Run every trial, in order or across a process pool, and return their records"""
+    db_dir = db_dir or os.path.join("tmp", f"trials_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(db_dir, exist_ok=True)
+    args = [(i, seed + i, queries, max_history_limit, model_options, db_dir, verify) for i in range(trials)]
+    records = []
+    if workers == 1:
+        for cell in args:
+            records.append(run_trial(*cell))
+            print(f"  ✓ trial {len(records)}/{trials} (seed {cell[1]}): "
+                  f"savings {records[-1]['savings']['token_savings_pct']:.1f}%")
+        return records
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for record in pool.map(run_trial, *zip(*args)):
+            records.append(record)
+            print(f"  ✓ trial {len(records)}/{trials} (seed {record['seed']}): "
+                  f"savings {record['savings']['token_savings_pct']:.1f}%")
+    return records
+
+
+def summarize(records, confidence=0.95, resamples=2000, seed=0):
+    """Per-configuration bootstrap CIs plus the per-trial values as columns"""
+    summary = {}
+    for config in CONFIGS:
+        summary[config] = {
+            metric: bootstrap_ci([r[config][metric] for r in records], confidence, resamples, seed)
+            for metric in METRICS
+        }
+    summary['savings'] = {
+        metric: bootstrap_ci([r['savings'][metric] for r in records], confidence, resamples, seed)
+        for metric in SAVINGS
+    }
+    trials = {config: {metric: [r[config][metric] for r in records] for metric in METRICS} for config in CONFIGS}
+    trials['savings'] = {metric: [r['savings'][metric] for r in records] for metric in SAVINGS}
+    trials['seed'] = {'seed': [r['seed'] for r in records]}
+    return {'confidence': confidence, 'trials': len(records), 'summary': summary, 'per_trial': trials}
+
+
+def check_regressions(current, baseline, threshold_pct):
+    """
+    Metrics that got worse than the stored baseline by more than threshold_pct.
+
+    Lower-is-better metrics regress when the current CI lower bound exceeds the
+    baseline mean by more than the threshold; higher-is-better metrics when the
+    CI upper bound falls below it by more than the threshold.
+    """
+    regressions = []
+    for group, metrics in [(config, METRICS) for config in CONFIGS] + [('savings', SAVINGS)]:
+        for metric, lower_is_better in metrics.items():
+            now = current['summary'][group][metric]
+            before = baseline['summary'].get(group, {}).get(metric)
+            if before is None or not before['mean']:
+                continue
+            margin = abs(before['mean']) * threshold_pct / 100
+            if lower_is_better:
+                regressed = now['ci_low'] > before['mean'] + margin
+            else:
+                regressed = now['ci_high'] < before['mean'] - margin
+            if regressed:
+                regressions.append({
+                    'metric': f"{group}.{metric}",
+                    'baseline_mean': before['mean'],
+                    'mean': now['mean'],
+                    'ci_low': now['ci_low'],
+                    'ci_high': now['ci_high'],
+                    'change_pct': (now['mean'] - before['mean']) / abs(before['mean']) * 100,
+                })
+    return regressions
+
+
+def fmt(value):
+    return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:.4g}"
+
+
+def print_report(results):
+    level = f"{results['confidence'] * 100:.0f}%"
+    print("\n" + "=" * 90)
+    print(f"📊 TRIALS: mean [{level} bootstrap CI] over {results['trials']} seeded trials")
+    print("=" * 90)
+    for group in CONFIGS + ('savings',):
+        print(f"\n  {group.upper()}")
+        for metric, ci in results['summary'][group].items():
+            width = (ci['ci_high'] - ci['ci_low']) / 2
+            print(f"    {metric:<24} {fmt(ci['mean']):>12}   [{fmt(ci['ci_low'])} – {fmt(ci['ci_high'])}]"
+                  f"   ±{fmt(width)}")
+    print("=" * 90)
+
+
+def print_regressions(regressions, baseline_run, threshold_pct):
+    print(f"\n🚦 REGRESSION GATE vs {baseline_run} (threshold {threshold_pct:g}%)")
+    if not regressions:
+        print("   ✅ No regressions")
+        return
+    for r in regressions:
+        print(f"   ❌ {r['metric']:<34} {fmt(r['baseline_mean'])} → {fmt(r['mean'])} "
+              f"({r['change_pct']:+.1f}%, CI {fmt(r['ci_low'])} – {fmt(r['ci_high'])})")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=10, help="Repetitions per configuration (default: 10)")
+    parser.add_argument("--queries", type=int, default=50, help="Runs per session (default: 50)")
+    parser.add_argument("--max-history-limit", type=int, default=3, help="Optimized agent's limit (default: 3)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level (default: 0.95)")
+    parser.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples (default: 2000)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Trials run in parallel (default: 1; more workers make latency noisier)")
+    parser.add_argument("--verify", action="store_true", help="Cross-check each trial's ledger against its DB")
+    parser.add_argument("--gate", action="store_true",
+                        help="Exit non-zero if a metric regresses against the stored baseline")
+    parser.add_argument("--baseline-run", default=None,
+                        help="Run id to gate against (default: previous run with the same configuration)")
+    parser.add_argument("--threshold-pct", type=float, default=10.0,
+                        help="Allowed change before a metric counts as regressed (default: 10)")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="With --gate, fail when there is no stored baseline to compare against")
+    add_offline_arguments(parser)
+    add_results_store_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.seed is None:
+        args.seed = 42
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    config = {'queries': args.queries, 'trials': args.trials, 'max_history_limit': args.max_history_limit,
+              'confidence': args.confidence, **model_options}
+    model = f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}"
+
+    print("\n🎲 SEEDED TRIALS")
+    print("=" * 90)
+    print(f"Trials: {args.trials} | Queries: {args.queries} | Seeds: {args.seed}–{args.seed + args.trials - 1}")
+    print("=" * 90)
+
+    # Look the gate baseline up before this run is recorded
+    baseline = None
+    if args.gate:
+        with ResultsStore(args.results_db) as store:
+            baseline_run = args.baseline_run or store.latest(RESULTS_BENCHMARK, config=config)
+            if baseline_run:
+                baseline = store.load(baseline_run, series=False)['results']
+
+    start = time.time()
+    records = run_trials(args.trials, args.seed, args.queries, args.max_history_limit, model_options,
+                         workers=args.workers, verify=args.verify)
+    results = summarize(records, args.confidence, args.resamples, args.seed)
+    results['elapsed_time'] = time.time() - start
+    print_report(results)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"trials_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    run_id = record_from_args(args, RESULTS_BENCHMARK, results, config=config, model=model)
+
+    if args.gate:
+        if baseline is None:
+            stored = ("this run becomes it" if run_id else
+                      "this run was not stored as the baseline (--no-results-db)")
+            if args.require_baseline:
+                print(f"\n🚦 REGRESSION GATE: ❌ no stored baseline for this configuration (--require-baseline); "
+                      f"{stored}")
+                return 1
+            print(f"\n🚦 REGRESSION GATE: no stored baseline for this configuration yet; {stored}")
+            return 0
+        regressions = check_regressions(results, baseline, args.threshold_pct)
+        print_regressions(regressions, baseline_run, args.threshold_pct)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Synthetic query workloads for long sessions.
+
+BENCHMARK_QUERIES has 50 topics, so longer benchmarks repeat them in a fixed
+cycle. SyntheticWorkload draws topics from a larger vocabulary instead:
+
+- The vocabulary is built from BENCHMARK_QUERIES combined with regions and
+  aspects ("edge AI in Japan", "AI chips hiring"), shuffled by the seed, and
+  cut to `vocabulary` topics. Beyond the combinations, topics are numbered.
+- Topics repeat with a Zipf distribution: the topic of rank k is drawn with
+  weight 1 / k**zipf_s. zipf_s=0 is uniform, and around 1 a few topics
+  dominate, as they do in real traffic.
+- With probability `multi_tool_rate`, a query compares 2 to `max_fanout`
+  distinct topics ("Compare X, Y and Z"). The offline model answers those with
+  one tool call per topic.
+
+Queries are generated lazily, so 10k+ runs per session and 1k+ sessions cost no
+memory up front. Each session draws from its own RNG, derived from the seed and
+the session number, so a session's queries do not depend on how many other
+sessions there are or the order they run in.
+
+Usage:
+    workload = SyntheticWorkload(vocabulary=2000, zipf_s=1.1, multi_tool_rate=0.2, seed=42)
+    for topic in workload.topics(10000, session=3):
+        agent.run(build_prompt(topic))
+"""
+
+import itertools
+import random
+from bisect import bisect_right
+
+from benchmark import BENCHMARK_QUERIES
+
+REGIONS = ("", "in Europe", "in Japan", "in India", "in Brazil", "in Canada", "in Africa", "in the US")
+ASPECTS = ("", "startups", "regulation", "benchmarks", "hiring", "open source", "funding", "patents",
+           "adoption", "research papers")
+
+
+def build_vocabulary(size, seed=42):
+    """`size` distinct topic strings, starting from BENCHMARK_QUERIES (no commas or "and")"""
+    combos = [" ".join(part for part in (base, aspect, region) if part)
+              for base, aspect, region in itertools.product(BENCHMARK_QUERIES, ASPECTS, REGIONS)]
+    # Keep the plain topics first so small vocabularies look like BENCHMARK_QUERIES
+    plain = list(BENCHMARK_QUERIES)
+    qualified = [topic for topic in combos if topic not in plain]
+    random.Random(seed).shuffle(qualified)
+    vocabulary = (plain + qualified)[:size]
+    for i in itertools.count(2):
+        if len(vocabulary) >= size:
+            break
+        vocabulary.extend(f"{topic} #{i}" for topic in plain + qualified)
+    return vocabulary[:size]
+
+
+class SyntheticWorkload:
+    """Zipf-distributed topics over a configurable vocabulary, with multi-tool comparisons"""
+
+    def __init__(self, vocabulary=1000, zipf_s=1.1, multi_tool_rate=0.2, max_fanout=3, seed=42):
+        if vocabulary < 1:
+            raise ValueError("vocabulary must be at least 1")
+        if not 0.0 <= multi_tool_rate <= 1.0:
+            raise ValueError("multi_tool_rate must be between 0 and 1")
+        self.vocabulary = build_vocabulary(vocabulary, seed)
+        self.zipf_s = zipf_s
+        self.multi_tool_rate = multi_tool_rate
+        self.max_fanout = max(1, min(max_fanout, len(self.vocabulary)))
+        self.seed = seed
+        # Popularity ranks are a seeded permutation, so the most popular topic is not always "AI developments"
+        ranked = list(self.vocabulary)
+        random.Random(f"{seed}:ranks").shuffle(ranked)
+        self._ranked = ranked
+        self._cum_weights = list(itertools.accumulate(1.0 / rank ** zipf_s for rank in range(1, len(ranked) + 1)))
+
+    def __repr__(self):
+        return (f"SyntheticWorkload(vocabulary={len(self.vocabulary)}, zipf_s={self.zipf_s}, "
+                f"multi_tool_rate={self.multi_tool_rate}, max_fanout={self.max_fanout}, seed={self.seed})")
+
+    def _draw(self, rng):
+        return self._ranked[bisect_right(self._cum_weights, rng.random() * self._cum_weights[-1])]
+
+    def topic(self, rng):
+        """One query topic: a single topic, or an "X, Y and Z" group for a multi-tool comparison"""
+        if self.max_fanout < 2 or rng.random() >= self.multi_tool_rate:
+            return self._draw(rng)
+        group = []
+        target = rng.randint(2, self.max_fanout)
+        while len(group) < target:
+            topic = self._draw(rng)
+            if topic not in group:
+                group.append(topic)
+        return ", ".join(group[:-1]) + " and " + group[-1]
+
+    def topics(self, count, session=0):
+        """Lazily yield `count` topics for one session (build_prompt turns them into queries)"""
+        rng = random.Random(f"{self.seed}:session:{session}")
+        for _ in range(count):
+            yield self.topic(rng)
+
+    def expected_tool_calls(self):
+        """Mean tool calls per query (one per topic)"""
+        if self.max_fanout < 2:
+            return 1.0
+        return 1.0 + self.multi_tool_rate * ((2 + self.max_fanout) / 2 - 1)
+
+
+def add_workload_arguments(parser):
+    group = parser.add_argument_group("synthetic workload")
+    group.add_argument("--vocabulary", type=int, default=1000, help="Distinct topics (default: 1000)")
+    group.add_argument("--zipf-s", type=float, default=1.1,
+                       help="Zipf exponent of topic repetition; 0 is uniform (default: 1.1)")
+    group.add_argument("--multi-tool-rate", type=float, default=0.2,
+                       help="Share of queries comparing several topics (default: 0.2)")
+    group.add_argument("--max-fanout", type=int, default=3, help="Most topics in one comparison (default: 3)")
+    group.add_argument("--workload-seed", type=int, default=42, help="Seed of the query generator (default: 42)")
+    return parser
+
+
+def workload_from_args(args):
+    return SyntheticWorkload(vocabulary=args.vocabulary, zipf_s=args.zipf_s, multi_tool_rate=args.multi_tool_rate,
+                             max_fanout=args.max_fanout, seed=args.workload_seed)
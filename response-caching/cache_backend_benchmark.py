@@ -0,0 +1,236 @@
+"""
+Response Cache Backend Benchmark
+
+Compares agno's built-in directory cache (one JSON file per entry) with the
+single-file SqliteResponseCache at growing entry counts:
+
+- insert throughput (entries/s), one save call per entry as agno makes them
+- lookup latency p50/p95/p99 for hits and for misses
+- time to enumerate every entry (a directory scan vs. one COUNT query)
+- disk footprint: bytes allocated on disk, not just the sum of file sizes
+
+Both backends are driven through the same model methods agno calls
+(_save_model_response_to_cache / _get_cached_model_response), so the numbers
+include agno's own overhead for the directory backend.
+
+Usage:
+    python cache_backend_benchmark.py                       # 10k, 100k, 1M entries
+    python cache_backend_benchmark.py --sizes 10000 --max-mb 2
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from datetime import datetime
+from hashlib import md5
+
+from agno.models.response import ModelResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from offline_model import OfflineChat  # noqa: E402
+from percentiles import percentiles_ms  # noqa: E402
+from results_store import add_results_store_arguments, record_from_args  # noqa: E402
+from sqlite_cache import POLICIES, SqliteResponseCache  # noqa: E402
+
+# Words used to build answers of realistic length and (limited) compressibility
+WORDS = (
+    "password reset link email account order shipping refund policy days support team "
+    "please click settings security verify address tracking number delivery business "
+    "within receipt original payment method contact help center thank you for reaching out"
+).split()
+
+
+def make_response(rng):
+    """A ModelResponse shaped like a short support answer (roughly 0.5-2 KB of JSON)"""
+    content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 250)))
+    return ModelResponse(role="assistant", content=content.capitalize() + ".")
+
+
+def cache_key(i):
+    return md5(f"entry-{i}".encode()).hexdigest()
+
+
+def allocated_bytes(path):
+    """Bytes allocated on disk for a file or a directory tree"""
+    if os.path.isfile(path):
+        return os.stat(path).st_blocks * 512
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            total += entry.stat(follow_symlinks=False).st_blocks * 512
+    return total
+
+
+def time_lookups(read, keys, expect_hit):
+    """Lookup latency percentiles, counting only lookups whose outcome matched expect_hit"""
+    samples = []
+    unexpected = 0
+    for key in keys:
+        start = time.perf_counter()
+        found = read(key)
+        elapsed = time.perf_counter() - start
+        if bool(found) != expect_hit:
+            unexpected += 1
+            continue
+        samples.append(elapsed)
+    return {**percentiles_ms(samples), 'timed': len(samples), 'excluded': unexpected}
+
+
+def resident_keys(size, lookups, rng, resident):
+    """`lookups` random keys that are still in the cache (a size cap may have evicted most)"""
+    keys = []
+    for _ in range(lookups * 20):
+        key = cache_key(rng.randrange(size))
+        if resident is None or resident(key):
+            keys.append(key)
+            if len(keys) == lookups:
+                break
+    return keys
+
+
+def bench_backend(name, model, size, lookups, rng, scan, footprint, resident=None):
+    """
+    Insert `size` entries through `model`'s cache methods, then time lookups.
+    Hit lookups use keys `resident` confirms are still stored; any lookup that
+    misses anyway is excluded from the hit percentiles and counted
+    """
+    start = time.perf_counter()
+    for i in range(size):
+        model._save_model_response_to_cache(cache_key(i), make_response(rng))
+    insert_s = time.perf_counter() - start
+
+    hit_keys = resident_keys(size, lookups, rng, resident)
+    miss_keys = [cache_key(size + i) for i in range(lookups)]
+    hit = time_lookups(model._get_cached_model_response, hit_keys, expect_hit=True)
+    miss = time_lookups(model._get_cached_model_response, miss_keys, expect_hit=False)
+
+    start = time.perf_counter()
+    entries = scan()
+    scan_s = time.perf_counter() - start
+
+    return {
+        'backend': name,
+        'entries': entries,
+        'insert_s': insert_s,
+        'inserts_per_s': size / insert_s if insert_s > 0 else 0.0,
+        'hit_lookup_ms': hit,
+        'miss_lookup_ms': miss,
+        'scan_s': scan_s,
+        **footprint(),
+    }
+
+
+def run_size(size, work_dir, lookups, seed, max_bytes, policy):
+    """Benchmark both backends at one entry count"""
+    results = []
+
+    cache_dir = os.path.join(work_dir, f"files_{size}")
+    files_model = OfflineChat(cache_response=True, cache_dir=cache_dir)
+    print(f"   📁 directory backend: inserting {size:,} entries...")
+    results.append(bench_backend(
+        "files", files_model, size, lookups, random.Random(seed),
+        scan=lambda: sum(1 for _ in os.scandir(cache_dir)),
+        footprint=lambda: {
+            'disk_bytes': allocated_bytes(cache_dir),
+            'payload_bytes': sum(e.stat().st_size for e in os.scandir(cache_dir)),
+        },
+    ))
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    db_path = os.path.join(work_dir, f"sqlite_{size}.db")
+    backend = SqliteResponseCache(db_path, max_bytes=max_bytes, policy=policy)
+    sqlite_model = OfflineChat(cache_response=True)
+    backend.install(sqlite_model)
+    print(f"   🗄️  sqlite backend: inserting {size:,} entries...")
+
+    def sqlite_footprint():
+        backend.compact()
+        return {
+            'disk_bytes': allocated_bytes(db_path),
+            'payload_bytes': backend.total_bytes,
+            'evictions': backend.evictions,
+        }
+
+    results.append(bench_backend(
+        "sqlite", sqlite_model, size, lookups, random.Random(seed),
+        scan=lambda: len(backend),
+        footprint=sqlite_footprint,
+        resident=lambda key: backend.entry_size(key) > 0,
+    ))
+    backend.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    for r in results:
+        r['size'] = size
+    return results
+
+
+def print_report(results):
+    print("\n" + "=" * 100)
+    print("📊 CACHE BACKEND COMPARISON")
+    print("=" * 100)
+    print(f"{'Entries':>9} | {'Backend':<7} | {'Inserts/s':>10} | {'Hit p50':>8} | {'Hit p99':>8} | "
+          f"{'Miss p50':>8} | {'Scan':>8} | {'Disk':>10} | {'Stored':>7}")
+    print("-" * 100)
+    for r in results:
+        print(f"{r['size']:>9,} | {r['backend']:<7} | {r['inserts_per_s']:>10,.0f} | "
+              f"{r['hit_lookup_ms']['p50']:>6.3f}ms | {r['hit_lookup_ms']['p99']:>6.3f}ms | "
+              f"{r['miss_lookup_ms']['p50']:>6.3f}ms | {r['scan_s']:>7.3f}s | "
+              f"{r['disk_bytes'] / 1024**2:>8.1f}MB | {r['entries']:>7,}")
+    print("=" * 100)
+    for r in results:
+        hit = r['hit_lookup_ms']
+        if hit['excluded']:
+            print(f"  ⚠️  {r['size']:,} {r['backend']}: {hit['excluded']} hit lookups missed and were excluded")
+    print("  Hit latency is timed on keys confirmed resident; p50/p95/p99 use linear interpolation.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="Comma-separated entry counts (default: 10000,100000,1000000)")
+    parser.add_argument("--lookups", type=int, default=2000, help="Timed lookups per backend and size")
+    parser.add_argument("--max-mb", type=float, default=None,
+                        help="Size cap for the sqlite backend (default: unbounded)")
+    parser.add_argument("--policy", choices=POLICIES, default="lru", help="sqlite eviction policy")
+    parser.add_argument("--work-dir", default="tmp/cache_backend_bench", help="Scratch directory")
+    parser.add_argument("--seed", type=int, default=42)
+    add_results_store_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb else None
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    print("=" * 100)
+    print("🗄️  RESPONSE CACHE BACKEND BENCHMARK")
+    print(f"Sizes: {', '.join(f'{s:,}' for s in sizes)} | Lookups: {args.lookups} | "
+          f"SQLite cap: {f'{args.max_mb} MB ({args.policy})' if max_bytes else 'none'}")
+    print("=" * 100)
+
+    results = []
+    for size in sizes:
+        print(f"\n▶ {size:,} entries")
+        results.extend(run_size(size, args.work_dir, args.lookups, args.seed, max_bytes, args.policy))
+    print_report(results)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"cache_backend_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump({'max_bytes': max_bytes, 'policy': args.policy, 'results': results}, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, "cache_backend", {'max_bytes': max_bytes, 'policy': args.policy, 'results': results},
+        config={'sizes': sizes, 'lookups': args.lookups, 'max_bytes': max_bytes, 'policy': args.policy,
+                'seed': args.seed},
+    )
+
+
+if __name__ == "__main__":
+    main()
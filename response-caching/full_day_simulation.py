@@ -9,85 +9,187 @@ Key Metrics Shown:
 - API calls avoided
 - Cache hit rate
 - Time saved
+
+Hit/miss counts, lookup latency and bytes read come from the model's response
+cache itself. The "without caching" numbers come from actually running the same
+day again with caching disabled.
+
+Run with --offline to use the in-process OfflineChat model (no API key needed).
 """
 
+import argparse
+import os
+import sys
 import time
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-
-print("=" * 80)
-print("📅 SIMULATION: Full Development Day (8 hours)")
-print("Scenario: Building a customer support agent")
-print("=" * 80)
-
-# Realistic development scenarios throughout the day
-scenarios = {
-    "Morning (Testing password reset flow)": ("How do I reset my password?", 15),
-    "Mid-morning (Testing order status)": ("Where is my order?", 12),
-    "Lunch (Testing refund policy)": ("What's your refund policy?", 8),
-    "Afternoon (Back to password reset)": ("How do I reset my password?", 10),
-    "Late afternoon (Testing all queries)": ("How do I reset my password?", 5),
-}
-
-total_iterations = sum(count for _, count in scenarios.values())
-
-print(f"\nTotal test iterations planned: {total_iterations}")
-print("Testing with gpt-4o ($0.005 per 1k tokens)\n")
-
-# WITH CACHING (Smart Development)
-print("🟢 WITH CACHING (Smart Development):")
-print("-" * 80)
-
-agent = Agent(model=OpenAIChat(id="gpt-4o", cache_response=True))
-
-start_day = time.time()
-total_cost = 0
-api_calls = 0
-cache_hits = 0
-query_cache = {}
-
-for scenario, (query, count) in scenarios.items():
-    print(f"\n{scenario}")
-    for i in range(count):
-        response = agent.run(query)
-        
-        if query not in query_cache:
-            query_cache[query] = True
-            api_calls += 1
-            cost = response.metrics.total_tokens * 0.000005
-            total_cost += cost
-            print(f"  Iteration {i+1}: ${cost:.4f} (API)")
-        else:
-            cache_hits += 1
-            if i == 0:
-                print(f"  Iteration {i+1}: $0.0000 (CACHE ✨) - continuing cached...")
-
-total_time = time.time() - start_day
-
-print("\n" + "=" * 80)
-print("📊 END OF DAY SUMMARY:")
-print("=" * 80)
-print(f"⏱️  Total development time: {total_time:.1f}s")
-print(f"💰 Total cost: ${total_cost:.4f}")
-print(f"📞 API calls: {api_calls}")
-print(f"✨ Cache hits: {cache_hits}")
-print(f"📈 Cache hit rate: {(cache_hits/total_iterations*100):.0f}%")
-
-# WITHOUT CACHING comparison
-cost_no_cache = total_iterations * 0.002  # Estimated cost per call
-time_no_cache = total_iterations * 2  # Estimated 2s per call
-
-print("\n" + "-" * 80)
-print("🔴 IF YOU DIDN'T USE CACHING:")
-print("-" * 80)
-print(f"⏱️  Would have taken: ~{time_no_cache:.0f}s ({time_no_cache/60:.1f} minutes)")
-print(f"💰 Would have cost: ~${cost_no_cache:.4f}")
-print(f"📞 Would have made: {total_iterations} API calls")
-
-print("\n" + "=" * 80)
-print("💡 SAVINGS:")
-print("=" * 80)
-print(f"⚡ Time saved: {time_no_cache - total_time:.1f}s")
-print(f"💵 Money saved: ${cost_no_cache - total_cost:.4f}")
-print(f"📞 API calls avoided: {total_iterations - api_calls}")
-print(f"\n🎯 You saved {((cost_no_cache - total_cost)/cost_no_cache*100):.0f}% of your API costs today!")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from offline_model import add_offline_arguments, model_options_from_args  # noqa: E402
+from cache_stats import CacheStats  # noqa: E402
+from semantic_cache import SemanticCache  # noqa: E402
+from sqlite_cache import add_cache_backend_arguments, cache_backend_from_args  # noqa: E402
+from scenarios import SCENARIOS, build_support_agent, rephrase, scenario_queries  # noqa: E402
+from warm_cache import print_warm_up_report, warm_cache  # noqa: E402
+
+COST_PER_TOKEN = 0.000005  # gpt-4o, $0.005 per 1k tokens
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=None,
+                        help="Response cache directory (default: ~/.agno/cache/model_responses)")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Put a semantic (near-duplicate) cache tier in front of the response cache")
+    parser.add_argument("--semantic-threshold", type=float, default=0.75,
+                        help="Cosine similarity needed for a semantic hit (default: 0.75)")
+    parser.add_argument("--audit-rate", type=float, default=0.0,
+                        help="Fraction of semantic hits re-checked against the model to detect false hits")
+    parser.add_argument("--vary-phrasing", action="store_true",
+                        help="Rephrase queries between iterations, like real testers do")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="Prefetch every scenario query into the cache before the day starts")
+    parser.add_argument("--warm-up-workers", type=int, default=8, help="Concurrent warm-up fetches")
+    add_cache_backend_arguments(parser)
+    return add_offline_arguments(parser).parse_args(argv)
+
+
+def phrasing(query, iteration, vary_phrasing=False):
+    """Return the query as typed on this iteration (only varies with --vary-phrasing)"""
+    return rephrase(query, iteration) if vary_phrasing else query
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_options = model_options_from_args(args)
+    cache_backend = cache_backend_from_args(args)
+
+    print("=" * 80)
+    print("📅 SIMULATION: Full Development Day (8 hours)")
+    print("Scenario: Building a customer support agent")
+    print("=" * 80)
+
+    scenarios = SCENARIOS
+
+    total_iterations = sum(count for _, count in scenarios.values())
+
+    print(f"\nTotal test iterations planned: {total_iterations}")
+    print("Testing with gpt-4o ($0.005 per 1k tokens)\n")
+
+    if args.warm_up:
+        warm_up = warm_cache(
+            scenario_queries(scenarios, vary_phrasing=args.vary_phrasing),
+            workers=args.warm_up_workers, cache_dir=args.cache_dir, model_options=model_options,
+            cache_backend=cache_backend,
+        )
+        print_warm_up_report(warm_up)
+        print()
+
+    # WITH CACHING (Smart Development)
+    print("🟢 WITH CACHING (Smart Development):")
+    print("-" * 80)
+
+    agent = build_support_agent(cache_response=True, cache_dir=args.cache_dir, model_options=model_options,
+                                cache_backend=cache_backend)
+    cache_stats = CacheStats().instrument(agent.model)
+    semantic = SemanticCache(threshold=args.semantic_threshold, audit_rate=args.audit_rate)
+    if args.semantic_cache:
+        semantic.instrument(agent.model)
+
+    start_day = time.time()
+    total_cost = 0
+    api_calls = 0
+    cache_hits = 0
+
+    if args.warm_up:
+        # Warm-up calls are real API calls; count them so the savings stay honest
+        total_cost += warm_up['total_tokens'] * COST_PER_TOKEN
+        api_calls += warm_up['fetched']
+
+    for scenario, (query, count) in scenarios.items():
+        print(f"\n{scenario}")
+        for i in range(count):
+            cache_stats.last_hit = semantic.last_hit = None
+            response = agent.run(phrasing(query, i, args.vary_phrasing))
+
+            if not (cache_stats.last_hit or semantic.last_hit):
+                api_calls += 1
+                cost = response.metrics.total_tokens * COST_PER_TOKEN
+                total_cost += cost
+                print(f"  Iteration {i+1}: ${cost:.4f} (API)")
+            else:
+                cache_hits += 1
+                if i == 0:
+                    print(f"  Iteration {i+1}: $0.0000 (CACHE ✨) - continuing cached...")
+
+    total_time = time.time() - start_day
+    cache_summary = cache_stats.summary()
+    semantic_summary = semantic.summary()
+    # Audits re-ask the model on semantic hits: billed calls the simple hit count hides
+    api_calls += semantic_summary['audit_api_calls']
+    total_cost += semantic_summary['audit_tokens'] * COST_PER_TOKEN
+
+    print("\n" + "=" * 80)
+    print("📊 END OF DAY SUMMARY:")
+    print("=" * 80)
+    print(f"⏱️  Total development time: {total_time:.1f}s")
+    print(f"💰 Total cost: ${total_cost:.4f}")
+    included = []
+    if args.warm_up:
+        included.append("warm-up")
+    if semantic_summary['audit_api_calls']:
+        included.append(f"{semantic_summary['audit_api_calls']} audits")
+    print(f"📞 API calls: {api_calls}" + (f" (incl. {', '.join(included)})" if included else ""))
+    print(f"✨ Cache hits: {cache_hits}")
+    print(f"📈 Cache hit rate: {(cache_hits/total_iterations*100):.0f}%")
+    print(f"🔎 Avg cache lookup: {cache_summary['avg_lookup_ms']:.2f}ms "
+          f"(hits: {cache_summary['avg_hit_lookup_ms']:.2f}ms)")
+    print(f"📦 Cache bytes read: {cache_summary['bytes_read']:,} | written: {cache_summary['bytes_written']:,}")
+    if cache_backend is not None:
+        backend_summary = cache_backend.summary()
+        print(f"🗄️  SQLite cache: {backend_summary['entries']} entries, "
+              f"{backend_summary['disk_bytes']:,} bytes on disk, {backend_summary['evictions']} evictions")
+    if args.semantic_cache:
+        print(f"🧠 Semantic tier (threshold {semantic_summary['threshold']}): "
+              f"{semantic_summary['semantic_hits']} near-duplicate hits, "
+              f"{semantic_summary['normalized_exact_hits']} normalized-exact hits, "
+              f"avg lookup {semantic_summary['avg_lookup_ms']:.2f}ms")
+        if semantic_summary['audited']:
+            print(f"🔍 Audited {semantic_summary['audited']} semantic hits: "
+                  f"{semantic_summary['false_hits']} false hits ({semantic_summary['false_hit_rate']*100:.0f}%), "
+                  f"{semantic_summary['audit_api_calls']} API calls costing "
+                  f"${semantic_summary['audit_tokens'] * COST_PER_TOKEN:.4f} (included in the totals)")
+
+    # WITHOUT CACHING: run the same day for real with caching disabled
+    print("\n" + "-" * 80)
+    print("🔴 WITHOUT CACHING (measured):")
+    print("-" * 80)
+
+    agent_no_cache = build_support_agent(cache_response=False, model_options=model_options)
+
+    start_no_cache = time.time()
+    cost_no_cache = 0
+    for scenario, (query, count) in scenarios.items():
+        for i in range(count):
+            response = agent_no_cache.run(phrasing(query, i, args.vary_phrasing))
+            cost_no_cache += response.metrics.total_tokens * COST_PER_TOKEN
+    time_no_cache = time.time() - start_no_cache
+
+    print(f"⏱️  Took: {time_no_cache:.1f}s ({time_no_cache/60:.1f} minutes)")
+    print(f"💰 Cost: ${cost_no_cache:.4f}")
+    print(f"📞 API calls: {total_iterations}")
+
+    print("\n" + "=" * 80)
+    print("💡 SAVINGS:")
+    print("=" * 80)
+    print(f"⚡ Time saved: {time_no_cache - total_time:.1f}s")
+    print(f"💵 Money saved: ${cost_no_cache - total_cost:.4f}")
+    print(f"📞 API calls avoided: {total_iterations - api_calls}")
+    if cost_no_cache > 0:
+        print(f"\n🎯 You saved {((cost_no_cache - total_cost)/cost_no_cache*100):.0f}% of your API costs today!")
+
+    if cache_backend is not None:
+        cache_backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Shared setup for the response caching demos.
+
+The development-day scenarios and agent construction live here so that the
+simulation and the cache warm-up build byte-identical requests, and therefore
+hit the same cache entries.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from offline_model import build_model  # noqa: E402
+
+MODEL_ID = "gpt-4o"
+
+# Realistic development scenarios throughout the day: (query, iterations)
+SCENARIOS = {
+    "Morning (Testing password reset flow)": ("How do I reset my password?", 15),
+    "Mid-morning (Testing order status)": ("Where is my order?", 12),
+    "Lunch (Testing refund policy)": ("What's your refund policy?", 8),
+    "Afternoon (Back to password reset)": ("How do I reset my password?", 10),
+    "Late afternoon (Testing all queries)": ("How do I reset my password?", 5),
+}
+
+
+def rephrase(query, iteration):
+    """How a tester might retype `query` on a given iteration"""
+    variants = [
+        query,
+        query.lower().rstrip("?"),
+        query.replace("How do I", "How can I"),
+        f"Quick question: {query[0].lower()}{query[1:]}",
+    ]
+    return variants[iteration % len(variants)]
+
+
+def scenario_queries(scenarios=None, vary_phrasing=False):
+    """Unique queries in the order they are first sent during the day"""
+    queries = []
+    for query, count in (scenarios or SCENARIOS).values():
+        for i in range(count):
+            queries.append(rephrase(query, i) if vary_phrasing else query)
+    return list(dict.fromkeys(queries))
+
+
+def build_support_agent(cache_response=True, cache_dir=None, model_options=None, cache_backend=None):
+    """Create the customer support agent used by the caching demos
+
+    cache_backend: optional SqliteResponseCache replacing agno's file-per-entry cache
+    """
+    from agno.agent import Agent
+
+    model = build_model(MODEL_ID, cache_response=cache_response, cache_dir=cache_dir, **(model_options or {}))
+    if cache_response and cache_backend is not None:
+        cache_backend.install(model)
+    return Agent(model=model)
@@ -0,0 +1,163 @@
+"""
+Streaming Benchmark: Time to First Token, Cached vs Uncached
+
+simple_comparison.py measures total run time with stream=False. Interactive
+users feel the time to the first token instead. This benchmark streams the same
+query many times and records, per repetition:
+
+- time to first content chunk (TTFT)
+- gaps between consecutive content chunks
+- total time until the run completes
+
+for three configurations:
+
+- uncached:         every repetition goes to the model
+- cached (instant): cache hits replay all chunks immediately (agno's default)
+- cached (recorded): cache hits replay chunks at the cadence recorded on the miss
+
+Results are reported as p50/p95/p99 across repetitions.
+
+Usage:
+    python streaming_benchmark.py --offline --latency-ms 600 --chunk-interval-ms 25
+    python streaming_benchmark.py --repetitions 50 --replay recorded
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from agno.run.agent import RunEvent
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from offline_model import add_offline_arguments, model_options_from_args, offline_enabled  # noqa: E402
+from percentiles import percentiles_ms  # noqa: E402
+from cache_stats import CacheStats  # noqa: E402
+from results_store import add_results_store_arguments, record_from_args  # noqa: E402
+from stream_cadence import REPLAY_MODES, StreamCadence  # noqa: E402
+from scenarios import MODEL_ID, build_support_agent  # noqa: E402
+
+
+def stream_once(agent, query):
+    """Stream one run and return (ttft_s, [gap_s, ...], total_s, content_chunks)"""
+    start = time.perf_counter()
+    chunk_times = []
+    for event in agent.run(query, stream=True):
+        if getattr(event, "event", None) == RunEvent.run_content.value and getattr(event, "content", None):
+            chunk_times.append(time.perf_counter())
+    total = time.perf_counter() - start
+    ttft = chunk_times[0] - start if chunk_times else total
+    gaps = [b - a for a, b in zip(chunk_times, chunk_times[1:])]
+    return ttft, gaps, total, len(chunk_times)
+
+
+def measure(label, agent, query, repetitions, stats=None):
+    """Stream `query` `repetitions` times and summarise TTFT, gaps and total time"""
+    ttfts, gaps, totals, chunks = [], [], [], []
+    hits = 0
+    for _ in range(repetitions):
+        ttft, run_gaps, total, count = stream_once(agent, query)
+        ttfts.append(ttft)
+        gaps.extend(run_gaps)
+        totals.append(total)
+        chunks.append(count)
+        if stats is not None and stats.last_hit:
+            hits += 1
+    return {
+        'config': label,
+        'repetitions': repetitions,
+        'cache_hits': hits,
+        'chunks_per_run': sum(chunks) / len(chunks) if chunks else 0,
+        'ttft_ms': percentiles_ms(ttfts),
+        'inter_chunk_ms': percentiles_ms(gaps),
+        'total_ms': percentiles_ms(totals),
+    }
+
+
+def print_report(results):
+    print("\n" + "=" * 90)
+    print("📊 STREAMING LATENCY (p50 / p95 / p99, ms)")
+    print("=" * 90)
+    print(f"{'Config':<20} | {'Hits':>5} | {'TTFT':>24} | {'Inter-chunk':>20} | {'Total':>24}")
+    print("-" * 90)
+    for r in results:
+        def fmt(p):
+            return f"{p['p50']:.1f}/{p['p95']:.1f}/{p['p99']:.1f}"
+        print(f"{r['config']:<20} | {r['cache_hits']:>5} | {fmt(r['ttft_ms']):>24} | "
+              f"{fmt(r['inter_chunk_ms']):>20} | {fmt(r['total_ms']):>24}")
+    print("=" * 90)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="How do I reset my password?", help="Query to stream")
+    parser.add_argument("--repetitions", type=int, default=20, help="Streamed runs per configuration")
+    parser.add_argument("--replay", choices=REPLAY_MODES + ("both",), default="both",
+                        help="How cache hits replay chunks (default: both)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Response cache directory (default: a fresh temporary directory)")
+    add_results_store_arguments(parser)
+    args = add_offline_arguments(parser).parse_args()
+    model_options = model_options_from_args(args)
+
+    # A fresh cache directory guarantees the priming call is a real miss
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="stream_cache_")
+
+    print("=" * 90)
+    print("⏱️  STREAMING BENCHMARK: time to first token, cached vs uncached")
+    print(f"Query: {args.query!r} | Repetitions: {args.repetitions}")
+    print("=" * 90)
+
+    results = []
+    print("\n🔴 Uncached...")
+    agent = build_support_agent(cache_response=False, model_options=model_options)
+    results.append(measure("uncached", agent, args.query, args.repetitions))
+
+    agent = build_support_agent(cache_response=True, cache_dir=cache_dir, model_options=model_options)
+    cadence = StreamCadence().instrument(agent.model)
+    stats = CacheStats().instrument(agent.model)
+    print("🟡 Priming the cache (recording chunk cadence)...")
+    prime = measure("cache miss (prime)", agent, args.query, 1, stats)
+    results.append(prime)
+
+    modes = REPLAY_MODES if args.replay == "both" else (args.replay,)
+    for mode in modes:
+        print(f"🟢 Cached, {mode} replay...")
+        cadence.replay = mode
+        results.append(measure(f"cached ({mode})", agent, args.query, args.repetitions, stats))
+
+    print_report(results)
+
+    by_config = {r['config']: r for r in results}
+    uncached, instant = by_config["uncached"], by_config.get("cached (instant)")
+    if instant is not None:
+        speedup = (f"{uncached['ttft_ms']['p50'] / instant['ttft_ms']['p50']:.0f}x faster"
+                   if instant['ttft_ms']['p50'] > 0 else "no measurable delay")
+        print(f"\n⚡ p50 time to first token: {uncached['ttft_ms']['p50']:.1f}ms uncached → "
+              f"{instant['ttft_ms']['p50']:.1f}ms cached, instant replay ({speedup})")
+    recorded = by_config.get("cached (recorded)")
+    if recorded is not None:
+        print(f"🎞️  Recorded replay keeps the original cadence: p50 time to first token "
+              f"{recorded['ttft_ms']['p50']:.1f}ms")
+
+    if not args.cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"streaming_results_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump({'query': args.query, 'results': results}, f, indent=2)
+    print(f"\n✅ Results saved to {filename}")
+    record_from_args(
+        args, "streaming", {'query': args.query, 'results': results},
+        config={'query': args.query, 'repetitions': args.repetitions, 'replay': args.replay, **model_options},
+        model=f"{'offline' if offline_enabled(model_options['offline']) else 'openai'}:{MODEL_ID}",
+    )
+
+
+if __name__ == "__main__":
+    main()
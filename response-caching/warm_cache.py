@@ -0,0 +1,118 @@
+"""
+Response Cache Warm-up
+
+Fills the response cache before a simulated day (or a deployment) so that the
+first request for each known query doesn't pay full model latency on the
+critical path.
+
+- Queries come from the full-day scenarios, a file (one per line) or --query.
+- A bounded thread pool fetches them concurrently.
+- Entries that are already cached and not expired are detected by the cache
+  lookup itself and are not fetched again.
+- The report shows warm-up wall time and the cold-start latency removed from
+  the day (the sum of the fetch latencies that would otherwise hit users).
+
+Usage:
+    python warm_cache.py --offline --latency-ms 800 --workers 8
+    python warm_cache.py --queries-file queries.txt --workers 16
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from offline_model import add_offline_arguments, model_options_from_args  # noqa: E402
+from cache_stats import CacheStats  # noqa: E402
+from sqlite_cache import add_cache_backend_arguments, cache_backend_from_args  # noqa: E402
+from scenarios import build_support_agent, scenario_queries  # noqa: E402
+
+
+def warm_cache(queries, workers=8, cache_dir=None, model_options=None, cache_backend=None):
+    """Fill the response cache for `queries` concurrently and return a summary"""
+    queries = list(dict.fromkeys(queries))
+    local = threading.local()
+
+    def fetch(query):
+        # One agent per worker thread: agents and CacheStats.last_hit are not shared across threads
+        if not hasattr(local, "agent"):
+            local.agent = build_support_agent(cache_response=True, cache_dir=cache_dir, model_options=model_options,
+                                              cache_backend=cache_backend)
+            local.stats = CacheStats().instrument(local.agent.model)
+        start = time.perf_counter()
+        try:
+            response = local.agent.run(query)
+        except Exception as e:
+            return {'query': query, 'status': 'failed', 'error': str(e), 'latency_s': time.perf_counter() - start}
+        latency = time.perf_counter() - start
+        if local.stats.last_hit:
+            return {'query': query, 'status': 'skipped', 'latency_s': latency, 'total_tokens': 0}
+        return {'query': query, 'status': 'fetched', 'latency_s': latency,
+                'total_tokens': response.metrics.total_tokens if response.metrics else 0}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(fetch, queries))
+    wall_time = time.perf_counter() - start
+
+    fetched = [r for r in results if r['status'] == 'fetched']
+    return {
+        'queries': len(queries),
+        'fetched': len(fetched),
+        'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+        'failed': sum(1 for r in results if r['status'] == 'failed'),
+        'workers': workers,
+        'total_tokens': sum(r['total_tokens'] for r in fetched),
+        'wall_time_s': wall_time,
+        # Each fetched entry would otherwise have cost this much on its first use during the day
+        'cold_start_removed_s': sum(r['latency_s'] for r in fetched),
+        'results': results,
+    }
+
+
+def print_warm_up_report(summary):
+    """Print the warm-up summary"""
+    print(f"🔥 Warm-up: {summary['queries']} queries with {summary['workers']} workers "
+          f"in {summary['wall_time_s']:.2f}s")
+    print(f"   Fetched: {summary['fetched']} | Already cached: {summary['skipped']} | "
+          f"Failed: {summary['failed']}")
+    print(f"   ⚡ Cold-start latency removed from the day: {summary['cold_start_removed_s']:.2f}s")
+    for r in summary['results']:
+        if r['status'] == 'failed':
+            print(f"   ❌ {r['query']}: {r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", action="append", default=[], help="Query to warm (repeatable)")
+    parser.add_argument("--queries-file", help="File with one query per line")
+    parser.add_argument("--vary-phrasing", action="store_true",
+                        help="Also warm the rephrased scenario queries used by full_day_simulation.py")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent fetches (default: 8)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Response cache directory (default: ~/.agno/cache/model_responses)")
+    add_cache_backend_arguments(parser)
+    args = add_offline_arguments(parser).parse_args()
+
+    queries = list(args.query)
+    if args.queries_file:
+        with open(args.queries_file) as f:
+            queries.extend(line.strip() for line in f if line.strip())
+    if not queries:
+        queries = scenario_queries(vary_phrasing=args.vary_phrasing)
+
+    print("=" * 80)
+    print("🔥 RESPONSE CACHE WARM-UP")
+    print("=" * 80)
+    cache_backend = cache_backend_from_args(args)
+    print_warm_up_report(warm_cache(queries, workers=args.workers, cache_dir=args.cache_dir,
+                                    model_options=model_options_from_args(args), cache_backend=cache_backend))
+    if cache_backend is not None:
+        cache_backend.close()
+
+
+if __name__ == "__main__":
+    main()
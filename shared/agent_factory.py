@@ -0,0 +1,135 @@
+"""
+Reusable, lazily built agents for short-lived worker processes.
+
+A worker that imports agno, builds its model, database and Agent, and then
+serves one request pays for all of it on that first request. AgentFactory
+keeps named recipes instead and builds on first use:
+
+- Importing this module imports nothing from agno.
+- Models and databases are built once per configuration and shared between
+  the agents that ask for the same one (one SqliteDb per file, not per agent).
+- get(name) builds the agent on first call and returns the same instance after
+  that, so later requests skip construction entirely.
+- warm() does the first-request work ahead of time (imports, construction,
+  creating the session table, parsing tool schemas), optionally on a
+  background thread while the process finishes starting up.
+
+    factory = AgentFactory()
+    factory.register("support", lambda f: Agent(model=f.model("gpt-4o"), db=f.db("tmp/support.db")))
+    factory.warm(background=True)
+    ...
+    agent = factory.get("support")
+"""
+
+import threading
+import time
+
+
+class AgentFactory:
+    """Registry of named agent recipes, built lazily and reused"""
+
+    def __init__(self, telemetry=None):
+        # None keeps agno's default; False turns off its per-run telemetry call
+        self.telemetry = telemetry
+        self._recipes = {}
+        self._agents = {}
+        self._models = {}
+        self._dbs = {}
+        self._lock = threading.RLock()
+        self.build_times_s = {}
+        self.warm_time_s = None
+
+    def register(self, name, build):
+        """Add a recipe: build(factory) returns a new Agent"""
+        with self._lock:
+            self._recipes[name] = build
+            self._agents.pop(name, None)
+        return self
+
+    def names(self):
+        return list(self._recipes)
+
+    def model(self, model_id, **options):
+        """Shared model for model_id and build_model options (offline or OpenAI)"""
+        key = (model_id, tuple(sorted(options.items())))
+        with self._lock:
+            if key not in self._models:
+                from offline_model import build_model
+
+                self._models[key] = build_model(model_id, **options)
+            return self._models[key]
+
+    def db(self, db_file, storage="default"):
+        """Shared SqliteDb (or AppendOnlySqliteDb for storage="append") for db_file"""
+        key = (db_file, storage)
+        with self._lock:
+            if key not in self._dbs:
+                if storage == "append":
+                    from append_only_db import AppendOnlySqliteDb
+
+                    self._dbs[key] = AppendOnlySqliteDb(db_file=db_file)
+                else:
+                    from agno.db.sqlite import SqliteDb
+
+                    self._dbs[key] = SqliteDb(db_file=db_file)
+            return self._dbs[key]
+
+    def get(self, name):
+        """The agent for `name`, built on first call"""
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                start = time.perf_counter()
+                agent = self._recipes[name](self)
+                if self.telemetry is not None:
+                    agent.telemetry = self.telemetry
+                self._agents[name] = agent
+                self.build_times_s[name] = time.perf_counter() - start
+            return agent
+
+    def reset(self, name=None):
+        """Drop built agents (all, or one) so the next get() rebuilds them"""
+        with self._lock:
+            if name is None:
+                self._agents.clear()
+            else:
+                self._agents.pop(name, None)
+
+    def _prepare(self, agent):
+        db = getattr(agent, "db", None)
+        if db is not None and hasattr(db, "_get_table"):
+            db._get_table(table_type="sessions", create_table_if_not_found=True)
+        from agno.tools.function import Function
+
+        for tool in agent.tools or []:
+            if callable(tool) and not isinstance(tool, Function) and hasattr(tool, "__name__"):
+                Function.from_callable(tool)
+
+    def warm(self, names=None, background=False):
+        """
+        Build and prepare agents before the first request. With background=True
+        this runs on a daemon thread, which is returned; join() it before relying
+        on warm_time_s.
+        """
+        def run():
+            start = time.perf_counter()
+            for name in names or self.names():
+                self._prepare(self.get(name))
+            self.warm_time_s = time.perf_counter() - start
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="agent-factory-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def summary(self):
+        return {
+            'registered': self.names(),
+            'built': list(self._agents),
+            'models': len(self._models),
+            'dbs': len(self._dbs),
+            'build_times_s': dict(self.build_times_s),
+            'warm_time_s': self.warm_time_s,
+        }
@@ -0,0 +1,286 @@
+"""
+Append-only session history storage for agno's SqliteDb.
+
+SqliteDb stores an agent session as one row whose `runs` column is a JSON array
+of every run. Every save serializes the whole session (`session.to_dict()`
+deep-copies all runs), rewrites the whole array, and reads the row back and
+deserializes it again. Per-run persist cost and bytes written therefore grow
+with session length.
+
+AppendOnlySqliteDb keeps the session row small (runs=NULL). Each run is stored
+as its own row in a side table, keyed by (session_id, seq):
+
+- A save writes the session row and only the runs that are new since the last
+  save, plus the last run saved before (it may have been saved mid-run).
+  Earlier runs are treated as immutable. If the run list no longer lines up
+  with what was saved (runs removed or reordered), the session is rewritten.
+- The database runs in WAL mode with synchronous=NORMAL. With batch_size > 1,
+  saves are buffered and committed together every `batch_size` saves. Reads,
+  deletes and close() flush first.
+- Reads reassemble `runs` from the side table, so agno sees the same session.
+  Rows written by a plain SqliteDb (with runs in the JSON column) still load.
+- upsert_session/upsert_sessions return what SqliteDb returns: the session, or
+  its dict with deserialize=False. Bulk upserts are committed as one batch.
+
+    db = AppendOnlySqliteDb(db_file="tmp/agent.db")
+    agent = Agent(db=db, ...)
+"""
+
+import json
+import time
+from dataclasses import asdict, is_dataclass
+
+from sqlalchemy import event, text
+from sqlalchemy.dialects import sqlite
+
+from agno.db.base import SessionType
+from agno.db.sqlite import SqliteDb
+from agno.db.utils import CustomJSONEncoder, serialize_session_json_fields
+from agno.session import AgentSession, TeamSession, WorkflowSession
+
+_SESSION_CLASSES = {
+    SessionType.AGENT.value: AgentSession,
+    SessionType.TEAM.value: TeamSession,
+    SessionType.WORKFLOW.value: WorkflowSession,
+}
+
+
+def _plain(value):
+    """Convert dataclasses nested in dicts/lists to dicts, as session.to_dict() does"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _enable_wal(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+class AppendOnlySqliteDb(SqliteDb):
+    """SqliteDb that appends agent runs as rows instead of rewriting the session blob"""
+
+    # Lets callers recognise this store without importing the module (and agno) themselves
+    append_only = True
+
+    def __init__(self, *args, batch_size=1, run_table="agno_session_runs", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_size = max(1, batch_size)
+        self.run_table = run_table
+        # session_id -> (runs persisted, run_id of the last persisted run)
+        self._persisted = {}
+        # Buffered writes: session rows by session_id, run rows by (session_id, seq)
+        self._pending_sessions = {}
+        self._pending_runs = {}
+        self._pending_saves = 0
+        self._run_table_ready = False
+        event.listen(self.db_engine, "connect", _enable_wal)
+
+    # --- Run table -----------------------------------------------------------
+
+    def _ensure_run_table(self, sess):
+        if self._run_table_ready:
+            return
+        sess.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.run_table} ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, run_id TEXT, run TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        ))
+        self._run_table_ready = True
+
+    def _load_persisted(self, session_id):
+        """(count, last run_id) of runs already stored for a session, cached per process"""
+        if session_id in self._persisted:
+            return self._persisted[session_id]
+        with self.Session() as sess, sess.begin():
+            self._ensure_run_table(sess)
+            row = sess.execute(
+                text(f"SELECT seq, run_id FROM {self.run_table} WHERE session_id = :sid ORDER BY seq DESC LIMIT 1"),
+                {"sid": session_id},
+            ).fetchone()
+        state = (row[0] + 1, row[1]) if row else (0, None)
+        self._persisted[session_id] = state
+        return state
+
+    # --- Writes --------------------------------------------------------------
+
+    def upsert_session(self, session, deserialize=True):
+        if not isinstance(session, AgentSession):
+            self.flush()
+            return super().upsert_session(session, deserialize=deserialize)
+
+        row = self._append(session)
+        self._pending_saves += 1
+        if self._pending_saves >= self.batch_size:
+            self.flush()
+        # The caller's session object is already the saved state; no read-back needed
+        return session if deserialize else self._session_dict(session, row)
+
+    def upsert_sessions(self, sessions, deserialize=True, preserve_updated_at=False):
+        agent_sessions = [session for session in sessions if isinstance(session, AgentSession)]
+        others = [session for session in sessions if session is not None and not isinstance(session, AgentSession)]
+        results = []
+        if others:
+            self.flush()
+            results.extend(super().upsert_sessions(others, deserialize=deserialize,
+                                                   preserve_updated_at=preserve_updated_at))
+        if agent_sessions:
+            rows = [self._append(session, preserve_updated_at) for session in agent_sessions]
+            self.flush()
+            results.extend(agent_sessions if deserialize else
+                           [self._session_dict(session, row) for session, row in zip(agent_sessions, rows)])
+        return results
+
+    def _append(self, session, preserve_updated_at=False):
+        """Buffer the session row and its new runs; returns the buffered session row"""
+        runs = session.runs or []
+        count, last_run_id = self._load_persisted(session.session_id)
+        rewrite = count > len(runs) or (count and runs[count - 1].run_id != last_run_id)
+        start = 0 if rewrite else max(0, count - 1)
+
+        if rewrite:
+            self.flush()
+            with self.Session() as sess, sess.begin():
+                sess.execute(text(f"DELETE FROM {self.run_table} WHERE session_id = :sid"),
+                             {"sid": session.session_id})
+        for seq in range(start, len(runs)):
+            self._pending_runs[(session.session_id, seq)] = {
+                "sid": session.session_id,
+                "seq": seq,
+                "run_id": runs[seq].run_id,
+                "run": json.dumps(runs[seq].to_dict(), cls=CustomJSONEncoder),
+            }
+        row = self._pending_sessions[session.session_id] = self._session_row(session, preserve_updated_at)
+        self._persisted[session.session_id] = (len(runs), runs[-1].run_id if runs else None)
+        return row
+
+    @staticmethod
+    def _session_dict(session, row):
+        """The dict SqliteDb returns for deserialize=False (only built when asked for)"""
+        return {**session.to_dict(), "session_type": SessionType.AGENT.value, "updated_at": row["updated_at"]}
+
+    @staticmethod
+    def _session_row(session, preserve_updated_at=False):
+        """Session columns without runs. Avoids session.to_dict(), which deep-copies every run."""
+        # Like SqliteDb, an upsert stamps updated_at unless asked to keep the session's own
+        updated_at = session.updated_at if preserve_updated_at else int(time.time())
+        return serialize_session_json_fields({
+            "session_id": session.session_id,
+            "agent_id": session.agent_id,
+            "user_id": session.user_id,
+            "agent_data": _plain(session.agent_data),
+            "session_data": _plain(session.session_data),
+            "metadata": _plain(session.metadata),
+            "summary": session.summary.to_dict() if session.summary else None,
+            "created_at": session.created_at,
+            "updated_at": updated_at,
+        })
+
+    def flush(self):
+        """Commit buffered session and run rows in one transaction"""
+        if not self._pending_sessions and not self._pending_runs:
+            self._pending_saves = 0
+            return
+        table = self._get_table(table_type="sessions", create_table_if_not_found=True)
+        with self.Session() as sess, sess.begin():
+            self._ensure_run_table(sess)
+            if self._pending_runs:
+                sess.execute(
+                    text(f"INSERT OR REPLACE INTO {self.run_table} (session_id, seq, run_id, run) "
+                         "VALUES (:sid, :seq, :run_id, :run)"),
+                    list(self._pending_runs.values()),
+                )
+            for row in self._pending_sessions.values():
+                columns = dict(
+                    agent_id=row["agent_id"],
+                    user_id=row["user_id"],
+                    agent_data=row["agent_data"],
+                    session_data=row["session_data"],
+                    metadata=row["metadata"],
+                    summary=row["summary"],
+                    runs=None,
+                    updated_at=row["updated_at"] or row["created_at"],
+                )
+                stmt = sqlite.insert(table).values(
+                    session_id=row["session_id"],
+                    session_type=SessionType.AGENT.value,
+                    created_at=row["created_at"],
+                    **columns,
+                ).on_conflict_do_update(index_elements=["session_id"], set_=columns)
+                sess.execute(stmt)
+        self._pending_sessions.clear()
+        self._pending_runs.clear()
+        self._pending_saves = 0
+
+    def close(self):
+        self.flush()
+
+    # --- Reads ---------------------------------------------------------------
+
+    def _attach_runs(self, sessions_raw):
+        """Fill `runs` from the run table for agent sessions stored append-only"""
+        ids = [raw["session_id"] for raw in sessions_raw
+               if raw.get("session_type") == SessionType.AGENT.value and not raw.get("runs")]
+        if not ids:
+            return sessions_raw
+        runs = {}
+        with self.Session() as sess, sess.begin():
+            self._ensure_run_table(sess)
+            params = {f"s{i}": sid for i, sid in enumerate(ids)}
+            placeholders = ", ".join(f":{name}" for name in params)
+            rows = sess.execute(
+                text(f"SELECT session_id, run FROM {self.run_table} "
+                     f"WHERE session_id IN ({placeholders}) ORDER BY session_id, seq"),
+                params,
+            )
+            for session_id, run in rows:
+                runs.setdefault(session_id, []).append(json.loads(run))
+        for raw in sessions_raw:
+            if raw["session_id"] in runs:
+                raw["runs"] = runs[raw["session_id"]]
+        return sessions_raw
+
+    @staticmethod
+    def _deserialize(raw):
+        return _SESSION_CLASSES[raw["session_type"]].from_dict(raw)
+
+    def get_session(self, session_id, session_type, user_id=None, deserialize=True):
+        self.flush()
+        raw = super().get_session(session_id, session_type, user_id=user_id, deserialize=False)
+        if not raw:
+            return raw
+        self._attach_runs([raw])
+        return self._deserialize(raw) if deserialize else raw
+
+    def get_sessions(self, *args, deserialize=True, **kwargs):
+        self.flush()
+        sessions_raw, total_count = super().get_sessions(*args, deserialize=False, **kwargs)
+        self._attach_runs(sessions_raw)
+        if not deserialize:
+            return sessions_raw, total_count
+        return [self._deserialize(raw) for raw in sessions_raw]
+
+    # --- Deletes -------------------------------------------------------------
+
+    def _delete_runs(self, session_ids):
+        with self.Session() as sess, sess.begin():
+            self._ensure_run_table(sess)
+            for session_id in session_ids:
+                sess.execute(text(f"DELETE FROM {self.run_table} WHERE session_id = :sid"), {"sid": session_id})
+                self._persisted.pop(session_id, None)
+
+    def delete_session(self, session_id):
+        self.flush()
+        self._delete_runs([session_id])
+        return super().delete_session(session_id)
+
+    def delete_sessions(self, session_ids):
+        self.flush()
+        self._delete_runs(session_ids)
+        return super().delete_sessions(session_ids)
@@ -0,0 +1,106 @@
+"""
+Measured response-cache accounting for agno models.
+
+CacheStats hooks the model's own cache lookup and save methods, so hit/miss
+counts, lookup latency and bytes read/written come from what the cache layer
+actually did, not from guessing which queries were repeated.
+
+    stats = CacheStats().instrument(model)
+    agent = Agent(model=model)
+    ...
+    print(stats.summary())
+"""
+
+import os
+import time
+from functools import wraps
+
+
+class CacheStats:
+    """Hit/miss, latency and byte counters for one model's response cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.lookup_time_s = 0.0
+        self.hit_lookup_time_s = 0.0
+        self.bytes_read = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.last_hit = None
+
+    def instrument(self, model):
+        """Wrap the model's cache read/write methods in place"""
+        read = model._get_cached_model_response
+        save = model._save_model_response_to_cache
+        save_stream = getattr(model, "_save_streaming_responses_to_cache", None)
+
+        @wraps(read)
+        def get_cached(cache_key):
+            start = time.perf_counter()
+            cached = read(cache_key)
+            elapsed = time.perf_counter() - start
+            self.lookup_time_s += elapsed
+            if cached:
+                self.hits += 1
+                self.hit_lookup_time_s += elapsed
+                self.bytes_read += self._file_size(model, cache_key)
+                self.last_hit = True
+            else:
+                self.misses += 1
+                self.last_hit = False
+            return cached
+
+        def record_write(cache_key):
+            self.writes += 1
+            self.bytes_written += self._file_size(model, cache_key)
+
+        @wraps(save)
+        def save_to_cache(cache_key, *args, **kwargs):
+            result = save(cache_key, *args, **kwargs)
+            record_write(cache_key)
+            return result
+
+        model._get_cached_model_response = get_cached
+        model._save_model_response_to_cache = save_to_cache
+
+        if save_stream is not None:
+            @wraps(save_stream)
+            def save_stream_to_cache(cache_key, *args, **kwargs):
+                result = save_stream(cache_key, *args, **kwargs)
+                record_write(cache_key)
+                return result
+
+            model._save_streaming_responses_to_cache = save_stream_to_cache
+        return self
+
+    @staticmethod
+    def _file_size(model, cache_key):
+        backend = getattr(model, "_response_cache_backend", None)
+        if backend is not None:
+            return backend.entry_size(cache_key)
+        try:
+            return os.path.getsize(model._get_model_cache_file_path(cache_key))
+        except OSError:
+            return 0
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def summary(self):
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'avg_lookup_ms': self.lookup_time_s / self.lookups * 1000 if self.lookups else 0.0,
+            'avg_hit_lookup_ms': self.hit_lookup_time_s / self.hits * 1000 if self.hits else 0.0,
+            'bytes_read': self.bytes_read,
+            'writes': self.writes,
+            'bytes_written': self.bytes_written,
+        }
@@ -0,0 +1,197 @@
+"""
+OfflineChat: the agno Model behind offline_model.build_model(offline=True).
+
+Kept apart from offline_model so that importing the demo helpers (flags,
+build_model, token estimates) does not import agno's model stack. Import
+OfflineChat from offline_model; it is loaded from here on first use.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from hashlib import md5
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from agno.models.base import Model
+from agno.models.metrics import Metrics
+from agno.models.response import ModelResponse
+
+from offline_model import (
+    LATENCY_DISTRIBUTIONS,
+    TOKENS_PER_MESSAGE,
+    _message_text,
+    estimate_tokens,
+    extract_topics,
+    sample_latency,
+)
+
+
+@dataclass
+class OfflineChat(Model):
+    """In-process model that behaves like a tool-calling chat model."""
+
+    id: str = "offline-gpt-4o-mini"
+    name: str = "OfflineChat"
+    provider: str = "Offline"
+
+    # Name of the tool to call on the first model call of every run
+    tool_name: str = "get_info_about_topic"
+    # Latency added to every model call, in milliseconds
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    latency_distribution: str = "fixed"
+    # Delay between streamed chunks (inter-token latency), in milliseconds
+    chunk_interval_ms: float = 0.0
+    # Seed for the latency RNG so runs are reproducible
+    seed: Optional[int] = 42
+    # Final answers quote tool results up to this length, like a model asked to be brief
+    max_answer_chars: int = 240
+
+    _rng: random.Random = field(default=None, init=False, repr=False)
+    _tool_call_seq: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency_distribution '{self.latency_distribution}', "
+                f"expected one of {LATENCY_DISTRIBUTIONS}"
+            )
+        self._rng = random.Random(self.seed)
+
+    # --- Latency -----------------------------------------------------------
+
+    def sample_latency(self):
+        """Draw one model-call latency in seconds."""
+        return sample_latency(self._rng, self.latency_ms, self.latency_jitter_ms, self.latency_distribution)
+
+    # --- Response generation -------------------------------------------------
+
+    def _available_tools(self, tools):
+        names = set()
+        for tool in tools or []:
+            fn = tool.get("function") if isinstance(tool, dict) else None
+            if isinstance(fn, dict) and fn.get("name"):
+                names.add(fn["name"])
+        return names
+
+    def _current_turn(self, messages):
+        """Return (user_message, tool_messages) for the in-progress turn."""
+        last_user_idx = None
+        for idx in range(len(messages) - 1, -1, -1):
+            if messages[idx].role == "user":
+                last_user_idx = idx
+                break
+        if last_user_idx is None:
+            return None, []
+        tool_results = [m for m in messages[last_user_idx + 1:] if m.role == self.tool_message_role]
+        return messages[last_user_idx], tool_results
+
+    def _usage(self, messages, tools, output_text):
+        input_tokens = sum(TOKENS_PER_MESSAGE + estimate_tokens(_message_text(m)) for m in messages)
+        if tools:
+            input_tokens += estimate_tokens(json.dumps(tools, default=str))
+        output_tokens = estimate_tokens(output_text)
+        usage = Metrics()
+        usage.input_tokens = input_tokens
+        usage.output_tokens = output_tokens
+        usage.total_tokens = input_tokens + output_tokens
+        return usage
+
+    def _generate(self, messages, tools):
+        """Build the deterministic provider response for this context."""
+        user_message, tool_results = self._current_turn(messages)
+        query = user_message.get_content_string() if user_message is not None else ""
+        topics = extract_topics(query)
+        topic = ", ".join(topics)
+
+        response = ModelResponse(role=self.assistant_message_role)
+        if self.tool_name in self._available_tools(tools) and not tool_results:
+            # Numbered per model so identical sessions produce identical ids, but a
+            # repeated query never reuses an id within a session (history filters match on ids)
+            response.tool_calls = []
+            for call_topic in topics:
+                self._tool_call_seq += 1
+                call_key = f"{self._tool_call_seq}:{len(messages)}:{query}"
+                response.tool_calls.append({
+                    "id": f"call_{md5(call_key.encode()).hexdigest()[:24]}",
+                    "type": "function",
+                    "function": {"name": self.tool_name, "arguments": json.dumps({"topic": call_topic})},
+                })
+            output_text = json.dumps(response.tool_calls)
+        else:
+            if tool_results:
+                findings = " ".join(m.get_content_string() for m in tool_results)
+                if len(findings) > self.max_answer_chars:
+                    findings = findings[:self.max_answer_chars].rsplit(" ", 1)[0] + " ..."
+                response.content = f"Here is what I found about {topic}: {findings}"
+            else:
+                response.content = f"Offline answer to: {query}"
+            output_text = response.content
+        response.response_usage = self._usage(messages, tools, output_text)
+        return response
+
+    def _chunks(self, response):
+        """Split a response into streaming deltas (tool calls, words, usage)."""
+        if response.tool_calls:
+            yield ModelResponse(role=response.role, tool_calls=response.tool_calls)
+        elif response.content:
+            words = response.content.split(" ")
+            for i, word in enumerate(words):
+                yield ModelResponse(role=response.role, content=word if i == 0 else " " + word)
+        yield ModelResponse(response_usage=response.response_usage)
+
+    # --- Model interface -----------------------------------------------------
+
+    def invoke(self, messages, assistant_message, response_format=None, tools=None, tool_choice=None,
+               run_response=None, compress_tool_results=False) -> ModelResponse:
+        assistant_message.metrics.start_timer()
+        delay = self.sample_latency()
+        if delay:
+            time.sleep(delay)
+        response = self._generate(messages, tools)
+        assistant_message.metrics.stop_timer()
+        return response
+
+    async def ainvoke(self, messages, assistant_message, response_format=None, tools=None, tool_choice=None,
+                      run_response=None, compress_tool_results=False) -> ModelResponse:
+        assistant_message.metrics.start_timer()
+        delay = self.sample_latency()
+        if delay:
+            await asyncio.sleep(delay)
+        response = self._generate(messages, tools)
+        assistant_message.metrics.stop_timer()
+        return response
+
+    def invoke_stream(self, messages, assistant_message, response_format=None, tools=None, tool_choice=None,
+                      run_response=None, compress_tool_results=False) -> Iterator[ModelResponse]:
+        assistant_message.metrics.start_timer()
+        delay = self.sample_latency()
+        if delay:
+            time.sleep(delay)
+        for i, chunk in enumerate(self._chunks(self._generate(messages, tools))):
+            if i and self.chunk_interval_ms:
+                time.sleep(self.chunk_interval_ms / 1000.0)
+            yield chunk
+        assistant_message.metrics.stop_timer()
+
+    async def ainvoke_stream(self, messages, assistant_message, response_format=None, tools=None,
+                             tool_choice=None, run_response=None,
+                             compress_tool_results=False) -> AsyncIterator[ModelResponse]:
+        assistant_message.metrics.start_timer()
+        delay = self.sample_latency()
+        if delay:
+            await asyncio.sleep(delay)
+        for i, chunk in enumerate(self._chunks(self._generate(messages, tools))):
+            if i and self.chunk_interval_ms:
+                await asyncio.sleep(self.chunk_interval_ms / 1000.0)
+            yield chunk
+        assistant_message.metrics.stop_timer()
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return response
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return response
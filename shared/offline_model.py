@@ -0,0 +1,177 @@
+"""
+Offline, deterministic stand-in for OpenAIChat.
+
+Lets every demo run without network access or an API key, so we can measure
+framework overhead, history filtering and caching in CI or on air-gapped boxes.
+
+Behaviour per model call:
+- If tools are available and the current turn has no tool result yet, emit a
+  `get_info_about_topic` tool call for the topic in the user message. A
+  fan-out query ("Compare X, Y and Z") gets one parallel tool call per topic.
+- Otherwise, emit a short final answer built from the tool result (or query).
+
+Token usage is estimated from the context actually received (messages + tool
+definitions), and latency is drawn from a configurable distribution.
+
+Select it from any demo with `--offline` or `AGNO_DEMO_OFFLINE=1`.
+
+The model class itself lives in offline_chat.py and is imported on first use,
+so importing this module does not import agno.
+"""
+
+import json
+import math
+import os
+import re
+from typing import Any, Dict, List
+
+# Rough average for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+# Per-message framing overhead used by the chat-completions format
+TOKENS_PER_MESSAGE = 4
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+def estimate_tokens(text):
+    """Cheap, deterministic token estimate for a string."""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def sample_latency(rng, mean_ms, jitter_ms=0.0, distribution="fixed"):
+    """Draw one model-call latency in seconds from `distribution` (see LATENCY_DISTRIBUTIONS)."""
+    if mean_ms <= 0 and jitter_ms <= 0:
+        return 0.0
+    if distribution == "fixed":
+        value = mean_ms
+    elif distribution == "uniform":
+        value = rng.uniform(mean_ms - jitter_ms, mean_ms + jitter_ms)
+    elif distribution == "normal":
+        value = rng.gauss(mean_ms, jitter_ms)
+    elif distribution == "lognormal":
+        # Parameterised so the distribution has the requested mean and std
+        variance = jitter_ms ** 2
+        sigma2 = math.log1p(variance / (mean_ms ** 2)) if mean_ms > 0 else 0.0
+        mu = math.log(mean_ms) - sigma2 / 2 if mean_ms > 0 else 0.0
+        value = rng.lognormvariate(mu, sigma2 ** 0.5)
+    else:  # exponential
+        value = rng.expovariate(1.0 / mean_ms) if mean_ms > 0 else 0.0
+    return max(0.0, value) / 1000.0
+
+
+def _message_text(message):
+    """Flatten a message into the text a provider would be billed for."""
+    parts = [message.get_content_string() if message.content is not None else ""]
+    if message.tool_calls:
+        parts.append(json.dumps(message.tool_calls, default=str))
+    return "".join(parts)
+
+
+def extract_topic(query):
+    """Pull the topic out of a benchmark-style query ("Tell me about X")."""
+    text = (query or "").strip()
+    prefix = "tell me about "
+    if text.lower().startswith(prefix):
+        text = text[len(prefix):]
+    return text.rstrip("?.! ") or "general"
+
+
+def extract_topics(query):
+    """Topics of a fan-out query ("Compare X, Y and Z"), or the single topic of any other query."""
+    text = (query or "").strip()
+    prefix = "compare "
+    if not text.lower().startswith(prefix):
+        return [extract_topic(text)]
+    parts = re.split(r"\s*,\s*(?:and\s+)?|\s+and\s+", text[len(prefix):].rstrip("?.! "))
+    return [part for part in parts if part] or ["general"]
+
+
+def offline_enabled(flag=None):
+    """True if the offline model was requested by flag or AGNO_DEMO_OFFLINE."""
+    if flag is not None:
+        return bool(flag)
+    return os.getenv("AGNO_DEMO_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def build_model(model_id, offline=None, latency_ms=None, latency_jitter_ms=None,
+                latency_distribution=None, seed=None, chunk_interval_ms=None, **kwargs):
+    """
+    Create the model used by a demo script.
+
+    Returns OpenAIChat(id=model_id, **kwargs) normally, or an OfflineChat with
+    the same id and kwargs (e.g. cache_response) when offline mode is enabled.
+    Latency settings fall back to AGNO_DEMO_LATENCY_MS / _JITTER_MS / _DIST and
+    AGNO_DEMO_CHUNK_INTERVAL_MS.
+    """
+    if not offline_enabled(offline):
+        from agno.models.openai import OpenAIChat
+
+        return OpenAIChat(id=model_id, **kwargs)
+
+    options: Dict[str, Any] = {
+        "latency_ms": latency_ms if latency_ms is not None else float(os.getenv("AGNO_DEMO_LATENCY_MS", 0)),
+        "latency_jitter_ms": (
+            latency_jitter_ms if latency_jitter_ms is not None else float(os.getenv("AGNO_DEMO_LATENCY_JITTER_MS", 0))
+        ),
+        "latency_distribution": latency_distribution or os.getenv("AGNO_DEMO_LATENCY_DIST", "fixed"),
+        "chunk_interval_ms": (
+            chunk_interval_ms if chunk_interval_ms is not None
+            else float(os.getenv("AGNO_DEMO_CHUNK_INTERVAL_MS", 0))
+        ),
+    }
+    if seed is not None:
+        options["seed"] = seed
+    from offline_chat import OfflineChat
+
+    return OfflineChat(id=f"offline-{model_id}", **options, **kwargs)
+
+
+def add_offline_arguments(parser):
+    """Register the shared --offline/--latency-* CLI flags on an argparse parser."""
+    group = parser.add_argument_group("offline model")
+    group.add_argument("--offline", action="store_true", default=None,
+                       help="Use the in-process OfflineChat model instead of the OpenAI API")
+    group.add_argument("--latency-ms", type=float, default=None, help="Mean simulated model latency (ms)")
+    group.add_argument("--latency-jitter-ms", type=float, default=None, help="Latency spread (ms)")
+    group.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default=None,
+                       help="Latency distribution for the offline model")
+    group.add_argument("--chunk-interval-ms", type=float, default=None,
+                       help="Delay between streamed chunks for the offline model (ms)")
+    group.add_argument("--seed", type=int, default=None, help="Seed for offline latency sampling (and the benchmark's tool responses)")
+    return parser
+
+
+def model_options_from_args(args):
+    """Translate parsed CLI args into build_model keyword arguments."""
+    return {
+        "offline": args.offline,
+        "latency_ms": args.latency_ms,
+        "latency_jitter_ms": args.latency_jitter_ms,
+        "latency_distribution": args.latency_dist,
+        "seed": args.seed,
+        "chunk_interval_ms": args.chunk_interval_ms,
+    }
+
+
+def __getattr__(name):
+    # `from offline_model import OfflineChat` loads the class (and agno) only when asked for
+    if name == "OfflineChat":
+        from offline_chat import OfflineChat
+
+        return OfflineChat
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__: List[str] = [
+    "OfflineChat",
+    "build_model",
+    "estimate_tokens",
+    "extract_topic",
+    "extract_topics",
+    "offline_enabled",
+    "sample_latency",
+    "add_offline_arguments",
+    "model_options_from_args",
+]
@@ -0,0 +1,123 @@
+"""
+Concurrent execution of the tool calls in one model response.
+
+When a model asks for several tools in one turn ("compare X, Y and Z"), agno's
+synchronous run path executes them one after another, so a turn with k slow
+tool calls takes k times as long. Its async path (agent.arun) already gathers
+them on asyncio. ParallelToolCalls gives the synchronous path the same
+behaviour with a thread pool:
+
+- When the model's run_function_calls receives two or more calls, every call
+  that can run unattended (no confirmation, user input or external execution,
+  and within the run's tool call limit) is submitted to the pool at once.
+- agno then processes the calls in their original order as usual: events,
+  result messages and hooks are unchanged. Only FunctionCall.execute() returns
+  the pooled result instead of running the tool again.
+
+    ParallelToolCalls(max_workers=8).instrument(agent)
+
+Tools run on worker threads, so they must be thread-safe.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+EXECUTION_MODES = ("serial", "threads", "async")
+
+# id(FunctionCall) -> Future with its execute() result, consumed by the patched execute()
+_PREFETCHED = {}
+_PREFETCHED_LOCK = threading.Lock()
+
+
+def install():
+    """Make FunctionCall.execute() return a pooled result when one is pending (idempotent)"""
+    from agno.tools.function import FunctionCall
+
+    original = FunctionCall.execute
+    if getattr(original, "_parallel_tools", False):
+        return
+
+    @wraps(original)
+    def execute(self):
+        with _PREFETCHED_LOCK:
+            future = _PREFETCHED.pop(id(self), None)
+        if future is None:
+            return original(self)
+        return future.result()
+
+    execute._parallel_tools = True
+    FunctionCall.execute = execute
+
+
+def _runs_unattended(fc):
+    function = fc.function
+    return not (function.requires_confirmation or function.requires_user_input or function.external_execution
+                or function.name == "get_user_input")
+
+
+class ParallelToolCalls:
+    """Run the independent tool calls of each model response on a thread pool"""
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._pool = None
+        self.batches = 0
+        self.parallel_calls = 0
+        self.max_fanout = 0
+
+    def instrument(self, agent):
+        """Wrap agent.model.run_function_calls in place"""
+        install()
+        model = agent.model
+        original = model.run_function_calls
+        if getattr(original, "_parallel_tools", None) is self:
+            return self
+
+        @wraps(original)
+        def run_function_calls(function_calls, function_call_results, additional_input=None,
+                               current_function_call_count=0, function_call_limit=None):
+            pending = self._submit(function_calls, current_function_call_count, function_call_limit)
+            try:
+                yield from original(function_calls, function_call_results, additional_input=additional_input,
+                                    current_function_call_count=current_function_call_count,
+                                    function_call_limit=function_call_limit)
+            finally:
+                # Calls agno skipped (e.g. a paused run) must not leave results behind
+                with _PREFETCHED_LOCK:
+                    for key in pending:
+                        _PREFETCHED.pop(key, None)
+
+        run_function_calls._parallel_tools = self
+        model.run_function_calls = run_function_calls
+        return self
+
+    def _submit(self, function_calls, current_count, limit):
+        calls = list(function_calls)
+        if limit is not None:
+            calls = calls[:max(0, limit - current_count)]
+        calls = [fc for fc in calls if _runs_unattended(fc)]
+        if len(calls) < 2:
+            return []
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+        self.batches += 1
+        self.parallel_calls += len(calls)
+        self.max_fanout = max(self.max_fanout, len(calls))
+        futures = {id(fc): self._pool.submit(type(fc).execute.__wrapped__, fc) for fc in calls}
+        with _PREFETCHED_LOCK:
+            _PREFETCHED.update(futures)
+        return list(futures)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def summary(self):
+        return {
+            'max_workers': self.max_workers,
+            'batches': self.batches,
+            'parallel_calls': self.parallel_calls,
+            'max_fanout': self.max_fanout,
+        }
@@ -0,0 +1,25 @@
+"""
+One percentile definition for every report.
+
+Linear interpolation between closest ranks (numpy's default), so p95/p99 from
+different benchmarks are comparable.
+"""
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = rank - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def percentiles_ms(samples, pcts=(50, 95, 99)):
+    """p50/p95/p99 of durations in seconds, reported in ms"""
+    ordered = sorted(samples)
+    return {f"p{p}": percentile(ordered, p) * 1000 for p in pcts}
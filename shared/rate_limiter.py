@@ -0,0 +1,447 @@
+"""
+Rate-limit-aware scheduling of model requests (RPM / TPM token buckets).
+
+Providers cap requests per minute and tokens per minute. Calling agent.run in
+a tight loop runs into those caps, and the client's own retries then add more
+requests to an endpoint that is already refusing them. RateLimitScheduler sits
+in front of the model instead: it wraps the model's invoke methods, like
+ContextProfiler does, and admits each request only when it fits the quota.
+
+- Cost: every request is estimated before it is sent from the messages the
+  model is about to receive. That is the history-limited context, after
+  max_tool_calls_from_history has filtered it. Tool definitions and an
+  expected completion (the running mean of observed completions) are added.
+  Once the response arrives, the buckets are corrected by the difference
+  between the actual usage and the estimate. The ratio of actual to estimated
+  prompt tokens is tracked, so later estimates follow the provider's own
+  count.
+- Admission: one token bucket per limit, refilled continuously at limit/60 per
+  second. Each bucket holds up to `burst_s` seconds of quota, because
+  providers enforce per-minute limits over shorter windows. A request larger
+  than a full bucket waits until the bucket is full.
+- Priority: waiting requests are admitted in order of how many requests their
+  session has already made, so short sessions finish instead of queueing
+  behind long ones. Ties are admitted first come, first served.
+- 429s: the refill rate is cut by `decrease`, and admission pauses for the
+  provider's Retry-After, or for exponential backoff if there is none. After
+  that the request is retried. Every success restores `increase` of the
+  configured rate, up to the full rate (AIMD). 5xx responses are retried with
+  backoff but leave the rate alone. Set the OpenAI client's max_retries=0 so
+  that the scheduler is the only layer that retries.
+
+Works for agent.run and agent.arun (and their streaming variants), from
+threads or asyncio tasks sharing one scheduler:
+
+    scheduler = RateLimitScheduler(rpm=500, tpm=200_000)
+    for agent in agents:
+        scheduler.instrument(agent)
+    ...
+    print(scheduler.summary())
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import random
+import threading
+import time
+from array import array
+from functools import wraps
+
+from percentiles import percentile
+from tokenizer import TOKENS_PER_REPLY, Tokenizer
+
+INVOKE_METHODS = ("invoke", "ainvoke", "invoke_stream", "ainvoke_stream")
+
+
+class TokenBucket:
+    """Continuously refilled bucket: `rate_per_s` units per second, at most `capacity`"""
+
+    def __init__(self, rate_per_s, capacity, clock=time.monotonic):
+        self.rate_per_s = rate_per_s
+        self.capacity = capacity
+        self.clock = clock
+        self.level = capacity
+        self.updated = clock()
+
+    def refill(self, now=None):
+        now = self.clock() if now is None else now
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate_per_s)
+        self.updated = now
+        return self.level
+
+    def wait_time(self, amount, now=None):
+        """Seconds until `amount` can be taken (a request above capacity waits for a full bucket)"""
+        deficit = min(amount, self.capacity) - self.refill(now)
+        if deficit <= 0:
+            return 0.0
+        return deficit / self.rate_per_s if self.rate_per_s > 0 else float("inf")
+
+    def take(self, amount):
+        self.level -= amount
+
+    def give(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+    def set_rate(self, rate_per_s, now=None):
+        self.refill(now)
+        self.rate_per_s = rate_per_s
+
+
+def _status_code(error):
+    """HTTP status of a provider error (agno's ModelProviderError or the openai exception under it)"""
+    for e in (error, getattr(error, "__cause__", None)):
+        status = getattr(e, "status_code", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def _retry_after_s(error):
+    """Retry-After of a provider error, in seconds, if the response carried one"""
+    response = getattr(getattr(error, "__cause__", None), "response", None) or getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class RateLimitScheduler:
+    """Admits model requests through RPM/TPM token buckets, shortest sessions first"""
+
+    def __init__(self, rpm=None, tpm=None, burst_s=1.0, max_retries=5, backoff_s=0.5, max_backoff_s=20.0,
+                 decrease=0.5, increase=0.05, min_scale=0.1, tokenizer=None, seed=None):
+        if rpm is None and tpm is None:
+            raise ValueError("RateLimitScheduler needs rpm, tpm or both")
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst_s = burst_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.decrease = decrease
+        self.increase = increase
+        self.min_scale = min_scale
+        self.tokenizer = tokenizer or Tokenizer()
+        self.buckets = {}
+        if rpm:
+            self.buckets['requests'] = TokenBucket(rpm / 60, max(1.0, rpm / 60 * burst_s))
+        if tpm:
+            self.buckets['tokens'] = TokenBucket(tpm / 60, tpm / 60 * burst_s)
+        self.scale = 1.0
+        self.min_scale_seen = 1.0
+        self._paused_until = 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._seq = itertools.count()
+        self._session_requests = {}
+        self._output_tokens = (0, 0)  # (total, responses)
+        self._prompt_ratio = 1.0
+        self.wait_s = array("d")
+        self.counts = {'requests': 0, 'rate_limited': 0, 'server_errors': 0, 'retries': 0, 'failed': 0}
+        self._estimated_tokens = 0
+        self._actual_tokens = 0
+
+    # --- Estimation ----------------------------------------------------------
+
+    def expected_output_tokens(self):
+        total, responses = self._output_tokens
+        return total / responses if responses else 0.0
+
+    def estimate(self, messages, tools):
+        """(our prompt token count, estimated provider tokens for the whole request)"""
+        prompt = sum(self.tokenizer.count_message(m) for m in messages or [])
+        prompt += self.tokenizer.count_tools(tools) + TOKENS_PER_REPLY
+        return prompt, prompt * self._prompt_ratio + self.expected_output_tokens()
+
+    def _observe(self, ticket, usage):
+        """Correct the buckets and the estimator with the usage the provider reported"""
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        with self._lock:
+            if input_tokens or output_tokens:
+                actual = input_tokens + output_tokens
+                if 'tokens' in self.buckets:
+                    self.buckets['tokens'].take(actual - ticket['tokens'])
+                self._estimated_tokens += ticket['tokens']
+                self._actual_tokens += actual
+                if ticket['prompt'] > 0 and input_tokens:
+                    # Slow EMA: one odd request should not swing every later estimate
+                    self._prompt_ratio += 0.2 * (input_tokens / ticket['prompt'] - self._prompt_ratio)
+                total, responses = self._output_tokens
+                self._output_tokens = (total + output_tokens, responses + 1)
+            self._set_scale(min(1.0, self.scale + self.increase))
+            self._wake_head()
+
+    # --- Admission -----------------------------------------------------------
+
+    def _set_scale(self, scale):
+        self.scale = max(self.min_scale, scale)
+        self.min_scale_seen = min(self.min_scale_seen, self.scale)
+        now = time.monotonic()
+        if 'requests' in self.buckets:
+            self.buckets['requests'].set_rate(self.rpm / 60 * self.scale, now)
+        if 'tokens' in self.buckets:
+            self.buckets['tokens'].set_rate(self.tpm / 60 * self.scale, now)
+
+    def _enqueue(self, session, prompt, tokens, loop=None):
+        with self._lock:
+            ticket = {'prompt': prompt, 'tokens': tokens, 'session': session, 'enqueued': time.perf_counter(),
+                      'loop': loop, 'event': asyncio.Event() if loop is not None else threading.Event()}
+            entry = (self._session_requests.get(session, 0), next(self._seq), ticket)
+            heapq.heappush(self._pending, entry)
+            ticket['entry'] = entry
+        return ticket
+
+    def _wake_head(self):
+        """Wake the request at the head of the queue to re-check the buckets (call with the lock held)"""
+        if self._pending:
+            ticket = self._pending[0][2]
+            if ticket['loop'] is not None:
+                ticket['loop'].call_soon_threadsafe(ticket['event'].set)
+            else:
+                ticket['event'].set()
+
+    def _poll(self, ticket):
+        """
+        Admit `ticket` if it is next in line and fits the buckets. Otherwise return
+        the seconds until it could (head of the queue), or None (wait to be woken).
+        """
+        with self._lock:
+            if self._pending[0][2] is not ticket:
+                return None
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            wait = 0.0
+            for name, bucket in self.buckets.items():
+                wait = max(wait, bucket.wait_time(1 if name == 'requests' else ticket['tokens'], now))
+            if wait > 0:
+                return wait
+            heapq.heappop(self._pending)
+            for name, bucket in self.buckets.items():
+                bucket.take(1 if name == 'requests' else ticket['tokens'])
+            self._session_requests[ticket['session']] = self._session_requests.get(ticket['session'], 0) + 1
+            self.counts['requests'] += 1
+            self.wait_s.append(time.perf_counter() - ticket['enqueued'])
+            self._wake_head()
+            return 0.0
+
+    def _withdraw(self, ticket):
+        with self._lock:
+            if ticket['entry'] in self._pending:
+                self._pending.remove(ticket['entry'])
+                heapq.heapify(self._pending)
+                self._wake_head()
+
+    def acquire(self, session, prompt, tokens):
+        """Block until a request of `tokens` for `session` is admitted"""
+        ticket = self._enqueue(session, prompt, tokens)
+        try:
+            while True:
+                ticket['event'].clear()
+                wait = self._poll(ticket)
+                if wait == 0.0:
+                    return ticket
+                # Woken early when the head changes; the timeout only guards against a missed wake-up
+                ticket['event'].wait(wait if wait is not None else 1.0)
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+
+    async def aacquire(self, session, prompt, tokens):
+        """acquire() for asyncio tasks"""
+        ticket = self._enqueue(session, prompt, tokens, loop=asyncio.get_running_loop())
+        try:
+            while True:
+                ticket['event'].clear()
+                wait = self._poll(ticket)
+                if wait == 0.0:
+                    return ticket
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(ticket['event'].wait(), wait if wait is not None else 1.0)
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+
+    def _failed(self, ticket, error, attempt):
+        """Handle a failed request: the seconds to wait before retrying it, or None to give up"""
+        status = _status_code(error)
+        with self._lock:
+            # The request was refused, so its tokens were not spent
+            if 'tokens' in self.buckets:
+                self.buckets['tokens'].give(ticket['tokens'])
+            if status == 429:
+                self.counts['rate_limited'] += 1
+                if time.monotonic() >= self._paused_until:
+                    # One cut per pause: 429s from requests already in flight say nothing new
+                    self._set_scale(self.scale * self.decrease)
+            elif status is not None and status >= 500:
+                self.counts['server_errors'] += 1
+            else:
+                return None
+            if attempt >= self.max_retries:
+                self.counts['failed'] += 1
+                return None
+            self.counts['retries'] += 1
+            delay = _retry_after_s(error) if status == 429 else None
+            if delay is None:
+                delay = min(self.max_backoff_s, self.backoff_s * 2 ** attempt) * self._rng.uniform(0.5, 1.0)
+            if status == 429:
+                # Everyone waits: the provider has told us the quota is spent
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._wake_head()
+            return delay
+
+    # --- Model wrapping ------------------------------------------------------
+
+    def instrument(self, agent):
+        """Wrap the invoke methods of agent.model in place"""
+        model = agent.model
+        for name in INVOKE_METHODS:
+            method = getattr(model, name, None)
+            if method is None or getattr(method, "_rate_limit_scheduler", None) is self:
+                continue
+            wrapper = self._wrap(method, name, agent)
+            wrapper._rate_limit_scheduler = self
+            setattr(model, name, wrapper)
+        return self
+
+    def _request(self, agent, args, kwargs):
+        messages = kwargs.get("messages", args[0] if args else [])
+        prompt, tokens = self.estimate(messages, kwargs.get("tools"))
+        return agent.session_id or id(agent), prompt, tokens
+
+    def _wrap(self, fn, name, agent):
+        if name == "invoke":
+            @wraps(fn)
+            def invoke(*args, **kwargs):
+                request = self._request(agent, args, kwargs)
+                for attempt in itertools.count():
+                    ticket = self.acquire(*request)
+                    try:
+                        response = fn(*args, **kwargs)
+                    except Exception as e:
+                        delay = self._failed(ticket, e, attempt)
+                        if delay is None:
+                            raise
+                        time.sleep(delay)
+                        continue
+                    self._observe(ticket, response.response_usage)
+                    return response
+            return invoke
+
+        if name == "ainvoke":
+            @wraps(fn)
+            async def ainvoke(*args, **kwargs):
+                request = self._request(agent, args, kwargs)
+                for attempt in itertools.count():
+                    ticket = await self.aacquire(*request)
+                    try:
+                        response = await fn(*args, **kwargs)
+                    except Exception as e:
+                        delay = self._failed(ticket, e, attempt)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                        continue
+                    self._observe(ticket, response.response_usage)
+                    return response
+            return ainvoke
+
+        # Streams: a request can only be retried if it failed before its first chunk
+        if name == "invoke_stream":
+            @wraps(fn)
+            def invoke_stream(*args, **kwargs):
+                request = self._request(agent, args, kwargs)
+                for attempt in itertools.count():
+                    ticket = self.acquire(*request)
+                    usage, started = None, False
+                    try:
+                        for chunk in fn(*args, **kwargs):
+                            started = True
+                            usage = chunk.response_usage or usage
+                            yield chunk
+                    except Exception as e:
+                        delay = None if started else self._failed(ticket, e, attempt)
+                        if delay is None:
+                            raise
+                        time.sleep(delay)
+                        continue
+                    self._observe(ticket, usage)
+                    return
+            return invoke_stream
+
+        @wraps(fn)
+        async def ainvoke_stream(*args, **kwargs):
+            request = self._request(agent, args, kwargs)
+            for attempt in itertools.count():
+                ticket = await self.aacquire(*request)
+                usage, started = None, False
+                try:
+                    async for chunk in fn(*args, **kwargs):
+                        started = True
+                        usage = chunk.response_usage or usage
+                        yield chunk
+                except Exception as e:
+                    delay = None if started else self._failed(ticket, e, attempt)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                self._observe(ticket, usage)
+                return
+        return ainvoke_stream
+
+    # --- Reporting -----------------------------------------------------------
+
+    def summary(self):
+        waits = sorted(self.wait_s)
+        return {
+            'rpm': self.rpm,
+            'tpm': self.tpm,
+            'burst_s': self.burst_s,
+            **self.counts,
+            'queue_wait_s': {
+                'mean': sum(waits) / len(waits) if waits else 0.0,
+                'p50': percentile(waits, 50),
+                'p95': percentile(waits, 95),
+                'max': waits[-1] if waits else 0.0,
+            },
+            'estimated_tokens': self._estimated_tokens,
+            'actual_tokens': self._actual_tokens,
+            'estimate_error_pct': ((self._estimated_tokens - self._actual_tokens) / self._actual_tokens * 100
+                                   if self._actual_tokens else None),
+            'prompt_ratio': self._prompt_ratio,
+            'final_scale': self.scale,
+            'min_scale': self.min_scale_seen,
+        }
+
+
+def add_scheduler_arguments(parser):
+    """Add --rpm/--tpm/--rate-burst-s/--rate-retries to an argparse parser"""
+    group = parser.add_argument_group("rate-limit scheduler")
+    group.add_argument("--rpm", type=float, default=None,
+                       help="Schedule model requests under this requests-per-minute quota")
+    group.add_argument("--tpm", type=float, default=None,
+                       help="Schedule model requests under this tokens-per-minute quota")
+    group.add_argument("--rate-burst-s", type=float, default=1.0,
+                       help="Seconds of quota the scheduler may spend in a burst (default: 1)")
+    group.add_argument("--rate-retries", type=int, default=5,
+                       help="Scheduler retries of a request refused with 429/5xx (default: 5)")
+    return parser
+
+
+def scheduler_from_args(args):
+    """RateLimitScheduler for --rpm/--tpm, else None"""
+    if args.rpm is None and args.tpm is None:
+        return None
+    return RateLimitScheduler(rpm=args.rpm, tpm=args.tpm, burst_s=args.rate_burst_s,
+                              max_retries=args.rate_retries, seed=getattr(args, "seed", None))
@@ -0,0 +1,367 @@
+"""
+Embedded, indexed store for benchmark results.
+
+Each script writes a timestamped JSON file per run. Finding "the latest run" or
+"the run to compare against" then means globbing the directory and sorting by
+file time, which neither scales to hundreds of runs nor tells benchmark types,
+configurations or models apart. ResultsStore records every run in one SQLite
+file instead:
+
+- `runs` holds one row per benchmark run, keyed by run id, with the benchmark
+  name, creation time, git commit, model, configuration (JSON plus a hash for
+  indexed lookups) and the results summary (zlib-compressed JSON).
+- Per-run series are split out of the results and stored column by column in
+  `series` as packed int64/float64 arrays, compressed. A column group is any
+  dict of equal-length numeric lists, such as the benchmark's `series` and
+  `phases.per_run`. load() puts them back where they came from.
+- latest(), history() and metric_history() are index lookups on (benchmark,
+  config hash, model, time), and compare() diffs the numeric fields of two runs.
+
+    store = ResultsStore("benchmark_results.db")
+    run_id = store.record("max_tool_calls", results, config={"queries": 50}, model="offline:gpt-4o-mini")
+    store.compare(store.latest("max_tool_calls", offset=1), run_id)
+
+Run this file directly to list, show, compare or trend recorded runs:
+
+    python ../shared/results_store.py list
+    python ../shared/results_store.py compare <run-a> <run-b>
+    python ../shared/results_store.py trend max_tool_calls savings.token_savings_pct
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import time
+import uuid
+import zlib
+from array import array
+
+DEFAULT_PATH = "benchmark_results.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    benchmark TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    git_commit TEXT,
+    model TEXT,
+    config_hash TEXT NOT NULL,
+    config TEXT NOT NULL,
+    summary BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_latest ON runs (benchmark, created_at);
+CREATE INDEX IF NOT EXISTS runs_config ON runs (benchmark, config_hash, created_at);
+CREATE INDEX IF NOT EXISTS runs_model ON runs (benchmark, model, created_at);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs (git_commit);
+CREATE TABLE IF NOT EXISTS series (
+    run_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    typecode TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, path, name)
+);
+"""
+
+
+def config_hash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def git_commit(path=None):
+    """Short commit of the checkout containing `path` (suffixed -dirty if modified), or None"""
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--abbrev=12"],
+            cwd=path or os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if out.returncode != 0:
+        return None
+    return out.stdout.strip() or None
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_column_group(value):
+    """A dict of equal-length lists of numbers, i.e. a columnar per-run series"""
+    if not isinstance(value, dict) or not value:
+        return False
+    columns = list(value.values())
+    if not all(isinstance(column, list) for column in columns):
+        return False
+    return len({len(column) for column in columns}) == 1 and all(
+        _is_number(item) for column in columns for item in column
+    )
+
+
+def split_series(results, path=""):
+    """Return (results without column groups, {path: column group})"""
+    if _is_column_group(results):
+        return None, {path: results}
+    if not isinstance(results, dict):
+        return results, {}
+    summary, groups = {}, {}
+    for key, value in results.items():
+        child, found = split_series(value, f"{path}.{key}" if path else key)
+        groups.update(found)
+        if child is not None or not found:
+            summary[key] = child
+    return summary, groups
+
+
+def _attach(results, path, group):
+    node = results
+    *parents, last = path.split(".")
+    for key in parents:
+        node = node.setdefault(key, {})
+    node[last] = group
+
+
+def _flatten_numbers(value, path=""):
+    """{dotted path: number} for every number in nested dicts and lists (list items by index)"""
+    if _is_number(value):
+        return {path: value}
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {}
+    flat = {}
+    for key, child in items:
+        flat.update(_flatten_numbers(child, f"{path}.{key}" if path else str(key)))
+    return flat
+
+
+def _lookup(results, path):
+    for key in path.split("."):
+        if isinstance(results, list) and key.isdigit() and int(key) < len(results):
+            results = results[int(key)]
+        elif isinstance(results, dict) and key in results:
+            results = results[key]
+        else:
+            return None
+    return results
+
+
+class ResultsStore:
+    """Benchmark runs in one SQLite file, indexed by benchmark, config, model and commit"""
+
+    def __init__(self, path=DEFAULT_PATH, compression_level=6):
+        self.path = path
+        self.compression_level = compression_level
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writes ------------------------------------------------------------
+
+    def record(self, benchmark, results, config=None, model=None, run_id=None, commit=None, created_at=None):
+        """Store one run and return its run id"""
+        config = config or {}
+        created_at = created_at or time.time()
+        if run_id is None:
+            stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(created_at))
+            run_id = f"{benchmark}-{stamp}-{uuid.uuid4().hex[:6]}"
+        summary, groups = split_series(results)
+        rows = []
+        for path, group in groups.items():
+            for name, column in group.items():
+                typecode = "q" if all(isinstance(item, int) for item in column) else "d"
+                data = zlib.compress(array(typecode, column).tobytes(), self.compression_level)
+                rows.append((run_id, path, name, typecode, len(column), data))
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, benchmark, created_at, git_commit, model, config_hash, config, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, benchmark, created_at, commit if commit is not None else git_commit(), model,
+                 config_hash(config), json.dumps(config, sort_keys=True, default=str),
+                 zlib.compress(json.dumps(summary, default=str).encode(), self.compression_level)),
+            )
+            self._conn.executemany("INSERT INTO series VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return run_id
+
+    def delete(self, run_id):
+        with self._conn:
+            self._conn.execute("DELETE FROM series WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    # --- Queries -----------------------------------------------------------
+
+    @staticmethod
+    def _where(benchmark=None, config=None, model=None, commit=None):
+        clauses, params = [], []
+        for column, value in (("benchmark", benchmark), ("model", model), ("git_commit", commit)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if config is not None:
+            clauses.append("config_hash = ?")
+            params.append(config_hash(config))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def history(self, benchmark=None, config=None, model=None, commit=None, limit=20, offset=0):
+        """Run metadata, newest first"""
+        where, params = self._where(benchmark, config, model, commit)
+        rows = self._conn.execute(
+            "SELECT run_id, benchmark, created_at, git_commit, model, config FROM runs"
+            f"{where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        return [
+            {'run_id': r[0], 'benchmark': r[1], 'created_at': r[2], 'git_commit': r[3], 'model': r[4],
+             'config': json.loads(r[5])}
+            for r in rows
+        ]
+
+    def latest(self, benchmark=None, config=None, model=None, commit=None, offset=0):
+        """Run id of the newest matching run (offset=1 for the one before it), or None"""
+        runs = self.history(benchmark, config, model, commit, limit=1, offset=offset)
+        return runs[0]['run_id'] if runs else None
+
+    def load(self, run_id, series=True):
+        """One run with its results; series=False leaves out the per-run columns"""
+        row = self._conn.execute(
+            "SELECT benchmark, created_at, git_commit, model, config, summary FROM runs WHERE run_id = ?",
+            (run_id,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No benchmark run {run_id!r} in {self.path}")
+        results = json.loads(zlib.decompress(row[5]))
+        if series:
+            for path, name, typecode, data in self._conn.execute(
+                "SELECT path, name, typecode, data FROM series WHERE run_id = ? ORDER BY rowid", (run_id,)
+            ):
+                column = array(typecode)
+                column.frombytes(zlib.decompress(data))
+                _attach(results, f"{path}.{name}" if path else name, column.tolist())
+        return {'run_id': run_id, 'benchmark': row[0], 'created_at': row[1], 'git_commit': row[2],
+                'model': row[3], 'config': json.loads(row[4]), 'results': results}
+
+    def compare(self, run_a, run_b):
+        """{field: {a, b, delta, change_pct}} for the numeric summary fields of two runs"""
+        a = _flatten_numbers(self.load(run_a, series=False)['results'])
+        b = _flatten_numbers(self.load(run_b, series=False)['results'])
+        diff = {}
+        for path in sorted(a.keys() | b.keys()):
+            va, vb = a.get(path), b.get(path)
+            delta = vb - va if va is not None and vb is not None else None
+            diff[path] = {'a': va, 'b': vb, 'delta': delta,
+                          'change_pct': delta / abs(va) * 100 if delta is not None and va else None}
+        return diff
+
+    def metric_history(self, benchmark, field, config=None, model=None, limit=100):
+        """[(run_id, created_at, value)] of one summary field, oldest first"""
+        where, params = self._where(benchmark, config, model)
+        rows = self._conn.execute(
+            f"SELECT run_id, created_at, summary FROM runs{where} ORDER BY created_at DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        return [(run_id, created_at, _lookup(json.loads(zlib.decompress(summary)), field))
+                for run_id, created_at, summary in reversed(rows)]
+
+
+def add_results_store_arguments(parser):
+    """Add --results-db/--no-results-db to an argparse parser"""
+    group = parser.add_argument_group("results store")
+    group.add_argument("--results-db", default=DEFAULT_PATH,
+                       help=f"SQLite file every run is recorded in (default: {DEFAULT_PATH})")
+    group.add_argument("--no-results-db", action="store_true", help="Only write the JSON results file")
+    return parser
+
+
+def record_from_args(args, benchmark, results, config=None, model=None):
+    """Record a run in --results-db unless --no-results-db was given; returns the run id or None"""
+    if args.no_results_db:
+        return None
+    with ResultsStore(args.results_db) as store:
+        run_id = store.record(benchmark, results, config=config, model=model)
+    print(f"🗄️  Recorded run {run_id} in {args.results_db}")
+    return run_id
+
+
+# --- Command line --------------------------------------------------------------
+
+def _print_history(store, args):
+    runs = store.history(args.benchmark, model=args.model, commit=args.commit, limit=args.limit)
+    print(f"{'Run id':<44} | {'Commit':<18} | {'Model':<24} | Config")
+    print("-" * 110)
+    for run in runs:
+        config = ", ".join(f"{k}={v}" for k, v in run['config'].items())
+        print(f"{run['run_id']:<44} | {run['git_commit'] or '-':<18} | {run['model'] or '-':<24} | {config}")
+
+
+def _print_compare(store, args):
+    run_b = args.run_b or store.latest(store.load(args.run_a, series=False)['benchmark'])
+    diff = store.compare(args.run_a, run_b)
+    print(f"A: {args.run_a}\nB: {run_b}\n")
+    print(f"{'Field':<52} | {'A':>14} | {'B':>14} | {'Change':>9}")
+    print("-" * 98)
+    for field, d in diff.items():
+        if args.filter and args.filter not in field:
+            continue
+        change = f"{d['change_pct']:+.1f}%" if d['change_pct'] is not None else "-"
+        fmt = lambda v: "-" if v is None else f"{v:,.4g}"  # noqa: E731
+        print(f"{field:<52} | {fmt(d['a']):>14} | {fmt(d['b']):>14} | {change:>9}")
+
+
+def _print_trend(store, args):
+    for run_id, created_at, value in store.metric_history(args.benchmark, args.field, limit=args.limit):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created_at))
+        print(f"{stamp}  {run_id:<44}  {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect recorded benchmark runs")
+    parser.add_argument("--results-db", default=DEFAULT_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="Recorded runs, newest first")
+    listing.add_argument("benchmark", nargs="?")
+    listing.add_argument("--model")
+    listing.add_argument("--commit")
+    listing.add_argument("--limit", type=int, default=20)
+    show = commands.add_parser("show", help="Results of one run as JSON")
+    show.add_argument("run_id")
+    show.add_argument("--series", action="store_true", help="Include the per-run series")
+    compare = commands.add_parser("compare", help="Numeric fields of run A vs run B (default: latest)")
+    compare.add_argument("run_a")
+    compare.add_argument("run_b", nargs="?")
+    compare.add_argument("--filter", help="Only fields containing this text")
+    trend = commands.add_parser("trend", help="One summary field across runs, oldest first")
+    trend.add_argument("benchmark")
+    trend.add_argument("field", help="Dotted path, e.g. savings.token_savings_pct or results.2.ttft_ms.p50")
+    trend.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    with ResultsStore(args.results_db) as store:
+        if args.command == "list":
+            _print_history(store, args)
+        elif args.command == "show":
+            print(json.dumps(store.load(args.run_id, series=args.series), indent=2))
+        elif args.command == "compare":
+            _print_compare(store, args)
+        else:
+            _print_trend(store, args)
+
+
+if __name__ == "__main__":
+    main()
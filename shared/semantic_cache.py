@@ -0,0 +1,243 @@
+"""
+Semantic response cache tier for agno models.
+
+The built-in `cache_response=True` cache only hits on byte-identical requests,
+so "How do I reset my password?" and "how do i reset my password" both go to the
+API. SemanticCache sits in front of it:
+
+- The last user message is embedded with a hashing character n-gram vectorizer
+  (NumPy only, no model download, deterministic across processes).
+- Everything else in the request (system prompt, earlier messages, tools) must
+  match exactly. It is hashed into a namespace so semantic matching never
+  crosses different contexts.
+- The nearest neighbour by cosine similarity is a hit if it clears `threshold`.
+- A sample of non-identical hits can be audited by calling the model anyway and
+  comparing answers, which estimates the false-hit rate of a threshold. Audits
+  that reach the API are billed calls; summary() counts them and their tokens.
+
+    semantic = SemanticCache(threshold=0.75).instrument(model)
+"""
+
+import json
+import random
+import re
+import time
+import zlib
+from functools import wraps
+from hashlib import md5
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(" ", (text or "").lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+class HashingVectorizer:
+    """Signed feature hashing of character n-grams into a fixed-size, L2-normalised vector"""
+
+    def __init__(self, n_features=4096, ngram_range=(3, 5)):
+        if np is None:
+            raise ImportError("SemanticCache requires numpy: pip install numpy")
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+
+    def transform(self, text):
+        padded = f" {normalize_text(text)} "
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                h = zlib.crc32(padded[i:i + n].encode())
+                # Top bit picks the sign so collisions tend to cancel out
+                vector[h % self.n_features] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class _Index:
+    """Growable in-memory matrix of unit vectors with brute-force cosine search"""
+
+    def __init__(self, n_features, capacity=64):
+        self.vectors = np.zeros((capacity, n_features), dtype=np.float32)
+        self.size = 0
+        self.entries = []
+
+    def add(self, vector, entry):
+        if self.size == len(self.vectors):
+            grown = np.zeros((len(self.vectors) * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors
+            self.vectors = grown
+        self.vectors[self.size] = vector
+        self.size += 1
+        self.entries.append(entry)
+
+    def nearest(self, vector):
+        if self.size == 0:
+            return None, 0.0
+        scores = self.vectors[:self.size] @ vector
+        best = int(np.argmax(scores))
+        return self.entries[best], float(scores[best])
+
+
+class SemanticCache:
+    """Near-duplicate query cache in front of a model's exact-match response cache"""
+
+    def __init__(self, threshold=0.75, vectorizer=None, audit_rate=0.0, audit_threshold=0.8, seed=42):
+        self.threshold = threshold
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.audit_rate = audit_rate
+        self.audit_threshold = audit_threshold
+        self._rng = random.Random(seed)
+        self._indexes = {}
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.lookup_time_s = 0.0
+        self.audits = []
+        self.last_hit = None
+        self._exact_hit = None
+
+    # --- Keys --------------------------------------------------------------
+
+    @staticmethod
+    def _split(messages):
+        """Return (index of last user message, its text)"""
+        for idx in range(len(messages) - 1, -1, -1):
+            if messages[idx].role == "user":
+                return idx, messages[idx].get_content_string()
+        return None, None
+
+    @staticmethod
+    def _namespace(model, messages, user_idx, tools):
+        context = [
+            (m.role, m.get_content_string()) for i, m in enumerate(messages) if i != user_idx
+        ]
+        tool_names = sorted(getattr(t, "name", str(t)) for t in tools or [])
+        payload = json.dumps([model.id, context, tool_names], sort_keys=True, default=str)
+        return md5(payload.encode()).hexdigest()
+
+    # --- Lookup / store ----------------------------------------------------
+
+    def lookup(self, namespace, query):
+        """Return (entry, similarity, exact) for the best match above threshold, else None"""
+        start = time.perf_counter()
+        self.lookups += 1
+        index = self._indexes.get(namespace)
+        result = None
+        if index is not None:
+            vector = self.vectorizer.transform(query)
+            entry, score = index.nearest(vector)
+            if entry is not None and score >= self.threshold:
+                exact = normalize_text(entry["query"]) == normalize_text(query)
+                result = (entry, score, exact)
+        self.lookup_time_s += time.perf_counter() - start
+
+        if result is None:
+            self.misses += 1
+        elif result[2]:
+            self.exact_hits += 1
+        else:
+            self.semantic_hits += 1
+        self.last_hit = result is not None
+        return result
+
+    def store(self, namespace, query, model_response):
+        index = self._indexes.get(namespace)
+        if index is None:
+            index = self._indexes[namespace] = _Index(self.vectorizer.n_features)
+        index.add(self.vectorizer.transform(query), {"query": query, "response": model_response.to_dict()})
+
+    def _audit(self, query, entry, score, fresh_response, billed=True, tokens=0):
+        cached = self.vectorizer.transform(entry["response"].get("content") or "")
+        fresh = self.vectorizer.transform(fresh_response.content or "")
+        agreement = float(cached @ fresh)
+        self.audits.append({
+            "query": query,
+            "matched_query": entry["query"],
+            "similarity": score,
+            "answer_agreement": agreement,
+            "false_hit": agreement < self.audit_threshold,
+            # An audit served by the exact-match cache costs nothing
+            "billed": billed,
+            "tokens": tokens,
+        })
+
+    # --- Model integration -------------------------------------------------
+
+    def instrument(self, model):
+        """Put this cache in front of model.response (exact cache and API call)"""
+        from agno.models.response import ModelResponse
+
+        response = model.response
+        read = getattr(model, "_get_cached_model_response", None)
+        if read is not None:
+            @wraps(read)
+            def get_cached(cache_key):
+                cached = read(cache_key)
+                self._exact_hit = bool(cached)
+                return cached
+
+            model._get_cached_model_response = get_cached
+
+        @wraps(response)
+        def cached_response(messages, *args, **kwargs):
+            user_idx, query = self._split(messages)
+            if user_idx is None:
+                return response(messages, *args, **kwargs)
+            namespace = self._namespace(model, messages, user_idx, kwargs.get("tools"))
+
+            match = self.lookup(namespace, query)
+            if match is not None:
+                entry, score, exact = match
+                if not exact and self.audit_rate > 0 and self._rng.random() < self.audit_rate:
+                    # On a copy and outside the run, so the audit's messages stay out of the session
+                    audit_messages = list(messages)
+                    self._exact_hit = False
+                    fresh_response = response(audit_messages, *args, **{**kwargs, "run_response": None})
+                    tokens = sum(getattr(m.metrics, "total_tokens", 0) or 0 for m in audit_messages[len(messages):])
+                    self._audit(query, entry, score, fresh_response, billed=not self._exact_hit,
+                                tokens=0 if self._exact_hit else tokens)
+                return ModelResponse.from_dict(json.loads(json.dumps(entry["response"])))
+
+            model_response = response(messages, *args, **kwargs)
+            self.store(namespace, query, model_response)
+            return model_response
+
+        model.response = cached_response
+        return self
+
+    # --- Reporting ---------------------------------------------------------
+
+    @property
+    def hits(self):
+        return self.exact_hits + self.semantic_hits
+
+    def summary(self):
+        false_hits = sum(1 for audit in self.audits if audit["false_hit"])
+        return {
+            'threshold': self.threshold,
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'normalized_exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+            'avg_lookup_ms': self.lookup_time_s / self.lookups * 1000 if self.lookups else 0.0,
+            'indexed_entries': sum(index.size for index in self._indexes.values()),
+            'audited': len(self.audits),
+            'false_hits': false_hits,
+            'false_hit_rate': false_hits / len(self.audits) if self.audits else 0.0,
+            'audit_api_calls': sum(1 for audit in self.audits if audit["billed"]),
+            'audit_tokens': sum(audit["tokens"] for audit in self.audits),
+        }
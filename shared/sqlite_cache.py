@@ -0,0 +1,294 @@
+"""
+Single-file, size-capped response cache backend for agno models.
+
+agno's built-in response cache writes one JSON file per entry under
+`~/.agno/cache/model_responses`. At high volume that is millions of small files,
+slow directory scans and no bound on disk use. SqliteResponseCache keeps every
+entry in one SQLite file instead:
+
+- Entries are zlib-compressed JSON blobs keyed by agno's own cache key.
+- Total compressed size is capped at `max_bytes`. When an insert pushes it over
+  the cap, entries are evicted (least recently used, or least frequently used)
+  down to `low_watermark` of the cap, so eviction runs in batches, not per insert.
+- Deleted pages are returned to the OS by incremental vacuum. A background
+  thread runs this compaction every `compact_interval_s`, and it can also be
+  called directly with compact().
+- `cache_ttl` on the model is honoured the same way the file cache does.
+
+    backend = SqliteResponseCache("tmp/responses.db", max_bytes=512 * 1024**2)
+    backend.install(model)  # model.cache_response=True still switches caching on
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from functools import wraps
+
+POLICIES = ("lru", "lfu")
+ACCESS_FLUSH_BATCH = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_lfu ON entries (hits, last_access);
+"""
+
+
+class SqliteResponseCache:
+    """Compressed, size-capped response cache in one SQLite file"""
+
+    def __init__(self, path, max_bytes=None, policy="lru", compression_level=6, low_watermark=0.9,
+                 compact_interval_s=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy {policy!r}, expected one of {POLICIES}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.compression_level = compression_level
+        self.low_watermark = low_watermark
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection guarded by a lock, so worker threads (cache warm-up) can share the backend
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # auto_vacuum must be set before the first table is created to take effect
+        self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        self.evictions = 0
+        self.compactions = 0
+        # Hits only update recency/frequency in memory; they are written in batches
+        # so the lookup path stays a single indexed read
+        self._pending_access = {}
+        # A file written with a larger (or no) cap is trimmed on open
+        if max_bytes is not None and self.total_bytes > max_bytes:
+            with self._lock:
+                self._evict(int(max_bytes * low_watermark))
+        self._stop = threading.Event()
+        self._compactor = None
+        if compact_interval_s:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, args=(compact_interval_s,), name="cache-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    # --- Key/value API -----------------------------------------------------
+
+    def get(self, key, ttl=None):
+        """Return the cached dict for `key`, or None if missing or older than `ttl` seconds"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if ttl is not None and now - row[1] > ttl:
+                return None
+            _, hits = self._pending_access.get(key, (now, 0))
+            self._pending_access[key] = (now, hits + 1)
+            if len(self._pending_access) >= ACCESS_FLUSH_BATCH:
+                self._flush_access()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, data):
+        """Store a JSON-serialisable dict under `key`, evicting if the size cap is exceeded"""
+        value = zlib.compress(json.dumps(data).encode(), self.compression_level)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, value, len(value), now, now),
+            )
+            self.total_bytes += len(value) - (old[0] if old else 0)
+            if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * self.low_watermark))
+
+    def put_many(self, items):
+        """Bulk insert of (key, dict) pairs in one transaction"""
+        now = time.time()
+        rows = [
+            (key, zlib.compress(json.dumps(data).encode(), self.compression_level), now)
+            for key, data in items
+        ]
+        with self._lock:
+            added = 0
+            self._conn.execute("BEGIN")
+            try:
+                for key, value, ts in rows:
+                    old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, size, created, last_access, hits) "
+                        "VALUES (?, ?, ?, ?, ?, 0)",
+                        (key, value, len(value), ts, ts),
+                    )
+                    added += len(value) - (old[0] if old else 0)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # Leave neither a half-written batch nor an open transaction behind
+                self._conn.execute("ROLLBACK")
+                raise
+            self.total_bytes += added
+            if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * self.low_watermark))
+
+    def entry_size(self, key):
+        """Compressed size of one entry in bytes (0 if missing)"""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # --- Eviction and compaction -------------------------------------------
+
+    def _flush_access(self):
+        """Write buffered hit counts and access times. Caller holds the lock."""
+        if not self._pending_access:
+            return
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "UPDATE entries SET last_access = ?, hits = hits + ? WHERE key = ?",
+            [(ts, hits, key) for key, (ts, hits) in self._pending_access.items()],
+        )
+        self._conn.execute("COMMIT")
+        self._pending_access.clear()
+
+    def _evict(self, target_bytes):
+        """Delete victims in policy order until total_bytes <= target_bytes. Caller holds the lock."""
+        self._flush_access()
+        order = "last_access" if self.policy == "lru" else "hits, last_access"
+        self._conn.execute("BEGIN")
+        cursor = self._conn.execute(f"SELECT key, size FROM entries ORDER BY {order}")
+        victims = []
+        for key, size in cursor:
+            if self.total_bytes <= target_bytes:
+                break
+            victims.append((key,))
+            self.total_bytes -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._conn.execute("COMMIT")
+        self.evictions += len(victims)
+        for key, in victims:
+            self._pending_access.pop(key, None)
+
+    def compact(self):
+        """Return free pages to the OS and fold the WAL back into the main file"""
+        with self._lock:
+            self._flush_access()
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages:
+                # The pragma frees one page per result row, so it must be stepped to the end
+                self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.compactions += 1
+        return free_pages
+
+    def _compact_loop(self, interval_s):
+        while not self._stop.wait(interval_s):
+            self.compact()
+
+    def disk_bytes(self):
+        """Bytes on disk for the database file plus its WAL"""
+        return sum(
+            os.path.getsize(self.path + suffix)
+            for suffix in ("", "-wal")
+            if os.path.exists(self.path + suffix)
+        )
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        self.compact()
+        with self._lock:
+            self._conn.close()
+
+    # --- Model integration -------------------------------------------------
+
+    def install(self, model):
+        """Replace the model's file-based cache read/write methods with this backend"""
+        read = model._get_cached_model_response
+        save = model._save_model_response_to_cache
+        save_stream = model._save_streaming_responses_to_cache
+
+        @wraps(read)
+        def get_cached(cache_key):
+            try:
+                return self.get(cache_key, ttl=model.cache_ttl)
+            except (sqlite3.Error, ValueError, zlib.error):
+                return None
+
+        @wraps(save)
+        def save_to_cache(cache_key, result, is_streaming=False):
+            self.put(cache_key, {
+                "timestamp": int(time.time()),
+                "is_streaming": is_streaming,
+                "result": result.to_dict(),
+            })
+
+        @wraps(save_stream)
+        def save_stream_to_cache(cache_key, responses):
+            self.put(cache_key, {
+                "timestamp": int(time.time()),
+                "is_streaming": True,
+                "streaming_responses": [r.to_dict() for r in responses],
+            })
+
+        model._get_cached_model_response = get_cached
+        model._save_model_response_to_cache = save_to_cache
+        model._save_streaming_responses_to_cache = save_stream_to_cache
+        # Lets CacheStats report entry sizes without a per-entry file path
+        model._response_cache_backend = self
+        return model
+
+    def summary(self):
+        return {
+            'path': self.path,
+            'entries': len(self),
+            'policy': self.policy,
+            'max_bytes': self.max_bytes,
+            'stored_bytes': self.total_bytes,
+            'disk_bytes': self.disk_bytes(),
+            'evictions': self.evictions,
+            'compactions': self.compactions,
+        }
+
+
+def add_cache_backend_arguments(parser):
+    """Add --cache-backend/--cache-file/--cache-max-mb/--cache-policy to an argparse parser"""
+    group = parser.add_argument_group("response cache backend")
+    group.add_argument("--cache-backend", choices=("files", "sqlite"), default="files",
+                       help="files: agno's one-JSON-file-per-entry cache; sqlite: single-file capped cache")
+    group.add_argument("--cache-file", default="tmp/response_cache.db",
+                       help="SQLite cache file for --cache-backend sqlite")
+    group.add_argument("--cache-max-mb", type=float, default=None,
+                       help="Size cap for --cache-backend sqlite (default: unbounded)")
+    group.add_argument("--cache-policy", choices=POLICIES, default="lru",
+                       help="Eviction policy for --cache-backend sqlite")
+    return parser
+
+
+def cache_backend_from_args(args):
+    """SqliteResponseCache for --cache-backend sqlite, else None (use agno's file cache)"""
+    if args.cache_backend != "sqlite":
+        return None
+    max_bytes = int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb else None
+    return SqliteResponseCache(args.cache_file, max_bytes=max_bytes, policy=args.cache_policy,
+                               compact_interval_s=60)
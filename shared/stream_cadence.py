@@ -0,0 +1,97 @@
+"""
+Record and replay the chunk cadence of cached streaming responses.
+
+agno caches a streamed response as the list of chunks it produced, and a cache
+hit yields them all back-to-back. That is the fastest possible replay, but it
+doesn't look like the original stream to a user. StreamCadence stores each
+chunk's offset from the start of the request alongside the cached chunks, and on
+a hit either replays them instantly (agno's behaviour) or sleeps to reproduce
+the recorded timing: the original time to first chunk as well as the gaps.
+
+    cadence = StreamCadence(replay="recorded").instrument(model)
+
+Offsets live in each cached chunk's `extra["stream_offset_s"]` and are removed
+again before the chunk is rebuilt, so replayed responses look exactly like
+freshly streamed ones. Entries cached without cadence replay instantly.
+"""
+
+import time
+from functools import wraps
+
+REPLAY_MODES = ("instant", "recorded")
+OFFSET_KEY = "stream_offset_s"
+
+
+class StreamCadence:
+    """Captures chunk timing on cache misses and paces chunk replay on cache hits"""
+
+    def __init__(self, replay="instant"):
+        if replay not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode {replay!r}, expected one of {REPLAY_MODES}")
+        self.replay = replay
+        self._offsets = {}
+
+    def instrument(self, model):
+        """Wrap the model's streaming and streaming-cache methods in place"""
+        from agno.models.response import ModelResponse
+
+        response_stream = model.response_stream
+        aresponse_stream = model.aresponse_stream
+        save_stream = model._save_streaming_responses_to_cache
+        from_cache = model._streaming_responses_from_cache
+
+        def stamp(item, started):
+            if isinstance(item, ModelResponse):
+                self._offsets[id(item)] = time.perf_counter() - started
+
+        @wraps(response_stream)
+        def timed_stream(*args, **kwargs):
+            self._offsets = {}
+            started = time.perf_counter()
+            for item in response_stream(*args, **kwargs):
+                stamp(item, started)
+                yield item
+
+        @wraps(aresponse_stream)
+        async def atimed_stream(*args, **kwargs):
+            self._offsets = {}
+            started = time.perf_counter()
+            async for item in aresponse_stream(*args, **kwargs):
+                stamp(item, started)
+                yield item
+
+        @wraps(save_stream)
+        def save_with_cadence(cache_key, responses):
+            # Offsets are attached only for the duration of the save
+            originals = [r.extra for r in responses]
+            for r in responses:
+                offset = self._offsets.get(id(r))
+                if offset is not None:
+                    r.extra = {**(r.extra or {}), OFFSET_KEY: offset}
+            try:
+                return save_stream(cache_key, responses)
+            finally:
+                for r, extra in zip(responses, originals):
+                    r.extra = extra
+                self._offsets = {}
+
+        @wraps(from_cache)
+        def replay_from_cache(cached_data):
+            start = time.perf_counter()
+            for data in cached_data:
+                extra = data.get("extra") or {}
+                offset = extra.pop(OFFSET_KEY, None)
+                if not extra:
+                    data["extra"] = None
+                if self.replay == "recorded" and offset is not None:
+                    # Sleep to the absolute offset so consumer time doesn't accumulate as drift
+                    delay = start + offset - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                yield from from_cache([data])
+
+        model.response_stream = timed_stream
+        model.aresponse_stream = atimed_stream
+        model._save_streaming_responses_to_cache = save_with_cadence
+        model._streaming_responses_from_cache = replay_from_cache
+        return self
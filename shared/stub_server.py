@@ -0,0 +1,463 @@
+"""
+Local OpenAI-compatible chat-completions server for HTTP-level benchmarks.
+
+OfflineChat runs inside the agent, so it never touches the network: client
+construction, TLS/keep-alive, connection pooling and retries never show up in
+its numbers. This server speaks the wire format OpenAIChat uses
+(POST /v1/chat/completions, JSON or SSE streaming) and answers like
+OfflineChat does:
+
+- If a `get_info_about_topic` tool is offered and the current turn has no tool
+  result yet, reply with one tool call per topic of the user message.
+- Otherwise reply with a short answer built from the tool results.
+- `usage` is estimated from the request body with the same token heuristic.
+
+Configurable per server: latency (same distributions as OfflineChat),
+inter-chunk delay for streaming, and injected failures: a fraction of requests
+get 429 (immediately, with Retry-After headers) or 5xx (after the usual
+latency). A requests-per-minute and/or tokens-per-minute quota can be enforced
+too. Like a provider, the stub enforces it over `quota_window_s` rather than a
+whole minute. A request over quota gets a 429 with the time until it would fit
+as Retry-After. With a quota set, every response carries
+x-ratelimit-remaining-* headers. GET /stats returns counters: TCP connections
+accepted, requests, responses by status, tokens. The server speaks HTTP/1.1,
+so clients that keep connections alive reuse them and the connection count
+shows it.
+
+In-process (a background thread; shares the GIL with the client):
+
+    with StubServer(latency_ms=50) as server:
+        model = OpenAIChat(id="gpt-4o-mini", base_url=server.base_url, api_key="stub")
+
+In a separate process, so the server does not compete with the client for the GIL:
+
+    server = StubProcess(latency_ms=50, rate_429=0.05)
+    ...
+    server.stats()
+    server.stop()
+
+Standalone:
+
+    python stub_server.py --port 8000 --latency-ms 200 --rate-429 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from hashlib import md5
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from offline_model import (
+    LATENCY_DISTRIBUTIONS,
+    TOKENS_PER_MESSAGE,
+    estimate_tokens,
+    extract_topics,
+    sample_latency,
+)
+from rate_limiter import TokenBucket
+
+SERVER_ERRORS = (500, 502, 503)
+
+
+def _content_text(content):
+    """Text of a chat-completions `content` (a string or a list of parts)"""
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+
+class StubServer:
+    """OpenAI-compatible chat-completions endpoint on a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, latency_jitter_ms=0.0,
+                 latency_distribution="fixed", chunk_interval_ms=0.0, rate_429=0.0, rate_5xx=0.0,
+                 retry_after_ms=100, quota_rpm=None, quota_tpm=None, quota_window_s=1.0,
+                 tool_name="get_info_about_topic", max_answer_chars=240, seed=42):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency_distribution '{latency_distribution}', expected one of {LATENCY_DISTRIBUTIONS}"
+            )
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.chunk_interval_ms = chunk_interval_ms
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after_ms = retry_after_ms
+        self.quotas = {}
+        if quota_rpm:
+            self.quotas['requests'] = TokenBucket(quota_rpm / 60, max(1.0, quota_rpm / 60 * quota_window_s))
+        if quota_tpm:
+            self.quotas['tokens'] = TokenBucket(quota_tpm / 60, quota_tpm / 60 * quota_window_s)
+        self.tool_name = tool_name
+        self.max_answer_chars = max_answer_chars
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tool_call_seq = 0
+        self.reset_stats()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self), bind_and_activate=False)
+        self._httpd.daemon_threads = True
+        # The default listen backlog of 5 refuses connections under a burst of new clients
+        self._httpd.request_queue_size = 256
+        self._httpd.server_bind()
+        self._httpd.server_activate()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        """base_url for OpenAIChat / the openai client"""
+        return f"{self.url}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Counters ------------------------------------------------------------
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'connections': 0,
+                'requests': 0,
+                'streamed': 0,
+                'tool_call_responses': 0,
+                'status': {},
+                'over_quota': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+            }
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'status': dict(self._stats['status'])}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _count_status(self, status):
+        with self._lock:
+            self._stats['status'][str(status)] = self._stats['status'].get(str(status), 0) + 1
+
+    # --- Responses -----------------------------------------------------------
+
+    def _draw(self):
+        """Latency for this request and the injected failure status, if any"""
+        with self._lock:
+            delay = sample_latency(self._rng, self.latency_ms, self.latency_jitter_ms, self.latency_distribution)
+            roll = self._rng.random()
+            if roll < self.rate_429:
+                return delay, 429
+            if roll < self.rate_429 + self.rate_5xx:
+                return delay, self._rng.choice(SERVER_ERRORS)
+        return delay, None
+
+    def _admit(self, tokens):
+        """Charge a request against the quotas: None if it fits, else the seconds until it would"""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for name, bucket in self.quotas.items():
+                wait = max(wait, bucket.wait_time(1 if name == 'requests' else tokens, now))
+            if wait > 0:
+                self._stats['over_quota'] += 1
+                return wait
+            for name, bucket in self.quotas.items():
+                bucket.take(1 if name == 'requests' else tokens)
+            return None
+
+    def quota_headers(self):
+        with self._lock:
+            return {f"x-ratelimit-remaining-{name}": str(max(0, int(bucket.refill())))
+                    for name, bucket in self.quotas.items()}
+
+    def _next_call_id(self, key):
+        with self._lock:
+            self._tool_call_seq += 1
+            seq = self._tool_call_seq
+        return f"call_{md5(f'{seq}:{key}'.encode()).hexdigest()[:24]}"
+
+    def completion(self, body):
+        """The assistant message, finish_reason and usage for a chat-completions request body"""
+        messages = body.get("messages") or []
+        tools = body.get("tools") or []
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=None)
+        query = _content_text(messages[last_user].get("content")) if last_user is not None else ""
+        tool_results = [m for m in messages[last_user + 1:] if m.get("role") == "tool"] if last_user is not None else []
+        topics = extract_topics(query)
+        offered = {t.get("function", {}).get("name") for t in tools if isinstance(t, dict)}
+
+        message = {"role": "assistant", "content": None}
+        if self.tool_name in offered and not tool_results:
+            message["tool_calls"] = [
+                {
+                    "id": self._next_call_id(f"{len(messages)}:{query}"),
+                    "type": "function",
+                    "function": {"name": self.tool_name, "arguments": json.dumps({"topic": topic})},
+                }
+                for topic in topics
+            ]
+            finish_reason = "tool_calls"
+            output_text = json.dumps(message["tool_calls"])
+        else:
+            if tool_results:
+                findings = " ".join(_content_text(m.get("content")) for m in tool_results)
+                if len(findings) > self.max_answer_chars:
+                    findings = findings[:self.max_answer_chars].rsplit(" ", 1)[0] + " ..."
+                message["content"] = f"Here is what I found about {', '.join(topics)}: {findings}"
+            else:
+                message["content"] = f"Offline answer to: {query}"
+            finish_reason = "stop"
+            output_text = message["content"]
+
+        prompt_tokens = 0
+        for m in messages:
+            text = _content_text(m.get("content"))
+            if m.get("tool_calls"):
+                text += json.dumps(m["tool_calls"])
+            prompt_tokens += TOKENS_PER_MESSAGE + estimate_tokens(text)
+        if tools:
+            prompt_tokens += estimate_tokens(json.dumps(tools))
+        completion_tokens = estimate_tokens(output_text)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return message, finish_reason, usage
+
+    def chunks(self, message, finish_reason, usage, include_usage):
+        """chat.completion.chunk deltas for a streamed response"""
+        if message.get("tool_calls"):
+            deltas = [{"role": "assistant", "tool_calls": [{"index": i, **call}
+                                                           for i, call in enumerate(message["tool_calls"])]}]
+        else:
+            words = message["content"].split(" ")
+            deltas = [{"role": "assistant", "content": words[0]}] + [{"content": " " + w} for w in words[1:]]
+        for delta in deltas:
+            yield {"choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+        yield {"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]}
+        if include_usage:
+            yield {"choices": [], "usage": usage}
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            server._count('connections')
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in {**server.quota_headers(), **(headers or {})}.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+            server._count_status(status)
+
+        def _write_chunk(self, data):
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                self._send_json(200, server.stats())
+            elif self.path.rstrip("/") == "/v1/models":
+                self._send_json(200, {"object": "list", "data": []})
+            else:
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.rstrip("/") == "/stats/reset":
+                server.reset_stats()
+                self._send_json(200, {})
+                return
+            if self.path.rstrip("/") != "/v1/chat/completions":
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+                return
+            server._count('requests')
+            request = json.loads(body or b"{}")
+            delay, failure = server._draw()
+            if failure == 429:
+                self._send_json(429, {"error": {"message": "Rate limit reached (injected)", "type": "requests",
+                                                "code": "rate_limit_exceeded"}},
+                                {"retry-after-ms": str(int(server.retry_after_ms)),
+                                 "retry-after": str(max(1, round(server.retry_after_ms / 1000)))})
+                return
+            message, finish_reason, usage = server.completion(request)
+            over_quota = server._admit(usage['total_tokens'])
+            if over_quota is not None:
+                self._send_json(429, {"error": {"message": "Rate limit reached for requests or tokens per minute",
+                                                "type": "requests", "code": "rate_limit_exceeded"}},
+                                {"retry-after-ms": str(max(1, int(over_quota * 1000))),
+                                 "retry-after": str(max(1, round(over_quota)))})
+                return
+            if delay:
+                time.sleep(delay)
+            if failure is not None:
+                self._send_json(failure, {"error": {"message": "Upstream error (injected)", "type": "server_error"}})
+                return
+
+            server._count('prompt_tokens', usage['prompt_tokens'])
+            server._count('completion_tokens', usage['completion_tokens'])
+            if message.get("tool_calls"):
+                server._count('tool_call_responses')
+            envelope = {"id": f"chatcmpl-{server._next_call_id('completion')[5:]}", "created": int(time.time()),
+                        "model": request.get("model", "stub")}
+            if not request.get("stream"):
+                self._send_json(200, {**envelope, "object": "chat.completion", "usage": usage,
+                                      "choices": [{"index": 0, "message": message, "finish_reason": finish_reason,
+                                                   "logprobs": None}]})
+                return
+
+            server._count('streamed')
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            for name, value in server.quota_headers().items():
+                self.send_header(name, value)
+            self.end_headers()
+            for i, chunk in enumerate(server.chunks(message, finish_reason, usage, include_usage)):
+                if i and server.chunk_interval_ms:
+                    time.sleep(server.chunk_interval_ms / 1000.0)
+                payload = {**envelope, "object": "chat.completion.chunk", **chunk}
+                self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+            server._count_status(200)
+
+    return Handler
+
+
+class StubProcess:
+    """StubServer in a child process (this module's CLI), with the same url / stats() / stop()"""
+
+    def __init__(self, **options):
+        command = [sys.executable, os.path.abspath(__file__), "--port", "0"]
+        for name, value in options.items():
+            if value is None:
+                continue
+            flag = "latency-dist" if name == "latency_distribution" else name.replace("_", "-")
+            command += [f"--{flag}", str(value)]
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        line = self._process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"stub server exited with code {self._process.wait()}")
+        self.url = line.split()[-1].rsplit("/v1", 1)[0]
+        self.base_url = f"{self.url}/v1"
+
+    def _call(self, method, path):
+        request = urllib.request.Request(self.url + path, method=method, data=b"" if method == "POST" else None)
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read() or b"{}")
+
+    def stats(self):
+        return self._call("GET", "/stats")
+
+    def reset_stats(self):
+        self._call("POST", "/stats/reset")
+
+    def stop(self):
+        self._process.terminate()
+        self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_stub_arguments(parser):
+    """Register the stub server's latency and failure-injection flags on an argparse parser"""
+    group = parser.add_argument_group("stub server")
+    group.add_argument("--latency-ms", type=float, default=50.0, help="Mean response latency (default: 50)")
+    group.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Latency spread (ms)")
+    group.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed",
+                       help="Latency distribution (default: fixed)")
+    group.add_argument("--chunk-interval-ms", type=float, default=0.0,
+                       help="Delay between streamed chunks (ms)")
+    group.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    group.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered with 500/502/503")
+    group.add_argument("--retry-after-ms", type=float, default=100, help="Retry-After sent with 429s (default: 100)")
+    group.add_argument("--quota-rpm", type=float, default=None, help="Requests per minute the server accepts")
+    group.add_argument("--quota-tpm", type=float, default=None, help="Tokens per minute the server accepts")
+    group.add_argument("--quota-window-s", type=float, default=1.0,
+                       help="Window the quotas are enforced over (default: 1s, like providers' sub-minute limits)")
+    group.add_argument("--seed", type=int, default=42, help="Seed for latency and failure injection (default: 42)")
+    return parser
+
+
+def stub_options_from_args(args):
+    """Translate parsed CLI args into StubServer / StubProcess keyword arguments"""
+    return {
+        "latency_ms": args.latency_ms,
+        "latency_jitter_ms": args.latency_jitter_ms,
+        "latency_distribution": args.latency_dist,
+        "chunk_interval_ms": args.chunk_interval_ms,
+        "rate_429": args.rate_429,
+        "rate_5xx": args.rate_5xx,
+        "retry_after_ms": args.retry_after_ms,
+        "quota_rpm": args.quota_rpm,
+        "quota_tpm": args.quota_tpm,
+        "quota_window_s": args.quota_window_s,
+        "seed": args.seed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat-completions stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (0 = any free port)")
+    add_stub_arguments(parser)
+    args = parser.parse_args(argv)
+    server = StubServer(host=args.host, port=args.port, **stub_options_from_args(args))
+    print(f"🧪 Stub server listening on {server.base_url}", flush=True)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
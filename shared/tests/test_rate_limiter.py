@@ -0,0 +1,162 @@
+"""
+Tests for rate_limiter.RateLimitScheduler: admission order, the rate cut on a
+429 and the token refund on a failed request.
+
+Time is driven by a fake clock, so nothing here sleeps for quota refills.
+
+    python -m pytest shared/tests
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rate_limiter  # noqa: E402
+from rate_limiter import RateLimitScheduler  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ProviderError(Exception):
+    """Stands in for agno's ModelProviderError: an HTTP status and the response headers"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake)
+    return fake
+
+
+def make_scheduler(clock, **kwargs):
+    scheduler = RateLimitScheduler(seed=1, **kwargs)
+    # The buckets default to the real clock; put them on the fake one
+    for bucket in scheduler.buckets.values():
+        bucket.clock = clock
+        bucket.updated = clock()
+    return scheduler
+
+
+def test_admits_sessions_with_fewer_requests_first(clock):
+    scheduler = make_scheduler(clock, rpm=60)  # 1 request/s, burst of 1
+    for _ in range(2):
+        scheduler.acquire("long", 10, 10)
+        clock.advance(1.0)
+    scheduler.acquire("long", 10, 10)
+
+    # The long session queues first, but the new session is admitted ahead of it
+    first = scheduler._enqueue("long", 10, 10)
+    second = scheduler._enqueue("short", 10, 10)
+    assert scheduler._poll(first) is None
+    assert scheduler._poll(second) == pytest.approx(1.0)
+
+    clock.advance(1.0)
+    assert scheduler._poll(first) is None
+    assert scheduler._poll(second) == 0.0
+    clock.advance(1.0)
+    assert scheduler._poll(first) == 0.0
+    assert scheduler.counts['requests'] == 5
+
+
+def test_ties_are_first_come_first_served(clock):
+    scheduler = make_scheduler(clock, rpm=60)
+    scheduler.acquire("warm-up", 10, 10)
+    a = scheduler._enqueue("a", 10, 10)
+    b = scheduler._enqueue("b", 10, 10)
+    assert scheduler._poll(b) is None
+    clock.advance(1.0)
+    assert scheduler._poll(a) == 0.0
+    clock.advance(1.0)
+    assert scheduler._poll(b) == 0.0
+
+
+def test_429_cuts_the_rate_once_per_pause_and_success_restores_it(clock):
+    scheduler = make_scheduler(clock, rpm=600, decrease=0.5, increase=0.1)
+    first = scheduler.acquire("a", 10, 10)
+    second = scheduler.acquire("b", 10, 10)
+
+    delay = scheduler._failed(first, ProviderError(429, {"retry-after": "2"}), attempt=0)
+    assert delay == 2.0
+    assert scheduler.scale == 0.5
+    assert scheduler.buckets['requests'].rate_per_s == pytest.approx(600 / 60 * 0.5)
+    # Admission pauses for the Retry-After
+    waiting = scheduler._enqueue("c", 10, 10)
+    assert scheduler._poll(waiting) == pytest.approx(2.0)
+
+    # A 429 from a request already in flight does not cut the rate again
+    scheduler._failed(second, ProviderError(429, {"retry-after": "2"}), attempt=0)
+    assert scheduler.scale == 0.5
+    assert scheduler.counts['rate_limited'] == 2
+
+    clock.advance(2.0)
+    assert scheduler._poll(waiting) == 0.0
+    scheduler._observe(waiting, SimpleNamespace(input_tokens=8, output_tokens=2))
+    assert scheduler.scale == pytest.approx(0.6)
+
+
+def test_5xx_is_retried_without_cutting_the_rate(clock):
+    scheduler = make_scheduler(clock, rpm=600)
+    ticket = scheduler.acquire("a", 10, 10)
+    assert scheduler._failed(ticket, ProviderError(503), attempt=0) > 0
+    assert scheduler.scale == 1.0
+    assert scheduler.counts['server_errors'] == 1
+
+
+def test_failed_request_refunds_its_tokens(clock):
+    scheduler = make_scheduler(clock, tpm=6000, max_retries=1)  # 100 tokens/s, bucket of 100
+    tokens = scheduler.buckets['tokens']
+
+    ticket = scheduler.acquire("a", 40, 40)
+    assert tokens.level == pytest.approx(60)
+    scheduler._failed(ticket, ProviderError(500), attempt=0)
+    assert tokens.level == pytest.approx(100)
+
+    # Also when the request is given up on, retries exhausted or not retryable
+    ticket = scheduler.acquire("a", 40, 40)
+    assert scheduler._failed(ticket, ProviderError(500), attempt=1) is None
+    assert scheduler.counts['failed'] == 1
+    ticket = scheduler.acquire("a", 40, 40)
+    assert scheduler._failed(ticket, ValueError("bad request"), attempt=0) is None
+    assert tokens.level == pytest.approx(100)
+
+
+def test_invoke_retries_a_429_and_corrects_tokens_with_actual_usage():
+    class FlakyModel:
+        def __init__(self):
+            self.calls = 0
+
+        def invoke(self, messages, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                raise ProviderError(429, {"retry-after-ms": "10"})
+            return SimpleNamespace(response_usage=SimpleNamespace(input_tokens=30, output_tokens=5))
+
+    model = FlakyModel()
+    agent = SimpleNamespace(model=model, session_id="s1")
+    scheduler = RateLimitScheduler(rpm=6000, tpm=600_000, seed=1).instrument(agent)
+    scheduler._request = lambda agent, args, kwargs: ("s1", 20, 20)
+
+    response = model.invoke([])
+    assert response.response_usage.output_tokens == 5
+    assert model.calls == 2
+    summary = scheduler.summary()
+    assert summary['retries'] == 1 and summary['rate_limited'] == 1 and summary['requests'] == 2
+    assert summary['estimated_tokens'] == 20 and summary['actual_tokens'] == 35
+    assert summary['queue_wait_s']['p50'] <= summary['queue_wait_s']['max']
@@ -0,0 +1,173 @@
+"""
+Memoization of agent tool results.
+
+agno executes a tool every time the model calls it, even when the same call
+with the same arguments ran a moment ago. For search, HTTP or database tools
+that is most of a run's latency. ToolCache wraps tool functions so a repeated
+call returns the stored result instead:
+
+- The key is the tool name plus its arguments, bound to the function's
+  signature (defaults filled in, keyword order irrelevant) and normalized:
+  strings are whitespace-collapsed and, unless case_sensitive=True, casefolded.
+- Entries expire `ttl_s` seconds after they were stored (None: never) and at
+  most `max_entries` are kept, evicting the least recently used.
+- Hits, misses, evictions and expirations are counted, with the time spent in
+  the underlying tool on misses.
+
+The wrapper keeps the tool's name, signature and docstring, so agno builds the
+same JSON schema for it:
+
+    cache = ToolCache(ttl_s=300, max_entries=1024)
+    agent = Agent(model=model, tools=[cache.wrap(search)])
+    ...
+    print(cache.summary())
+"""
+
+import inspect
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+_SPACES = re.compile(r"\s+")
+
+
+class ToolCache:
+    """In-process LRU cache of tool results with TTL and hit/miss counters"""
+
+    def __init__(self, ttl_s=None, max_entries=None, case_sensitive=False):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.case_sensitive = case_sensitive
+        self._entries = OrderedDict()  # key -> (stored_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.tool_time_s = 0.0
+
+    def _normalize(self, value):
+        if isinstance(value, str):
+            value = _SPACES.sub(" ", value).strip()
+            return value if self.case_sensitive else value.casefold()
+        if isinstance(value, dict):
+            return {str(k): self._normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._normalize(v) for v in value]
+        return value
+
+    def key(self, name, signature, args, kwargs):
+        """Cache key for calling tool `name` with args/kwargs"""
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+        except TypeError:
+            arguments = {'args': list(args), 'kwargs': kwargs}
+        return name + ":" + json.dumps(self._normalize(arguments), sort_keys=True, default=repr)
+
+    def get(self, key):
+        """(True, result) for a live entry, else (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if self.ttl_s is None or time.monotonic() - stored_at <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, result
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, result, elapsed_s=0.0):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            self.tool_time_s += elapsed_s
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def wrap(self, fn):
+        """Memoized version of tool function `fn` (sync or async)"""
+        name = fn.__name__
+        signature = inspect.signature(fn)
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def cached_async(*args, **kwargs):
+                key = self.key(name, signature, args, kwargs)
+                found, result = self.get(key)
+                if found:
+                    return result
+                start = time.perf_counter()
+                result = await fn(*args, **kwargs)
+                self.put(key, result, time.perf_counter() - start)
+                return result
+
+            return cached_async
+
+        @wraps(fn)
+        def cached(*args, **kwargs):
+            key = self.key(name, signature, args, kwargs)
+            found, result = self.get(key)
+            if found:
+                return result
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.put(key, result, time.perf_counter() - start)
+            return result
+
+        return cached
+
+    def wrap_all(self, tools):
+        """Wrap every plain function in an agent's tools list; toolkits and Function objects pass through"""
+        return [self.wrap(tool) if inspect.isfunction(tool) else tool for tool in tools]
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'ttl_s': self.ttl_s,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expired': self.expired,
+            'tool_time_s': self.tool_time_s,
+            # Estimate: each hit saved one average miss's tool time
+            'saved_time_s': self.hits * self.tool_time_s / self.misses if self.misses else 0.0,
+        }
+
+
+def add_tool_cache_arguments(parser):
+    """Add --memoize-tools/--tool-cache-ttl/--tool-cache-size to an argparse parser"""
+    group = parser.add_argument_group("tool result memoization")
+    group.add_argument("--memoize-tools", action="store_true",
+                       help="Return stored results for repeated tool calls with the same arguments")
+    group.add_argument("--tool-cache-ttl", type=float, default=None,
+                       help="Seconds a memoized tool result stays valid (default: no expiry)")
+    group.add_argument("--tool-cache-size", type=int, default=None,
+                       help="Maximum memoized tool results, least recently used evicted (default: unbounded)")
+    return parser
+
+
+def tool_cache_from_args(args):
+    """ToolCache for --memoize-tools, else None"""
+    if not args.memoize_tools:
+        return None
+    return ToolCache(ttl_s=args.tool_cache_ttl, max_entries=args.tool_cache_size)